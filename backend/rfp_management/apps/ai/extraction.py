@@ -0,0 +1,200 @@
+"""AI - rule-based extraction of routine proposal terms, used before falling back to the LLM"""
+import re
+
+
+CURRENCY_SYMBOLS = {
+    '$': 'USD', 'us$': 'USD', 'usd': 'USD',
+    '€': 'EUR', 'eur': 'EUR',
+    '£': 'GBP', 'gbp': 'GBP',
+    '₹': 'INR', 'inr': 'INR', 'rs': 'INR', 'rs.': 'INR',
+    'cad': 'CAD', 'aud': 'AUD',
+}
+SCALES = {'k': 1_000, 'thousand': 1_000, 'm': 1_000_000, 'mn': 1_000_000, 'million': 1_000_000}
+NUMBER_WORDS = {
+    'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5, 'six': 6,
+    'seven': 7, 'eight': 8, 'nine': 9, 'ten': 10, 'twelve': 12,
+}
+
+_AMOUNT = r'\d{1,3}(?:,\d{3})+(?:\.\d{1,2})?|\d+(?:\.\d{1,2})?'
+_SCALE = r'(?:\s?(?P<scale>k|thousand|mn|million|m)\b)?'
+_CODE = r'us\$|usd|eur|gbp|inr|cad|aud|rs\.?'
+MONEY_PATTERN = re.compile(
+    rf'(?:(?P<prefix>\b(?:{_CODE})|[$€£₹])\s?(?P<amount>{_AMOUNT}){_SCALE})'
+    rf'|(?:(?P<amount2>{_AMOUNT}){_SCALE.replace("scale", "scale2")}\s?(?P<suffix>usd|eur|gbp|inr|cad|aud|dollars|euros)\b)',
+    re.IGNORECASE
+)
+TOTAL_KEYWORDS = re.compile(
+    r'\b(?:grand total|total(?: price| cost| amount)?|price|cost|quot(?:e|ation|ed)|amount|bid|offer)\b[^\d$€£₹\n]{0,25}$',
+    re.IGNORECASE
+)
+UNIT_KEYWORDS = re.compile(r'^\s*(?:/|per\b|each\b|a piece|per unit|/unit|/month|per month|monthly)', re.IGNORECASE)
+
+_QUANTITY = r'(?P<low>\d+|' + '|'.join(NUMBER_WORDS) + r')(?:\s*(?:-|to)\s*(?P<high>\d+))?'
+DELIVERY_PATTERN = re.compile(
+    r'\b(?:deliver(?:y|s|ed|ing)?|ship(?:s|ping|ment|ped)?|dispatch(?:ed)?|lead[ -]time|turnaround|install(?:ation|ed)?)\b'
+    rf'[^.\n]{{0,40}}?\b{_QUANTITY}\s*(?P<unit>business days?|working days?|days?|weeks?|months?)\b',
+    re.IGNORECASE
+)
+WARRANTY_PATTERN = re.compile(
+    rf'\b{_QUANTITY}[\s-]*(?P<unit>years?|yrs?|months?)\b[^.\n]{{0,25}}?\bwarrant(?:y|ies)\b'
+    rf'|\bwarrant(?:y|ies)\b[^.\n]{{0,30}}?\b(?P<low2>\d+|{"|".join(NUMBER_WORDS)})[\s-]*(?P<unit2>years?|yrs?|months?)\b',
+    re.IGNORECASE
+)
+NO_WARRANTY_PATTERN = re.compile(r'\b(?:no|without)\s+warranty\b', re.IGNORECASE)
+PAYMENT_PATTERNS = [
+    (re.compile(r'\bnet[\s-]?(\d{1,3})(?![\d,.]\d)\b', re.IGNORECASE), lambda m: f'Net {m.group(1)}', 0.95),
+    (re.compile(r'\b(\d{1,3})\s?%\s*(?:advance|upfront|up-front|on order|upon order|deposit)'
+                r'(?:[^.\n]{0,40}?\b(\d{1,3})\s?%\s*(?:on|upon|after)\s+(delivery|installation|completion))?',
+                re.IGNORECASE),
+     lambda m: f'{m.group(1)}% advance' + (f', {m.group(2)}% on {m.group(3).lower()}' if m.group(2) else ''), 0.85),
+    (re.compile(r'\b(?:due|payable)\s+(?:up)?on\s+receipt\b', re.IGNORECASE), lambda m: 'Due on receipt', 0.9),
+    (re.compile(r'\bpayment\b[^.\n]{0,30}?\bwithin\s+(\d{1,3})\s+days\b', re.IGNORECASE),
+     lambda m: f'Payment within {m.group(1)} days', 0.85),
+]
+
+FIELDS = ('price', 'price_currency', 'delivery_time', 'warranty', 'payment_terms')
+
+
+def _number(token: str) -> int:
+    token = token.lower()
+    return NUMBER_WORDS[token] if token in NUMBER_WORDS else int(token)
+
+
+def _duration(low: str, high: str, unit: str) -> str:
+    unit = unit.lower().replace('yrs', 'years').replace('yr', 'year')
+    count = _number(low)
+    if high:
+        return f'{count}-{int(high)} {unit if unit.endswith("s") else unit + "s"}'
+    singular = unit.rstrip('s')
+    return f'{count} {singular if count == 1 else singular + "s"}'
+
+
+def extract_price(text: str) -> tuple:
+    """
+    Find the total price.
+
+    Returns:
+        tuple: (amount or None, currency or None, confidence)
+    """
+    candidates = []
+    for match in MONEY_PATTERN.finditer(text):
+        amount = match.group('amount') or match.group('amount2')
+        scale = match.group('scale') or match.group('scale2')
+        code = (match.group('prefix') or match.group('suffix') or '').lower()
+        value = float(amount.replace(',', '')) * SCALES.get((scale or '').lower(), 1)
+        currency = CURRENCY_SYMBOLS.get(code, {'dollars': 'USD', 'euros': 'EUR'}.get(code))
+        keyword = TOTAL_KEYWORDS.search(text[max(0, match.start() - 40):match.start()])
+        after = text[match.end():match.end() + 15]
+        candidates.append({
+            'value': value,
+            'currency': currency,
+            'total': bool(keyword) and 'total' in keyword.group().lower(),
+            'keyword': bool(keyword),
+            'unit': bool(UNIT_KEYWORDS.search(after)),
+        })
+
+    if not candidates:
+        return None, None, 0.0
+
+    for flag, confidence in (('total', 0.95), ('keyword', 0.9)):
+        flagged = [c for c in candidates if c[flag] and not c['unit']]
+        if flagged:
+            values = {c['value'] for c in flagged}
+            if len(values) == 1:
+                return flagged[0]['value'], flagged[0]['currency'], confidence
+            if flag == 'total':
+                # Several totals (e.g. subtotal and grand total): the last one usually wins
+                return flagged[-1]['value'], flagged[-1]['currency'], 0.6
+            break
+
+    values = {c['value'] for c in candidates}
+    if len(values) == 1 and not candidates[0]['unit']:
+        return candidates[0]['value'], candidates[0]['currency'], 0.85
+    return candidates[-1]['value'], candidates[-1]['currency'], 0.3
+
+
+def extract_delivery_time(text: str) -> tuple:
+    """Find the delivery time; returns (text or None, confidence)"""
+    matches = list(DELIVERY_PATTERN.finditer(text))
+    if not matches:
+        return None, 0.0
+    found = {_duration(m.group('low'), m.group('high'), m.group('unit')) for m in matches}
+    if len(found) > 1:
+        return _duration(matches[0].group('low'), matches[0].group('high'), matches[0].group('unit')), 0.5
+    return found.pop(), 0.9
+
+
+def extract_warranty(text: str) -> tuple:
+    """Find the warranty period; returns (text or None, confidence)"""
+    if NO_WARRANTY_PATTERN.search(text):
+        return 'No warranty', 0.85
+    matches = list(WARRANTY_PATTERN.finditer(text))
+    if not matches:
+        return None, 0.0
+    found = set()
+    for m in matches:
+        if m.group('low'):
+            found.add(_duration(m.group('low'), m.group('high'), m.group('unit')))
+        else:
+            found.add(_duration(m.group('low2'), None, m.group('unit2')))
+    if len(found) > 1:
+        return sorted(found)[0], 0.5
+    return found.pop(), 0.9
+
+
+def extract_payment_terms(text: str) -> tuple:
+    """Find the payment terms; returns (text or None, confidence)"""
+    found = []
+    for pattern, describe, confidence in PAYMENT_PATTERNS:
+        for match in pattern.finditer(text):
+            found.append((describe(match), confidence))
+    if not found:
+        return None, 0.0
+    terms = {term for term, _ in found}
+    if len(terms) > 1:
+        return found[0][0], 0.5
+    return found[0]
+
+
+def extract_proposal_fields(proposal_content: str) -> dict:
+    """
+    Extract price, currency, delivery time, warranty and payment terms with rules.
+
+    Args:
+        proposal_content: Raw email body or proposal text
+
+    Returns:
+        dict: 'data' in the same shape AIService.parse_proposal returns,
+              and 'confidence' (0-1) per extracted field
+    """
+    price, currency, price_confidence = extract_price(proposal_content)
+    delivery_time, delivery_confidence = extract_delivery_time(proposal_content)
+    warranty, warranty_confidence = extract_warranty(proposal_content)
+    payment_terms, payment_confidence = extract_payment_terms(proposal_content)
+
+    if price is not None and price == int(price):
+        price = int(price)
+
+    return {
+        'data': {
+            'price': price,
+            'price_currency': currency or ('USD' if price is not None else None),
+            'delivery_time': delivery_time or '',
+            'warranty': warranty or '',
+            'payment_terms': payment_terms or '',
+            'specifications': {},
+            'special_conditions': '',
+        },
+        'confidence': {
+            'price': price_confidence,
+            'price_currency': price_confidence if currency else min(price_confidence, 0.7),
+            'delivery_time': delivery_confidence,
+            'warranty': warranty_confidence,
+            'payment_terms': payment_confidence,
+        },
+    }
+
+
+def is_confident(extraction: dict, threshold: float) -> bool:
+    """Whether every field was extracted with at least ``threshold`` confidence"""
+    return all(extraction['confidence'][field] >= threshold for field in FIELDS)
@@ -0,0 +1,37 @@
+"""
+Django management command that runs queued AI jobs (proposal parsing, evaluation and queued API requests).
+Usage: python manage.py run_ai_worker [--once] [--kind KIND ...] [--interval SECONDS]
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from rfp_management.apps.ai.models import AIJob
+from rfp_management.apps.ai.services import AIJobWorker
+
+
+class Command(BaseCommand):
+    help = 'Parse ingested proposals and re-score RFPs from the AI job queue'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Exit once no job is due')
+        parser.add_argument(
+            '--kind',
+            action='append',
+            choices=[kind for kind, _ in AIJob._meta.get_field('kind').choices],
+            help='Only run jobs of this kind (repeatable)'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=getattr(settings, 'AI_JOB_POLL_INTERVAL', 2),
+            help='Seconds to wait when no job is due'
+        )
+
+    def handle(self, *args, **options):
+        worker = AIJobWorker(kinds=options['kind'])
+
+        self.stdout.write(self.style.SUCCESS(f'AI worker {worker.name} started ({", ".join(worker.kinds)})'))
+        try:
+            worker.run(poll_interval=options['interval'], once=options['once'])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write('AI worker stopped')
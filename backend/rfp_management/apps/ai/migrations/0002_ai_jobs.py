@@ -0,0 +1,41 @@
+# Generated by Django 4.2.8 on 2026-10-18 20:17
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AIJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('PARSE_PROPOSAL', 'Parse Proposal'), ('EVALUATE_RFP', 'Evaluate RFP Proposals')], max_length=20)),
+                ('target_id', models.CharField(max_length=255)),
+                ('priority', models.IntegerField(default=0)),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('RUNNING', 'Running'), ('DONE', 'Done'), ('FAILED', 'Failed')], default='PENDING', max_length=20)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now)),
+                ('worker', models.CharField(blank=True, max_length=255)),
+                ('last_error', models.TextField(blank=True)),
+                ('result', models.JSONField(blank=True, default=dict)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'ai_jobs',
+                'indexes': [models.Index(fields=['status', 'kind', 'run_after'], name='ai_job_due_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='aijob',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'PENDING')), fields=('kind', 'target_id'), name='unique_pending_ai_job'),
+        ),
+    ]
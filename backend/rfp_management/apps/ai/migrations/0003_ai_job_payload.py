@@ -0,0 +1,23 @@
+# Generated by Django 4.2.8 on 2026-10-18 20:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai', '0002_ai_jobs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='aijob',
+            name='payload',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AlterField(
+            model_name='aijob',
+            name='kind',
+            field=models.CharField(choices=[('PARSE_PROPOSAL', 'Parse Proposal'), ('EVALUATE_RFP', 'Evaluate RFP Proposals'), ('PARSE_RFP_TEXT', 'Parse Natural Language RFP'), ('CREATE_RFP', 'Create RFP From Natural Language'), ('PARSE_PROPOSAL_TEXT', 'Parse Proposal Text'), ('EVALUATE_PROPOSALS', 'Evaluate Submitted Proposals')], max_length=20),
+        ),
+    ]
@@ -0,0 +1,76 @@
+"""AI app - models for cached LLM responses and queued AI jobs"""
+from django.db import models
+from django.utils import timezone
+
+
+class LLMCacheEntry(models.Model):
+    """Cached Ollama chat completion, keyed on (model, system prompt, user prompt)"""
+    key = models.CharField(max_length=64, unique=True)  # SHA-256 of model + prompts
+    model = models.CharField(max_length=255)
+    method = models.CharField(max_length=100)
+    response = models.TextField()
+    hit_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_accessed_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        db_table = 'llm_cache'
+
+    def __str__(self):
+        return f'{self.method} ({self.model})'
+
+
+class AIJob(models.Model):
+    """Unit of background AI work, claimed and run by `python manage.py run_ai_worker`"""
+    kind = models.CharField(
+        max_length=20,
+        choices=[
+            ('PARSE_PROPOSAL', 'Parse Proposal'),
+            ('EVALUATE_RFP', 'Evaluate RFP Proposals'),
+            ('PARSE_RFP_TEXT', 'Parse Natural Language RFP'),
+            ('CREATE_RFP', 'Create RFP From Natural Language'),
+            ('PARSE_PROPOSAL_TEXT', 'Parse Proposal Text'),
+            ('EVALUATE_PROPOSALS', 'Evaluate Submitted Proposals'),
+        ]
+    )
+    # Proposal ID or RFP ID; for jobs queued from API requests a hash of the
+    # payload (so identical requests share one job) or a unique token
+    target_id = models.CharField(max_length=255)
+    payload = models.JSONField(default=dict, blank=True)  # Handler input for API request jobs
+    priority = models.IntegerField(default=0)  # Higher runs first
+    status = models.CharField(
+        max_length=20,
+        choices=[
+            ('PENDING', 'Pending'),
+            ('RUNNING', 'Running'),
+            ('DONE', 'Done'),
+            ('FAILED', 'Failed'),
+        ],
+        default='PENDING'
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    run_after = models.DateTimeField(default=timezone.now)
+    worker = models.CharField(max_length=255, blank=True)
+    last_error = models.TextField(blank=True)
+    result = models.JSONField(default=dict, blank=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'ai_jobs'
+        constraints = [
+            # At most one waiting job per target; new requests coalesce into it
+            models.UniqueConstraint(
+                fields=['kind', 'target_id'],
+                condition=models.Q(status='PENDING'),
+                name='unique_pending_ai_job'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'kind', 'run_after'], name='ai_job_due_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.kind} {self.target_id} ({self.status})'
@@ -0,0 +1,227 @@
+"""AI - deterministic proposal scoring, so the LLM only has to write the narrative"""
+import json
+import re
+import numpy as np
+from .extraction import NUMBER_WORDS
+
+
+# Feature matrix columns
+PRICE, DELIVERY_DAYS, WARRANTY_MONTHS, ITEM_COVERAGE = range(4)
+DEFAULT_WEIGHTS = {'price': 0.4, 'delivery': 0.2, 'warranty': 0.15, 'coverage': 0.25}
+
+DURATION_PATTERN = re.compile(
+    rf'\b(?P<low>\d+(?:\.\d+)?|{"|".join(NUMBER_WORDS)})(?:\s*(?:-|to)\s*(?P<high>\d+(?:\.\d+)?))?[\s-]*'
+    r'(?P<unit>business days?|working days?|days?|weeks?|months?|years?|yrs?)\b',
+    re.IGNORECASE
+)
+DAYS_PER_UNIT = {'day': 1, 'business day': 7 / 5, 'working day': 7 / 5, 'week': 7, 'month': 30, 'year': 365, 'yr': 365}
+MONTHS_PER_UNIT = {**{unit: days / 30 for unit, days in DAYS_PER_UNIT.items()}, 'year': 12, 'yr': 12}
+
+
+def _duration(text, per_unit: dict) -> float:
+    if isinstance(text, (int, float)):
+        return float(text)
+    match = DURATION_PATTERN.search(str(text or ''))
+    if not match:
+        return np.nan
+    count = match.group('high') or match.group('low')
+    count = NUMBER_WORDS.get(count.lower()) or float(count)
+    unit = match.group('unit').lower()
+    unit = unit[:-1] if unit.endswith('s') else unit
+    return count * per_unit[unit]
+
+
+def duration_in_days(text) -> float:
+    """
+    Convert a duration such as '30 days', '2-3 weeks' or 'one year' to days.
+
+    Ranges count at their upper bound. Returns NaN when no duration is found.
+    """
+    return _duration(text, DAYS_PER_UNIT)
+
+
+def duration_in_months(text) -> float:
+    """Like duration_in_days, in months; 'No warranty' counts as 0"""
+    if isinstance(text, str) and re.search(r'\bno warranty\b', text, re.IGNORECASE):
+        return 0.0
+    return _duration(text, MONTHS_PER_UNIT)
+
+
+def proposal_key(proposal: dict) -> str:
+    """Key of a proposal's evaluation: its id when it has one, since vendor names need not be unique"""
+    return str(proposal['id']) if proposal.get('id') is not None else proposal.get('vendor_name')
+
+
+def price_currency(proposal: dict):
+    """Currency code a proposal quotes in, None when it does not say"""
+    currency = proposal.get('price_currency') or (proposal.get('parsed_data') or {}).get('price_currency')
+    return str(currency or '').strip().upper() or None
+
+
+def _to_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _item_terms(item) -> str:
+    name = item.get('name', '') if isinstance(item, dict) else str(item)
+    name = name.strip().lower()
+    # Match "laptop" in "laptops" and "laptops" in "laptop"
+    return name[:-1] if name.endswith('s') else name
+
+
+def item_coverage(items: list, proposal: dict) -> float:
+    """Share of the requested items a proposal mentions, from 0 to 1 (1 when nothing is requested)"""
+    terms = [term for term in (_item_terms(item) for item in items or []) if term]
+    if not terms:
+        return 1.0
+    text = ' '.join([
+        json.dumps(proposal.get('parsed_data') or {}, default=str),
+        str(proposal.get('proposal_content') or ''),
+    ]).lower()
+    return sum(term in text for term in terms) / len(terms)
+
+
+def proposal_features(rfp_requirements: dict, proposal: dict) -> dict:
+    """
+    The scoring inputs of one proposal: price, delivery days, warranty months and item coverage.
+
+    They depend only on the proposal and the RFP requirements, so they can be
+    stored and reused while other proposals of the RFP change.
+    """
+    price = _to_float(proposal.get('price'))
+    days = duration_in_days(proposal.get('delivery_time'))
+    months = duration_in_months(proposal.get('warranty'))
+    return {
+        'price': float(price) if price > 0 else None,
+        'delivery_days': None if np.isnan(days) else round(float(days), 1),
+        'warranty_months': None if np.isnan(months) else round(float(months), 1),
+        'item_coverage': round(item_coverage((rfp_requirements or {}).get('items') or [], proposal), 2),
+    }
+
+
+def build_feature_matrix(rfp_requirements: dict, proposals: list, features: list = None) -> np.ndarray:
+    """
+    One row per proposal: price, delivery days, warranty months and item coverage.
+
+    ``features`` may hold previously computed proposal_features dicts (or None)
+    per proposal. Missing values are NaN.
+    """
+    matrix = np.full((len(proposals), 4), np.nan)
+    for row, proposal in enumerate(proposals):
+        known = (features[row] if features else None) or proposal_features(rfp_requirements, proposal)
+        matrix[row] = [
+            np.nan if known[name] is None else known[name]
+            for name in ('price', 'delivery_days', 'warranty_months', 'item_coverage')
+        ]
+    return matrix
+
+
+def _best(values: np.ndarray, reduce) -> float:
+    """min/max over the known values, NaN when there are none"""
+    known = values[~np.isnan(values)]
+    return float(reduce(known)) if known.size else np.nan
+
+
+def _relative(values: np.ndarray, target: float, lower_is_better: bool) -> np.ndarray:
+    """Score each value 0-1 against a target; missing values score 0"""
+    if np.isnan(target):
+        return np.where(np.isnan(values), 0.0, 1.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if lower_is_better:
+            ratio = target / np.maximum(values, 1e-9)
+        else:
+            ratio = values / target if target > 0 else np.ones_like(values)
+    return np.clip(np.nan_to_num(ratio, nan=0.0), 0.0, 1.0)
+
+
+def score_proposals(rfp_requirements: dict, proposals: list, weights: dict = None, features: list = None) -> dict:
+    """
+    Score proposals against each other and the RFP requirements.
+
+    Price is scored against the lowest quote, delivery against the required
+    timeline (or the fastest offer), warranty against the required period
+    (or the longest offer) and coverage by the share of requested items
+    mentioned. Quotes in different currencies cannot be compared, so then
+    price is left out of every score and the evaluations say why. The same
+    input always gives the same scores.
+
+    Args:
+        rfp_requirements: The original RFP requirements
+        proposals: Proposal dicts with 'vendor_name', 'price', 'delivery_time',
+                   'warranty', 'parsed_data' and optionally 'id',
+                   'price_currency' and 'proposal_content'
+        weights: 'price', 'delivery', 'warranty' and 'coverage' weights
+        features: Stored proposal_features per proposal, None to compute
+
+    Returns:
+        dict: Evaluations in the shape AIService.evaluate_proposals returns,
+              keyed by proposal_key() (the proposal id, else the vendor name)
+    """
+    if not proposals:
+        return {}
+
+    rfp_requirements = rfp_requirements or {}
+    weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+    features = build_feature_matrix(rfp_requirements, proposals, features)
+
+    required_days = duration_in_days(rfp_requirements.get('delivery_timeline'))
+    required_months = duration_in_months(rfp_requirements.get('warranty'))
+    best_price = _best(features[:, PRICE], np.min)
+    delivery_target = required_days if not np.isnan(required_days) else _best(features[:, DELIVERY_DAYS], np.min)
+    warranty_target = _best(np.append(features[:, WARRANTY_MONTHS], required_months), np.max)
+
+    scores = np.column_stack([
+        _relative(features[:, PRICE], best_price, lower_is_better=True),
+        _relative(features[:, DELIVERY_DAYS], delivery_target, lower_is_better=True),
+        _relative(features[:, WARRANTY_MONTHS], warranty_target, lower_is_better=False),
+        features[:, ITEM_COVERAGE],
+    ])
+    weight_vector = np.array([weights['price'], weights['delivery'], weights['warranty'], weights['coverage']],
+                             dtype=float)
+    currencies = sorted({
+        price_currency(proposal) for row, proposal in enumerate(proposals)
+        if not np.isnan(features[row, PRICE]) and price_currency(proposal)
+    })
+    if len(currencies) > 1:
+        weight_vector[PRICE] = 0.0
+    overall = 100 * scores @ weight_vector / max(weight_vector.sum(), 1e-9)
+    compliance_weights = weight_vector[1:]
+    compliance = 100 * scores[:, 1:] @ compliance_weights / max(compliance_weights.sum(), 1e-9)
+
+    items = rfp_requirements.get('items') or []
+    evaluations = {}
+    for row, proposal in enumerate(proposals):
+        price, days, months, coverage = features[row]
+        risks = []
+        if np.isnan(price):
+            risks.append('No price quoted')
+        elif len(currencies) > 1:
+            risks.append(f'Prices are quoted in {", ".join(currencies)}, so price was not compared')
+        if np.isnan(days):
+            risks.append('No delivery time given')
+        elif not np.isnan(required_days) and days > required_days:
+            risks.append(f'Delivery in {days:g} days exceeds the required {required_days:g} days')
+        if not np.isnan(required_months) and (np.isnan(months) or months < required_months):
+            risks.append('Warranty shorter than required')
+        if items and coverage < 1:
+            risks.append(f'Mentions {round(coverage * len(items))} of {len(items)} requested items')
+
+        evaluations[proposal_key(proposal)] = {
+            'vendor_name': proposal.get('vendor_name'),
+            'compliance_score': round(float(compliance[row]), 1),
+            'price_competitiveness': None if len(currencies) > 1 else round(float(100 * scores[row, 0]), 1),
+            'risk_assessment': '; '.join(risks),
+            'score': round(float(overall[row]), 1),
+            'notes': '',
+            'features': {
+                'price': None if np.isnan(price) else float(price),
+                'delivery_days': None if np.isnan(days) else float(days),
+                'warranty_months': None if np.isnan(months) else float(months),
+                'item_coverage': float(coverage),
+            },
+            'scored_by': 'rules',
+        }
+    return evaluations
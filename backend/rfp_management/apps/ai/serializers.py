@@ -0,0 +1,15 @@
+"""AI app - serializers"""
+from rest_framework import serializers
+from .models import AIJob
+
+
+class AIJobSerializer(serializers.ModelSerializer):
+    error = serializers.CharField(source='last_error', read_only=True)
+
+    class Meta:
+        model = AIJob
+        fields = [
+            'id', 'kind', 'status', 'attempts', 'result', 'error',
+            'created_at', 'started_at', 'finished_at'
+        ]
+        read_only_fields = fields
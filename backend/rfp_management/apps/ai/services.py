@@ -1,9 +1,154 @@
 """AI Services - Integration with Ollama for NLP tasks"""
 import os
 import json
+import hashlib
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 import ollama
 import re
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, connection, transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+from .extraction import extract_proposal_fields, is_confident
+from .scoring import proposal_key, score_proposals as score_locally
+
+
+# Default priority per job kind: jobs someone is waiting on over the API run
+# first, and parsing runs before the evaluations it feeds
+AI_JOB_PRIORITIES = {
+    'PARSE_RFP_TEXT': 20,
+    'CREATE_RFP': 20,
+    'PARSE_PROPOSAL_TEXT': 20,
+    'EVALUATE_PROPOSALS': 20,
+    'PARSE_PROPOSAL': 10,
+    'EVALUATE_RFP': 0,
+}
+
+
+class LLMResponseCache:
+    """
+    Persistent, content-addressed cache for Ollama chat completions.
+
+    Entries live in the ``llm_cache`` table so they survive restarts and are
+    shared between processes. Expired entries (``LLM_CACHE_TTL``) are dropped
+    on read and write, and the least recently used entries are evicted once
+    the table grows past ``LLM_CACHE_MAX_ENTRIES``.
+    """
+
+    _stats = {'hits': 0, 'misses': 0}
+    _stats_lock = threading.Lock()
+
+    def __init__(self):
+        self.enabled = getattr(settings, 'LLM_CACHE_ENABLED', True)
+        self.ttl = getattr(settings, 'LLM_CACHE_TTL', 86400)
+        self.max_entries = getattr(settings, 'LLM_CACHE_MAX_ENTRIES', 1000)
+        self.disabled_methods = set(getattr(settings, 'LLM_CACHE_DISABLED_METHODS', []))
+
+    @staticmethod
+    def make_key(model: str, system_prompt: str, prompt: str) -> str:
+        """Build the cache key for a (model, system prompt, user prompt) triple"""
+        payload = json.dumps([model, system_prompt, prompt])
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def is_enabled_for(self, method: str) -> bool:
+        """Whether responses for the given AIService method may be cached"""
+        return self.enabled and method not in self.disabled_methods
+
+    def get(self, key: str):
+        """
+        Look up a cached response.
+
+        Returns:
+            str or None: Cached response text, or None on a miss
+        """
+        from .models import LLMCacheEntry
+
+        entry = LLMCacheEntry.objects.filter(key=key).only('id', 'response', 'created_at').first()
+        if entry and entry.created_at < timezone.now() - timedelta(seconds=self.ttl):
+            entry.delete()
+            entry = None
+
+        if entry is None:
+            self._record('misses')
+            return None
+
+        LLMCacheEntry.objects.filter(id=entry.id).update(
+            hit_count=F('hit_count') + 1,
+            last_accessed_at=timezone.now()
+        )
+        self._record('hits')
+        return entry.response
+
+    def set(self, key: str, model: str, method: str, response: str) -> None:
+        """Store a response and apply TTL and size based eviction"""
+        from .models import LLMCacheEntry
+
+        LLMCacheEntry.objects.update_or_create(
+            key=key,
+            defaults={
+                'model': model,
+                'method': method,
+                'response': response,
+                'hit_count': 0,
+                'last_accessed_at': timezone.now(),
+            }
+        )
+        self.evict()
+
+    def delete(self, key: str) -> None:
+        """Drop a single entry, e.g. when its response turned out to be unusable"""
+        from .models import LLMCacheEntry
+
+        LLMCacheEntry.objects.filter(key=key).delete()
+
+    def evict(self) -> int:
+        """
+        Remove expired entries and trim the table to ``max_entries``.
+
+        Returns:
+            int: Number of entries removed
+        """
+        from .models import LLMCacheEntry
+
+        cutoff = timezone.now() - timedelta(seconds=self.ttl)
+        removed, _ = LLMCacheEntry.objects.filter(created_at__lt=cutoff).delete()
+
+        stale_ids = list(
+            LLMCacheEntry.objects.order_by('-last_accessed_at')
+            .values_list('id', flat=True)[self.max_entries:]
+        )
+        if stale_ids:
+            removed += LLMCacheEntry.objects.filter(id__in=stale_ids).delete()[0]
+        return removed
+
+    def stats(self) -> dict:
+        """Hit/miss counters for this process plus totals for the shared table"""
+        from .models import LLMCacheEntry
+
+        with self._stats_lock:
+            hits, misses = self._stats['hits'], self._stats['misses']
+        lookups = hits + misses
+        return {
+            'enabled': self.enabled,
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / lookups, 4) if lookups else 0.0,
+            'entries': LLMCacheEntry.objects.count(),
+            'total_hits': LLMCacheEntry.objects.aggregate(total=Sum('hit_count'))['total'] or 0,
+            'max_entries': self.max_entries,
+            'ttl': self.ttl,
+            'disabled_methods': sorted(self.disabled_methods),
+        }
+
+    @classmethod
+    def _record(cls, counter: str) -> None:
+        with cls._stats_lock:
+            cls._stats[counter] += 1
 
 
 class AIService:
@@ -12,17 +157,159 @@ class AIService:
     def __init__(self):
         """Initialize Ollama client"""
         self.model = os.getenv('OLLAMA_MODEL', 'tinyllama')
+        self.cache = LLMResponseCache()
+        self._last_cache_key = None
 
-    def parse_natural_language_to_rfp(self, natural_language_input: str) -> dict:
+    def _chat(self, method: str, system_prompt: str, prompt: str, use_cache: bool = True) -> str:
+        """
+        Run a chat completion, serving repeated prompts from the response cache.
+
+        Args:
+            method: Name of the calling AIService method (used for opt-out)
+            system_prompt: System message content
+            prompt: User message content
+            use_cache: Set to False to bypass the cache for this call
+
+        Returns:
+            str: Raw message content returned by the model
+        """
+        use_cache = use_cache and self.cache.is_enabled_for(method)
+        key = self.cache.make_key(self.model, system_prompt, prompt)
+        self._last_cache_key = key if use_cache else None
+
+        if use_cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        response = ollama.chat(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": prompt}
+            ]
+        )
+        content = response['message']['content']
+
+        if use_cache:
+            self.cache.set(key, self.model, method, content)
+        return content
+
+    def _chat_stream(self, method: str, system_prompt: str, prompt: str, use_cache: bool = True):
+        """
+        Stream a chat completion token by token.
+
+        A cached response is replayed as a single chunk. The full completion
+        is cached once the stream has been consumed to the end.
+
+        Yields:
+            str: Pieces of message content as the model produces them
+        """
+        use_cache = use_cache and self.cache.is_enabled_for(method)
+        key = self.cache.make_key(self.model, system_prompt, prompt)
+        self._last_cache_key = key if use_cache else None
+
+        if use_cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                yield cached
+                return
+
+        pieces = []
+        for chunk in ollama.chat(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": prompt}
+            ],
+            stream=True
+        ):
+            piece = chunk['message']['content']
+            if piece:
+                pieces.append(piece)
+                yield piece
+
+        if use_cache:
+            self.cache.set(key, self.model, method, ''.join(pieces))
+
+    def _stream_result(self, method: str, system_prompt: str, prompt: str, parse_response,
+                       use_cache: bool = True):
+        """
+        Stream tokens, then the parsed result of the whole completion.
+
+        Yields:
+            tuple: ('token', str) for every piece of output, then one
+                   ('result', parsed value)
+        """
+        pieces = []
+        for piece in self._chat_stream(method, system_prompt, prompt, use_cache=use_cache):
+            pieces.append(piece)
+            yield 'token', piece
+
+        try:
+            yield 'result', parse_response(''.join(pieces))
+        except json.JSONDecodeError as e:
+            self._discard_cached_response()
+            raise ValueError(f"Failed to parse AI response as JSON: {str(e)}")
+
+    @staticmethod
+    def _extract_json(response_text: str) -> dict:
+        """Parse the JSON object in a model response, ignoring any text around it"""
+        response_text = response_text.strip()
+        json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
+        if json_match:
+            return json.loads(json_match.group())
+        return json.loads(response_text)
+
+    def _discard_cached_response(self) -> None:
+        """Forget the last cached response so an invalid completion is not replayed"""
+        if self._last_cache_key:
+            self.cache.delete(self._last_cache_key)
+            self._last_cache_key = None
+
+    def parse_natural_language_to_rfp(self, natural_language_input: str, use_cache: bool = True) -> dict:
         """
         Parse natural language input into structured RFP data.
         
         Args:
             natural_language_input: User's description of procurement needs
+            use_cache: Set to False to skip the LLM response cache
             
         Returns:
             dict: Structured RFP with title, requirements, budget, deadline
         """
+        system_prompt, prompt = self._rfp_prompt(natural_language_input)
+
+        try:
+            response_text = self._chat(
+                'parse_natural_language_to_rfp',
+                system_prompt,
+                prompt,
+                use_cache=use_cache
+            )
+            return self._parse_rfp_response(response_text)
+
+        except json.JSONDecodeError as e:
+            self._discard_cached_response()
+            raise ValueError(f"Failed to parse AI response as JSON: {str(e)}")
+        except Exception as e:
+            raise Exception(f"Error parsing natural language to RFP: {str(e)}")
+
+    def stream_natural_language_to_rfp(self, natural_language_input: str, use_cache: bool = True):
+        """
+        Streaming variant of parse_natural_language_to_rfp.
+        
+        Yields:
+            tuple: ('token', str) pieces, then ('result', dict) with the structured RFP
+        """
+        system_prompt, prompt = self._rfp_prompt(natural_language_input)
+        return self._stream_result(
+            'parse_natural_language_to_rfp', system_prompt, prompt,
+            self._parse_rfp_response, use_cache=use_cache
+        )
+
+    def _rfp_prompt(self, natural_language_input: str) -> tuple:
+        """(system prompt, user prompt) for structuring an RFP"""
         prompt = f"""
 You are an expert procurement manager. Convert the following natural language procurement need into a structured RFP format.
 
@@ -55,56 +342,53 @@ Return ONLY a valid JSON object with this exact structure:
 Do not add extra fields or explanations. Just the JSON.
 """
 
-        try:
-            response = ollama.chat(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are an expert RFP analyst. Always return valid JSON."},
-                    {"role": "user", "content": prompt}
-                ]
-            )
+        return "You are an expert RFP analyst. Always return valid JSON.", prompt
 
-            response_text = response['message']['content'].strip()
-            
-            # Remove any prefix like "JSON Response:" 
-            if '{' in response_text:
-                start_idx = response_text.find('{')
-                response_text = response_text[start_idx:]
-            
-            # Extract JSON from response
-            json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-            if json_match:
-                rfp_data = json.loads(json_match.group())
-            else:
-                rfp_data = json.loads(response_text)
-            
-            # Ensure deadline is in correct format
-            if rfp_data.get('deadline') and rfp_data['deadline'] != 'null':
-                try:
-                    deadline_obj = datetime.strptime(rfp_data['deadline'], '%Y-%m-%d')
-                    rfp_data['deadline'] = deadline_obj.isoformat()
-                except:
-                    rfp_data['deadline'] = (datetime.now() + timedelta(days=30)).isoformat()
-            else:
+    def _parse_rfp_response(self, response_text: str) -> dict:
+        """Turn the model's RFP JSON into a dict with an ISO formatted deadline"""
+        response_text = response_text.strip()
+
+        # Remove any prefix like "JSON Response:" 
+        if '{' in response_text:
+            start_idx = response_text.find('{')
+            response_text = response_text[start_idx:]
+        
+        rfp_data = self._extract_json(response_text)
+        
+        # Ensure deadline is in correct format
+        if rfp_data.get('deadline') and rfp_data['deadline'] != 'null':
+            try:
+                deadline_obj = datetime.strptime(rfp_data['deadline'], '%Y-%m-%d')
+                rfp_data['deadline'] = deadline_obj.isoformat()
+            except:
                 rfp_data['deadline'] = (datetime.now() + timedelta(days=30)).isoformat()
+        else:
+            rfp_data['deadline'] = (datetime.now() + timedelta(days=30)).isoformat()
 
-            return rfp_data
+        return rfp_data
 
-        except json.JSONDecodeError as e:
-            raise ValueError(f"Failed to parse AI response as JSON: {str(e)}")
-        except Exception as e:
-            raise Exception(f"Error parsing natural language to RFP: {str(e)}")
-
-    def parse_proposal(self, proposal_content: str) -> dict:
+    def parse_proposal(self, proposal_content: str, use_cache: bool = True, use_rules: bool = True) -> dict:
         """
         Parse vendor proposal email/content into structured data.
         
+        Routine replies are answered by the rule-based extractor without an
+        LLM call when every field clears AI_RULE_EXTRACTION_THRESHOLD; their
+        result carries the per-field 'confidence' scores. Only ambiguous
+        content is sent to the model.
+        
         Args:
             proposal_content: Raw email body or proposal text
+            use_cache: Set to False to skip the LLM response cache
+            use_rules: Set to False to always ask the model
             
         Returns:
             dict: Structured proposal data with price, delivery, warranty, etc.
         """
+        if use_rules and getattr(settings, 'AI_RULE_EXTRACTION_ENABLED', True):
+            extraction = extract_proposal_fields(proposal_content)
+            if is_confident(extraction, getattr(settings, 'AI_RULE_EXTRACTION_THRESHOLD', 0.8)):
+                return {**extraction['data'], 'extracted_by': 'rules', 'confidence': extraction['confidence']}
+
         prompt = f"""
 You are an expert at parsing vendor proposals. Extract key information from the following vendor proposal:
 
@@ -132,43 +416,282 @@ Return ONLY a valid JSON object with this structure:
 """
 
         try:
-            response = ollama.chat(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are an expert proposal parser. Always return valid JSON."},
-                    {"role": "user", "content": prompt}
-                ]
+            response_text = self._chat(
+                'parse_proposal',
+                "You are an expert proposal parser. Always return valid JSON.",
+                prompt,
+                use_cache=use_cache
             )
-
-            response_text = response['message']['content'].strip()
-            
-            # Extract JSON from response
-            json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-            if json_match:
-                proposal_data = json.loads(json_match.group())
-            else:
-                proposal_data = json.loads(response_text)
-
-            return proposal_data
+            return self._extract_json(response_text)
 
         except json.JSONDecodeError as e:
+            self._discard_cached_response()
             raise ValueError(f"Failed to parse proposal as JSON: {str(e)}")
         except Exception as e:
             raise Exception(f"Error parsing proposal: {str(e)}")
 
-    def evaluate_proposals(self, rfp_requirements: dict, proposals: list) -> dict:
+    def evaluate_proposals(self, rfp_requirements: dict, proposals: list, use_cache: bool = True) -> dict:
         """
         Evaluate multiple proposals against RFP requirements and provide recommendations.
         
         Args:
             rfp_requirements: The original RFP requirements
             proposals: List of parsed proposals from vendors
+            use_cache: Set to False to skip the LLM response cache
             
         Returns:
             dict: Evaluation with scores, summary, and recommendation
         """
+        if getattr(settings, 'AI_LOCAL_SCORING', True):
+            evaluations = self.score_proposals(rfp_requirements, proposals)
+            return self.summarize_evaluations(rfp_requirements, proposals, evaluations, use_cache)
+
+        chunk_size = getattr(settings, 'AI_EVALUATION_CHUNK_SIZE', 8)
+        if chunk_size and len(proposals) > chunk_size:
+            return self._evaluate_in_chunks(rfp_requirements, proposals, chunk_size, use_cache)
+
+        system_prompt, prompt = self._evaluation_prompt(rfp_requirements, proposals)
+
+        try:
+            response_text = self._chat(
+                'evaluate_proposals',
+                system_prompt,
+                prompt,
+                use_cache=use_cache
+            )
+            return self._extract_json(response_text)
+
+        except json.JSONDecodeError as e:
+            self._discard_cached_response()
+            raise ValueError(f"Failed to parse evaluation as JSON: {str(e)}")
+        except Exception as e:
+            raise Exception(f"Error evaluating proposals: {str(e)}")
+
+    def stream_evaluate_proposals(self, rfp_requirements: dict, proposals: list, use_cache: bool = True):
+        """
+        Streaming variant of evaluate_proposals.
+        
+        Yields:
+            tuple: ('token', str) pieces, then ('result', dict) with the
+                   evaluation. Chunked evaluations first send one
+                   ('progress', dict) per scored group and then stream the
+                   final summary step. With AI_LOCAL_SCORING only the
+                   summary is streamed.
+        """
+        if getattr(settings, 'AI_LOCAL_SCORING', True):
+            evaluations = self.score_proposals(rfp_requirements, proposals)
+            return self._stream_summary(rfp_requirements, proposals, evaluations, use_cache)
+
+        chunk_size = getattr(settings, 'AI_EVALUATION_CHUNK_SIZE', 8)
+        if chunk_size and len(proposals) > chunk_size:
+            return self._stream_chunked_evaluation(rfp_requirements, proposals, chunk_size, use_cache)
+
+        system_prompt, prompt = self._evaluation_prompt(rfp_requirements, proposals)
+        return self._stream_result(
+            'evaluate_proposals', system_prompt, prompt,
+            self._extract_json, use_cache=use_cache
+        )
+
+    def score_proposals(self, rfp_requirements: dict, proposals: list, features: list = None,
+                        use_cache: bool = True) -> dict:
+        """
+        Score proposals without writing the summary and recommendation.
+        
+        Args:
+            rfp_requirements: The original RFP requirements
+            proposals: List of parsed proposals from vendors
+            features: Stored scoring features per proposal (local scoring only)
+            use_cache: Set to False to skip the LLM response cache
+            
+        Returns:
+            dict: Per-vendor evaluations
+        """
+        if getattr(settings, 'AI_LOCAL_SCORING', True):
+            return score_locally(rfp_requirements, proposals, getattr(settings, 'AI_SCORING_WEIGHTS', None), features)
+
+        chunk_size = getattr(settings, 'AI_EVALUATION_CHUNK_SIZE', 8) or len(proposals)
+        evaluations = {}
+        for chunk_evaluations in self._map_evaluations(rfp_requirements, proposals, chunk_size, use_cache):
+            evaluations.update(chunk_evaluations)
+        return evaluations
+
+    def _evaluate_in_chunks(self, rfp_requirements: dict, proposals: list, chunk_size: int,
+                            use_cache: bool = True) -> dict:
+        """
+        Map-reduce evaluation for RFPs with many proposals.
+        
+        Proposals are scored in groups of ``chunk_size`` (several groups at
+        once, up to AI_EVALUATION_MAX_PARALLEL), then a final call writes the
+        summary and recommendation from compact per-vendor results, so no
+        prompt grows with the number of proposals beyond
+        AI_EVALUATION_REDUCE_LIMIT vendors.
+        """
+        evaluations = {}
+        for chunk_evaluations in self._map_evaluations(rfp_requirements, proposals, chunk_size, use_cache):
+            evaluations.update(chunk_evaluations)
+
+        return self.summarize_evaluations(rfp_requirements, proposals, evaluations, use_cache)
+
+    def summarize_evaluations(self, rfp_requirements: dict, proposals: list, evaluations: dict,
+                               use_cache: bool = True) -> dict:
+        """
+        Ask for the summary and recommendation of already scored proposals.
+        
+        Returns:
+            dict: 'evaluations' as given, 'summary' and 'recommendation'
+        """
+        system_prompt, prompt = self._reduce_prompt(rfp_requirements, proposals, evaluations)
+        try:
+            response_text = self._chat('evaluate_proposals_reduce', system_prompt, prompt, use_cache=use_cache)
+            reduced = self._extract_json(response_text)
+        except json.JSONDecodeError as e:
+            self._discard_cached_response()
+            raise ValueError(f"Failed to parse evaluation summary as JSON: {str(e)}")
+        except Exception as e:
+            raise Exception(f"Error summarising proposal evaluations: {str(e)}")
+
+        return {
+            'evaluations': evaluations,
+            'summary': reduced.get('summary', ''),
+            'recommendation': reduced.get('recommendation', '')
+        }
+
+    def _stream_chunked_evaluation(self, rfp_requirements: dict, proposals: list, chunk_size: int,
+                                   use_cache: bool = True):
+        """Streaming counterpart of _evaluate_in_chunks"""
+        chunks = (len(proposals) + chunk_size - 1) // chunk_size
+        evaluations = {}
+        for done, chunk_evaluations in enumerate(
+            self._map_evaluations(rfp_requirements, proposals, chunk_size, use_cache), start=1
+        ):
+            evaluations.update(chunk_evaluations)
+            yield 'progress', {'chunks_done': done, 'chunks': chunks}
+
+        yield from self._stream_summary(rfp_requirements, proposals, evaluations, use_cache)
+
+    def _stream_summary(self, rfp_requirements: dict, proposals: list, evaluations: dict,
+                        use_cache: bool = True):
+        """Streaming counterpart of summarize_evaluations"""
+        system_prompt, prompt = self._reduce_prompt(rfp_requirements, proposals, evaluations)
+        for event, data in self._stream_result(
+            'evaluate_proposals_reduce', system_prompt, prompt, self._extract_json, use_cache=use_cache
+        ):
+            if event == 'result':
+                data = {
+                    'evaluations': evaluations,
+                    'summary': data.get('summary', ''),
+                    'recommendation': data.get('recommendation', '')
+                }
+            yield event, data
+
+    def _map_evaluations(self, rfp_requirements: dict, proposals: list, chunk_size: int,
+                         use_cache: bool = True):
+        """
+        Score proposals in groups, several groups in parallel.
+        
+        Yields:
+            dict: Per-vendor evaluations of one group, as groups finish
+        """
+        chunks = [proposals[start:start + chunk_size] for start in range(0, len(proposals), chunk_size)]
+        workers = max(1, min(getattr(settings, 'AI_EVALUATION_MAX_PARALLEL', 2), len(chunks)))
+
+        def evaluate_chunk(chunk):
+            try:
+                # A separate instance per call keeps the cache bookkeeping thread-local
+                return type(self)()._score_chunk(rfp_requirements, chunk, use_cache=use_cache)
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(evaluate_chunk, chunk) for chunk in chunks]
+            for future in as_completed(futures):
+                yield future.result()
+
+    def _score_chunk(self, rfp_requirements: dict, proposals: list, use_cache: bool = True) -> dict:
+        """
+        Score one group of proposals with the model.
+        
+        Only the per-vendor scores are asked for; the summary and
+        recommendation are written once over all groups by _reduce_prompt.
+        
+        Returns:
+            dict: Per-vendor evaluations
+        """
+        system_prompt, prompt = self._evaluation_prompt(rfp_requirements, proposals, summarize=False)
+        try:
+            response_text = self._chat('evaluate_proposals', system_prompt, prompt, use_cache=use_cache)
+            return self._extract_json(response_text).get('evaluations', {})
+        except json.JSONDecodeError as e:
+            self._discard_cached_response()
+            raise ValueError(f"Failed to parse proposal scores as JSON: {str(e)}")
+        except Exception as e:
+            raise Exception(f"Error scoring proposals: {str(e)}")
+
+    def _reduce_prompt(self, rfp_requirements: dict, proposals: list, evaluations: dict) -> tuple:
+        """(system prompt, user prompt) for summarising per-vendor evaluations"""
+        vendors = []
+        for proposal in proposals:
+            # Local scores are keyed by proposal, the model's by vendor name
+            vendor_eval = evaluations.get(proposal_key(proposal)) or evaluations.get(proposal.get('vendor_name'), {})
+            vendors.append({
+                'vendor_name': proposal.get('vendor_name'),
+                'price': proposal.get('price'),
+                'delivery_time': proposal.get('delivery_time'),
+                'warranty': proposal.get('warranty'),
+                'score': vendor_eval.get('score'),
+                'compliance_score': vendor_eval.get('compliance_score'),
+                'price_competitiveness': vendor_eval.get('price_competitiveness'),
+                'risk': str(vendor_eval.get('risk_assessment', ''))[:200],
+            })
+
+        def score(vendor):
+            try:
+                return float(vendor['score'])
+            except (TypeError, ValueError):
+                return float('-inf')
+
+        vendors.sort(key=score, reverse=True)
+        limit = getattr(settings, 'AI_EVALUATION_REDUCE_LIMIT', 20)
+        omitted = max(0, len(vendors) - limit)
+        vendors_json = json.dumps(vendors[:limit], separators=(',', ':'), default=str)
+        requirements_json = json.dumps(rfp_requirements, separators=(',', ':'), default=str)
+
+        prompt = f"""
+You are an expert procurement evaluator. Vendor proposals for an RFP have already been scored individually.
+
+RFP Requirements:
+{requirements_json}
+
+Scored proposals (highest score first):
+{vendors_json}
+{f"{omitted} further proposals scored lower and are not listed." if omitted else ""}
+
+Provide:
+1. Summary: Brief overview of all proposals
+2. Recommendation: Which vendor to award, and why?
+
+Return ONLY a valid JSON object with this structure:
+{{
+    "summary": "Overall summary of proposals",
+    "recommendation": "Recommended vendor and rationale"
+}}
+"""
+        return "You are an expert procurement evaluator. Always return valid JSON.", prompt
+
+    def _evaluation_prompt(self, rfp_requirements: dict, proposals: list, summarize: bool = True) -> tuple:
+        """(system prompt, user prompt) for scoring proposals; summarize=False leaves out the summary and recommendation"""
+        # Raw email bodies are only needed by the local scorer
+        proposals = [{k: v for k, v in p.items() if k != 'proposal_content'} for p in proposals]
         proposals_json = json.dumps(proposals, indent=2, default=str)
         requirements_json = json.dumps(rfp_requirements, indent=2, default=str)
+        summary_task = """
+Then provide:
+5. Summary: Brief overview of all proposals
+6. Recommendation: Which vendor to award, and why?
+""" if summarize else ""
+        summary_fields = ''',
+    "summary": "Overall summary of proposals",
+    "recommendation": "Recommended vendor and rationale"''' if summarize else ""
 
         prompt = f"""
 You are an expert procurement evaluator. Compare the following vendor proposals against the RFP requirements.
@@ -184,11 +707,7 @@ For each proposal, provide:
 2. Price Competitiveness Score (0-100): How competitive is the pricing?
 3. Risk Assessment: Any risks or concerns?
 4. Overall Score (0-100): Combined evaluation
-
-Then provide:
-5. Summary: Brief overview of all proposals
-6. Recommendation: Which vendor to award, and why?
-
+{summary_task}
 Return ONLY a valid JSON object with this structure:
 {{
     "evaluations": {{
@@ -200,48 +719,54 @@ Return ONLY a valid JSON object with this structure:
             "notes": "string"
         }},
         ...
-    }},
-    "summary": "Overall summary of proposals",
-    "recommendation": "Recommended vendor and rationale"
+    }}{summary_fields}
 }}
 """
 
-        try:
-            response = ollama.chat(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are an expert procurement evaluator. Always return valid JSON."},
-                    {"role": "user", "content": prompt}
-                ]
-            )
-
-            response_text = response['message']['content'].strip()
-            
-            # Extract JSON from response
-            json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-            if json_match:
-                evaluation_data = json.loads(json_match.group())
-            else:
-                evaluation_data = json.loads(response_text)
+        return "You are an expert procurement evaluator. Always return valid JSON.", prompt
 
-            return evaluation_data
-
-        except json.JSONDecodeError as e:
-            raise ValueError(f"Failed to parse evaluation as JSON: {str(e)}")
-        except Exception as e:
-            raise Exception(f"Error evaluating proposals: {str(e)}")
-
-    def generate_rfp_email_body(self, rfp_title: str, rfp_requirements: dict) -> str:
+    def generate_rfp_email_body(self, rfp_title: str, rfp_requirements: dict, use_cache: bool = True) -> str:
         """
         Generate a professional RFP email body from structured RFP data.
         
         Args:
             rfp_title: Title of the RFP
             rfp_requirements: Structured requirements dict
+            use_cache: Set to False to skip the LLM response cache
             
         Returns:
             str: Formatted email body
         """
+        system_prompt, prompt = self._email_prompt(rfp_title, rfp_requirements)
+
+        try:
+            response_text = self._chat(
+                'generate_rfp_email_body',
+                system_prompt,
+                prompt,
+                use_cache=use_cache
+            ).strip()
+
+            return response_text
+
+        except Exception as e:
+            raise Exception(f"Error generating RFP email: {str(e)}")
+
+    def stream_rfp_email_body(self, rfp_title: str, rfp_requirements: dict, use_cache: bool = True):
+        """
+        Streaming variant of generate_rfp_email_body.
+        
+        Yields:
+            tuple: ('token', str) pieces, then ('result', str) with the whole email body
+        """
+        system_prompt, prompt = self._email_prompt(rfp_title, rfp_requirements)
+        return self._stream_result(
+            'generate_rfp_email_body', system_prompt, prompt,
+            str.strip, use_cache=use_cache
+        )
+
+    def _email_prompt(self, rfp_title: str, rfp_requirements: dict) -> tuple:
+        """(system prompt, user prompt) for writing the RFP email"""
         requirements_json = json.dumps(rfp_requirements, indent=2, default=str)
 
         prompt = f"""
@@ -259,20 +784,320 @@ The email should:
 4. Request specific information in the response
 5. Include contact information placeholder
 6. Be professional and clear
+7. Use the placeholders [Contact Person] and [Vendor Name] wherever the recipient is named
 
 Return ONLY the email body text, no subject line.
 """
 
-        try:
-            response = ollama.chat(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are an expert at writing professional RFP emails."},
-                    {"role": "user", "content": prompt}
-                ]
+        return "You are an expert at writing professional RFP emails.", prompt
+
+
+def enqueue_ai_jobs(kind: str, target_ids: list, priority: int = None, delay: float = 0,
+                    payload: dict = None) -> list:
+    """
+    Queue AI jobs, coalescing with jobs already waiting for the same target.
+
+    Args:
+        kind: One of the AIJob kinds, e.g. 'PARSE_PROPOSAL' or 'EVALUATE_RFP'
+        target_ids: Proposal IDs or RFP IDs (see AIJob.target_id)
+        priority: Overrides the kind's default priority; a waiting job is
+                  only ever raised to a higher priority (and made due sooner)
+        delay: Seconds before a newly created job becomes due
+        payload: Handler input, also applied to a waiting job
+
+    Returns:
+        list: The pending AIJob for each target
+    """
+    from .models import AIJob
+
+    target_ids = list(dict.fromkeys(str(target_id) for target_id in target_ids))
+    if not target_ids:
+        return []
+
+    if priority is None:
+        priority = AI_JOB_PRIORITIES.get(kind, 0)
+    run_after = timezone.now() + timedelta(seconds=delay)
+
+    AIJob.objects.bulk_create([
+        AIJob(kind=kind, target_id=target_id, priority=priority, run_after=run_after, payload=payload or {})
+        for target_id in target_ids
+    ], ignore_conflicts=True)
+
+    pending = AIJob.objects.filter(kind=kind, target_id__in=target_ids, status='PENDING')
+    pending.filter(priority__lt=priority).update(priority=priority, updated_at=timezone.now())
+    pending.filter(run_after__gt=run_after).update(run_after=run_after, updated_at=timezone.now())
+    if payload is not None:
+        pending.exclude(payload=payload).update(payload=payload, updated_at=timezone.now())
+    return list(pending)
+
+
+def enqueue_ai_request(kind: str, payload: dict, coalesce: bool = True):
+    """
+    Queue an AI job on behalf of an API request.
+
+    Args:
+        kind: Job kind
+        payload: Handler input
+        coalesce: Share one job between identical waiting requests; set to
+                  False for jobs with side effects such as CREATE_RFP
+
+    Returns:
+        AIJob: The pending job
+    """
+    if coalesce:
+        target_id = hashlib.sha256(
+            json.dumps(payload, sort_keys=True, default=str).encode('utf-8')
+        ).hexdigest()
+    else:
+        target_id = uuid.uuid4().hex
+    return enqueue_ai_jobs(kind, [target_id], payload=payload)[0]
+
+
+class AIJobWorker:
+    """
+    Runs queued AI jobs: parses received proposals and re-scores RFPs.
+
+    Any number of workers can run side by side. Jobs are claimed
+    (PENDING -> RUNNING) with a conditional update, highest priority first,
+    and each kind is limited to AI_JOB_CONCURRENCY running jobs across all
+    workers. While a job runs, a heartbeat keeps its claim fresh, so only
+    jobs of a worker that died are released after AI_JOB_CLAIM_TIMEOUT.
+    Failed jobs are retried with exponential backoff until
+    AI_JOB_MAX_ATTEMPTS is reached.
+    """
+
+    def __init__(self, kinds: list = None, name: str = None):
+        from .models import AIJob
+
+        self.kinds = kinds or [kind for kind, _ in AIJob._meta.get_field('kind').choices]
+        self.name = name or f'{socket.gethostname()}:{os.getpid()}'
+        self.concurrency = getattr(settings, 'AI_JOB_CONCURRENCY', {})
+        self.max_attempts = getattr(settings, 'AI_JOB_MAX_ATTEMPTS', 3)
+        self.backoff_base = getattr(settings, 'AI_JOB_BACKOFF_BASE', 30)
+        self.backoff_max = getattr(settings, 'AI_JOB_BACKOFF_MAX', 1800)
+        self.claim_timeout = getattr(settings, 'AI_JOB_CLAIM_TIMEOUT', 900)
+
+    def run(self, poll_interval: float = 2, once: bool = False) -> None:
+        """Process jobs until interrupted (or until none is due with once=True)"""
+        while True:
+            close_old_connections()
+            self.release_stale_claims()
+            job = self.claim_next_job()
+            if job is not None:
+                self.run_job(job)
+                continue
+            if once:
+                return
+            time.sleep(poll_interval)
+
+    def claim_next_job(self):
+        """
+        Claim the most urgent due job whose kind is below its concurrency limit.
+
+        Returns:
+            AIJob: The claimed job, or None when nothing can run right now
+        """
+        from .models import AIJob
+
+        now = timezone.now()
+        open_kinds = [kind for kind in self.kinds if self._has_capacity(kind)]
+        if not open_kinds:
+            return None
+
+        candidates = (
+            AIJob.objects.filter(status='PENDING', kind__in=open_kinds, run_after__lte=now)
+            .order_by('-priority', 'run_after', 'id')
+            .values_list('id', 'kind')[:20]
+        )
+        for job_id, kind in candidates:
+            claimed = AIJob.objects.filter(id=job_id, status='PENDING').update(
+                status='RUNNING', worker=self.name, started_at=now, updated_at=now
             )
+            if not claimed:
+                continue  # Taken by another worker
 
-            return response['message']['content'].strip()
+            job = AIJob.objects.get(id=job_id)
+            # Another worker may have claimed the same kind concurrently
+            if self._running_count(kind) > self._limit(kind):
+                self._requeue(job)
+                return None
+            return job
+        return None
 
+    def run_job(self, job) -> None:
+        """Execute a claimed job and record the outcome"""
+        handler = {
+            'PARSE_PROPOSAL': self.parse_proposal,
+            'EVALUATE_RFP': self.evaluate_rfp,
+            'PARSE_RFP_TEXT': self.parse_rfp_text,
+            'CREATE_RFP': self.create_rfp,
+            'PARSE_PROPOSAL_TEXT': self.parse_proposal_text,
+            'EVALUATE_PROPOSALS': self.evaluate_proposals,
+        }.get(job.kind)
+
+        heartbeat = self._start_heartbeat(job)
+        try:
+            if handler is None:
+                raise LookupError(f'Unknown job kind {job.kind}')
+            result = handler(job)
+        except LookupError as e:
+            self._record_failure(job, str(e), permanent=True)
         except Exception as e:
-            raise Exception(f"Error generating RFP email: {str(e)}")
+            print(f"Error running AI job {job.id} ({job.kind} {job.target_id}): {str(e)}")
+            self._record_failure(job, str(e))
+        else:
+            self._record_success(job, result)
+        finally:
+            heartbeat.set()
+
+    def _start_heartbeat(self, job) -> threading.Event:
+        """
+        Refresh a running job's claim in the background until the returned event is set.
+
+        A single slow LLM call (or a chunked evaluation) can outlast
+        AI_JOB_CLAIM_TIMEOUT, so the claim is renewed three times per timeout
+        rather than between handler steps.
+        """
+        from .models import AIJob
+
+        stop = threading.Event()
+
+        def beat():
+            try:
+                while not stop.wait(self.claim_timeout / 3):
+                    try:
+                        AIJob.objects.filter(id=job.id, status='RUNNING', worker=self.name).update(
+                            updated_at=timezone.now()
+                        )
+                    except Exception as e:
+                        print(f"Error renewing the claim on AI job {job.id}: {str(e)}")
+            finally:
+                connection.close()
+
+        threading.Thread(target=beat, name=f'ai-job-{job.id}-heartbeat', daemon=True).start()
+        return stop
+
+    def parse_proposal(self, job) -> dict:
+        """
+        Job handler: parse a stored proposal (which queues its RFP's evaluation).
+
+        Proposals that were parsed in the meantime are skipped unless the
+        job was requested with {'force': True}.
+        """
+        from rfp_management.apps.proposals.models import Proposal
+        from rfp_management.apps.proposals.serializers import ProposalSerializer
+        from rfp_management.apps.proposals.services import ProposalService
+
+        proposal = Proposal.objects.filter(id=job.target_id).first() if job.target_id.isdigit() else None
+        if proposal is None:
+            raise LookupError(f'Proposal {job.target_id} no longer exists')
+        if proposal.status != 'RECEIVED' and not job.payload.get('force'):
+            return {'skipped': f'Proposal is already {proposal.status}'}
+
+        ProposalService().parse_proposal(proposal)
+        return ProposalSerializer(proposal).data
+
+    def evaluate_rfp(self, job) -> dict:
+        """Job handler: re-score every proposal of an RFP"""
+        from rfp_management.apps.rfps.models import RFP
+        from rfp_management.apps.proposals.models import Proposal
+        from rfp_management.apps.proposals.serializers import ProposalSerializer
+        from rfp_management.apps.proposals.services import ProposalService
+
+        rfp = RFP.objects.filter(id=job.target_id).first() if job.target_id.isdigit() else None
+        if rfp is None:
+            raise LookupError(f'RFP {job.target_id} no longer exists')
+
+        if not Proposal.objects.filter(rfp_id=rfp.id).exists():
+            return {'skipped': 'No proposals found for this RFP'}
+
+        evaluation = ProposalService().evaluate_rfp(rfp)
+        return {
+            'summary': evaluation.get('summary', ''),
+            'recommendation': evaluation.get('recommendation', ''),
+            'proposals': ProposalSerializer(evaluation['proposals'], many=True).data
+        }
+
+    def parse_rfp_text(self, job) -> dict:
+        """Job handler: structure a natural language RFP description"""
+        return AIService().parse_natural_language_to_rfp(job.payload['description'])
+
+    def create_rfp(self, job) -> dict:
+        """Job handler: structure a natural language description and store it as a draft RFP"""
+        from rfp_management.apps.rfps.serializers import RFPSerializer
+        from rfp_management.apps.rfps.services import RFPService
+
+        rfp = RFPService().create_from_natural_language(job.payload['description'])
+        return RFPSerializer(rfp).data
+
+    def parse_proposal_text(self, job) -> dict:
+        """Job handler: extract structured data from submitted proposal text"""
+        return AIService().parse_proposal(job.payload['proposal_content'])
+
+    def evaluate_proposals(self, job) -> dict:
+        """Job handler: score submitted proposals against submitted requirements"""
+        return AIService().evaluate_proposals(job.payload.get('rfp_requirements', {}), job.payload['proposals'])
+
+    def release_stale_claims(self) -> int:
+        """Return jobs stuck in RUNNING without a heartbeat (e.g. after a worker crash) to the queue"""
+        from .models import AIJob
+
+        cutoff = timezone.now() - timedelta(seconds=self.claim_timeout)
+        stale = list(AIJob.objects.filter(status='RUNNING', updated_at__lt=cutoff))
+        for job in stale:
+            self._requeue(job)
+        return len(stale)
+
+    def backoff_delay(self, attempts: int) -> int:
+        """Seconds to wait before retry number ``attempts``"""
+        return min(self.backoff_max, self.backoff_base * (2 ** max(0, attempts - 1)))
+
+    def _limit(self, kind: str) -> int:
+        return max(1, int(self.concurrency.get(kind, 1)))
+
+    def _running_count(self, kind: str) -> int:
+        from .models import AIJob
+
+        return AIJob.objects.filter(status='RUNNING', kind=kind).count()
+
+    def _has_capacity(self, kind: str) -> bool:
+        return self._running_count(kind) < self._limit(kind)
+
+    def _requeue(self, job, **fields) -> None:
+        """
+        Put a job back in the queue.
+
+        If a newer job for the same target is already waiting, this one is
+        closed as superseded instead, since that job will do the same work.
+        """
+        job.status = 'PENDING'
+        job.worker = ''
+        for name, value in fields.items():
+            setattr(job, name, value)
+        try:
+            with transaction.atomic():
+                job.save()
+        except IntegrityError:
+            job.status = 'DONE'
+            job.result = {'superseded': True}
+            job.finished_at = timezone.now()
+            job.save()
+
+    def _record_success(self, job, result: dict) -> None:
+        job.status = 'DONE'
+        job.attempts += 1
+        job.result = result
+        job.last_error = ''
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'attempts', 'result', 'last_error', 'finished_at', 'updated_at'])
+
+    def _record_failure(self, job, error: str, permanent: bool = False) -> None:
+        """Schedule a retry or give up"""
+        job.attempts += 1
+        job.last_error = error
+        if permanent or job.attempts >= self.max_attempts:
+            job.status = 'FAILED'
+            job.finished_at = timezone.now()
+            job.save(update_fields=['status', 'attempts', 'last_error', 'finished_at', 'updated_at'])
+            return
+        self._requeue(job, run_after=timezone.now() + timedelta(seconds=self.backoff_delay(job.attempts)))
@@ -0,0 +1,301 @@
+"""AI app - tests"""
+import json
+import time
+from datetime import timedelta
+from unittest import mock
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from .extraction import extract_delivery_time
+from .models import AIJob, LLMCacheEntry
+from .scoring import build_feature_matrix, duration_in_days, duration_in_months, score_proposals
+from .services import AIJobWorker, AIService, LLMResponseCache, enqueue_ai_jobs
+
+
+class AIJobStatusTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    @override_settings(AI_JOB_MAX_WAIT=0, AI_JOB_POLL_INTERVAL=2)
+    def test_wait_is_capped_and_unfinished_jobs_say_when_to_retry(self):
+        job = AIJob.objects.create(kind='PARSE_RFP_TEXT', target_id='abc')
+
+        started = time.monotonic()
+        response = self.client.get(f'/api/ai/jobs/{job.id}/?wait=60')
+
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertEqual(response.json()['status'], 'PENDING')
+        self.assertEqual(response['Retry-After'], '2')
+
+    def test_finished_jobs_have_no_retry_after(self):
+        job = AIJob.objects.create(kind='PARSE_RFP_TEXT', target_id='abc', status='DONE', result={'ok': True})
+
+        response = self.client.get(f'/api/ai/jobs/{job.id}/?wait=5')
+
+        self.assertEqual(response.json()['result'], {'ok': True})
+        self.assertNotIn('Retry-After', response)
+
+
+@override_settings(LLM_CACHE_ENABLED=True, LLM_CACHE_TTL=60, LLM_CACHE_MAX_ENTRIES=2, LLM_CACHE_DISABLED_METHODS=[])
+class LLMResponseCacheTests(TestCase):
+    def setUp(self):
+        patcher = mock.patch('rfp_management.apps.ai.services.ollama.chat',
+                             return_value={'message': {'content': 'Dear vendor'}})
+        self.chat = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_repeated_prompts_are_answered_from_the_cache(self):
+        service = AIService()
+        for _ in range(3):
+            self.assertEqual(service._chat('generate_rfp_email_body', 'system', 'prompt'), 'Dear vendor')
+        self.assertEqual(self.chat.call_count, 1)
+        self.assertEqual(LLMCacheEntry.objects.get().hit_count, 2)
+
+        service._chat('generate_rfp_email_body', 'system', 'prompt', use_cache=False)
+        service._chat('generate_rfp_email_body', 'system', 'other prompt')
+        self.assertEqual(self.chat.call_count, 3)
+
+    @override_settings(LLM_CACHE_DISABLED_METHODS=['parse_proposal'])
+    def test_disabled_methods_always_ask_the_model(self):
+        service = AIService()
+        service._chat('parse_proposal', 'system', 'prompt')
+        service._chat('parse_proposal', 'system', 'prompt')
+
+        self.assertEqual(self.chat.call_count, 2)
+        self.assertFalse(LLMCacheEntry.objects.exists())
+
+    def test_expired_entries_are_dropped(self):
+        cache = LLMResponseCache()
+        cache.set('old', 'tinyllama', 'parse_proposal', 'stale')
+        LLMCacheEntry.objects.update(created_at=timezone.now() - timedelta(seconds=61))
+
+        self.assertIsNone(cache.get('old'))
+        self.assertFalse(LLMCacheEntry.objects.exists())
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = LLMResponseCache()
+        cache.set('a', 'tinyllama', 'parse_proposal', 'A')
+        cache.set('b', 'tinyllama', 'parse_proposal', 'B')
+        LLMCacheEntry.objects.filter(key='a').update(last_accessed_at=timezone.now() - timedelta(seconds=20))
+        LLMCacheEntry.objects.filter(key='b').update(last_accessed_at=timezone.now() - timedelta(seconds=10))
+        self.assertEqual(cache.get('a'), 'A')  # Now the most recently used
+
+        cache.set('c', 'tinyllama', 'parse_proposal', 'C')
+        self.assertEqual(sorted(LLMCacheEntry.objects.values_list('key', flat=True)), ['a', 'c'])
+
+
+class EventStreamTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def stream(self, pieces):
+        chunks = [{'message': {'content': piece}} for piece in pieces]
+        with mock.patch('rfp_management.apps.ai.services.ollama.chat', return_value=iter(chunks)):
+            response = self.client.post('/api/ai/parse-natural-language/stream/',
+                                        {'description': '20 laptops'}, format='json', HTTP_ACCEPT='text/event-stream')
+            body = b''.join(response.streaming_content).decode()
+        return response, body
+
+    def events(self, body):
+        """(event, data) of every frame after the opening comment"""
+        frames = body.split('\n\n')
+        self.assertEqual((frames[0], frames[-1]), (': stream opened', ''))
+        events = []
+        for frame in frames[1:-1]:
+            event, data = frame.split('\n')
+            events.append((event.removeprefix('event: '), json.loads(data.removeprefix('data: '))))
+        return events
+
+    def test_tokens_are_framed_one_event_each_and_end_with_the_result(self):
+        pieces = ['{"title": "Laptops",\n', '"deadline": "2030-01-31"}']
+        response, body = self.stream(pieces)
+
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertEqual(response['Cache-Control'], 'no-cache')
+        self.assertEqual(response['X-Accel-Buffering'], 'no')
+        events = self.events(body)
+        # A newline inside a token stays inside the JSON string, so it cannot end the frame
+        self.assertEqual(events[:2], [('token', piece) for piece in pieces])
+        self.assertEqual(events[2], ('result', {'title': 'Laptops', 'deadline': '2030-01-31T00:00:00'}))
+        self.assertEqual(len(events), 3)
+
+    def test_invalid_completion_ends_with_an_error_event(self):
+        _, body = self.stream(['not json'])
+
+        event, data = self.events(body)[-1]
+        self.assertEqual(event, 'error')
+        self.assertIn('Failed to parse AI response as JSON', data['error'])
+
+    def test_validation_errors_are_json_even_for_event_stream_clients(self):
+        response = self.client.post('/api/ai/parse-natural-language/stream/', {}, format='json',
+                                    HTTP_ACCEPT='text/event-stream')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(json.loads(response.content), {'error': 'description is required'})
+
+
+class RuleExtractionTests(TestCase):
+    def test_delivery_verbs_in_any_form_are_found(self):
+        for text in ['Ships within 10 business days.', 'We deliver in 10 business days.',
+                     'Delivers within 10 business days.', 'Shipping takes 10 business days.']:
+            self.assertEqual(extract_delivery_time(text), ('10 business days', 0.9), text)
+
+    @override_settings(AI_RULE_EXTRACTION_ENABLED=True, AI_RULE_EXTRACTION_THRESHOLD=0.8)
+    def test_rule_answers_keep_their_confidence(self):
+        result = AIService().parse_proposal(
+            'Total: $48,500. Ships within 10 business days, 2-year warranty, Net 30.', use_cache=False
+        )
+
+        self.assertEqual(result['extracted_by'], 'rules')
+        self.assertEqual(result['delivery_time'], '10 business days')
+        self.assertEqual(set(result['confidence']),
+                         {'price', 'price_currency', 'delivery_time', 'warranty', 'payment_terms'})
+        self.assertGreaterEqual(min(result['confidence'].values()), 0.8)
+
+
+@override_settings(AI_LOCAL_SCORING=False, AI_EVALUATION_CHUNK_SIZE=2, AI_EVALUATION_MAX_PARALLEL=1)
+class ChunkedEvaluationTests(TestCase):
+    def test_groups_are_only_scored_and_the_summary_is_written_once(self):
+        prompts = []
+
+        def chat(service, method, system_prompt, prompt, use_cache=True):
+            prompts.append((method, prompt))
+            if method == 'evaluate_proposals_reduce':
+                return json.dumps({'summary': 'All fine', 'recommendation': 'A'})
+            names = [line.split('"')[3] for line in prompt.splitlines() if '"vendor_name":' in line]
+            return json.dumps({'evaluations': {name: {'score': 50} for name in names}})
+
+        proposals = [{'vendor_name': name, 'price': 100} for name in 'ABC']
+        with mock.patch.object(AIService, '_chat', chat):
+            result = AIService().evaluate_proposals({'title': 'Laptops'}, proposals, use_cache=False)
+
+        self.assertEqual(sorted(result['evaluations']), ['A', 'B', 'C'])
+        self.assertEqual(result['recommendation'], 'A')
+        map_prompts = [prompt for method, prompt in prompts if method == 'evaluate_proposals']
+        self.assertEqual(len(map_prompts), 2)
+        for prompt in map_prompts:
+            self.assertNotIn('recommendation', prompt.lower())
+        self.assertEqual([method for method, _ in prompts].count('evaluate_proposals_reduce'), 1)
+
+
+class LocalScoringTests(TestCase):
+    REQUIREMENTS = {'delivery_timeline': '30 days', 'warranty': '1 year', 'items': [{'name': 'Laptops'}]}
+
+    def proposals(self, **overrides):
+        proposals = [
+            {'id': 1, 'vendor_name': 'Acme', 'price': 50000, 'delivery_time': '2 weeks', 'warranty': '2 years',
+             'parsed_data': {'price_currency': 'USD'}, 'proposal_content': '20 laptops'},
+            {'id': 2, 'vendor_name': 'Globex', 'price': 40000, 'delivery_time': '6 weeks', 'warranty': 'No warranty',
+             'parsed_data': {'price_currency': 'USD'}, 'proposal_content': 'desktops'},
+        ]
+        for index, fields in overrides.items():
+            proposals[int(index[1:])].update(fields)
+        return proposals
+
+    def test_durations_and_feature_matrix(self):
+        self.assertEqual(duration_in_days('2-3 weeks'), 21)
+        self.assertAlmostEqual(duration_in_days('10 business days'), 14)
+        self.assertEqual(duration_in_months('one year'), 12)
+        self.assertEqual(duration_in_months('No warranty'), 0)
+
+        matrix = build_feature_matrix(self.REQUIREMENTS, self.proposals())
+        self.assertEqual(matrix.tolist(), [[50000, 14, 24, 1], [40000, 42, 0, 0]])
+
+    def test_scores_follow_the_weights(self):
+        scores = score_proposals(self.REQUIREMENTS, self.proposals())
+        self.assertEqual(scores['2']['price_competitiveness'], 100)
+        self.assertEqual(scores['1']['price_competitiveness'], 80)
+        self.assertGreater(scores['1']['score'], scores['2']['score'])
+        self.assertIn('Warranty shorter than required', scores['2']['risk_assessment'])
+
+        price_only = score_proposals(self.REQUIREMENTS, self.proposals(),
+                                     weights={'price': 1, 'delivery': 0, 'warranty': 0, 'coverage': 0})
+        self.assertEqual((price_only['1']['score'], price_only['2']['score']), (80, 100))
+
+    def test_mixed_currencies_leave_price_out(self):
+        scores = score_proposals(self.REQUIREMENTS, self.proposals(p1={'price': 3300000, 'price_currency': 'INR'}))
+
+        for evaluation in scores.values():
+            self.assertIsNone(evaluation['price_competitiveness'])
+            self.assertIn('quoted in INR, USD', evaluation['risk_assessment'])
+            # The overall score is made of the other criteria only
+            self.assertEqual(evaluation['score'], evaluation['compliance_score'])
+
+    def test_proposals_are_keyed_by_id_not_vendor_name(self):
+        scores = score_proposals(self.REQUIREMENTS, self.proposals(p1={'vendor_name': 'Acme'}))
+
+        self.assertEqual(sorted(scores), ['1', '2'])
+        self.assertEqual({evaluation['vendor_name'] for evaluation in scores.values()}, {'Acme'})
+        # Proposals without ids (e.g. submitted to /ai/evaluate-proposals/) keep vendor-name keys
+        self.assertEqual(sorted(score_proposals({}, [{'vendor_name': 'Acme', 'price': 1}])), ['Acme'])
+
+
+@override_settings(AI_JOB_CONCURRENCY={'EVALUATE_RFP': 1, 'PARSE_PROPOSAL': 2},
+                   AI_JOB_BACKOFF_BASE=30, AI_JOB_MAX_ATTEMPTS=2)
+class AIJobWorkerTests(TestCase):
+    def setUp(self):
+        self.worker = AIJobWorker(name='worker-1')
+
+    def test_waiting_jobs_coalesce_and_the_most_urgent_is_claimed(self):
+        enqueue_ai_jobs('PARSE_PROPOSAL', ['1', '2'])
+        enqueue_ai_jobs('PARSE_PROPOSAL', ['1'])
+        enqueue_ai_jobs('EVALUATE_RFP', ['9'], priority=15)
+
+        self.assertEqual(AIJob.objects.count(), 3)
+        job = self.worker.claim_next_job()
+        self.assertEqual((job.kind, job.status, job.worker), ('EVALUATE_RFP', 'RUNNING', 'worker-1'))
+
+    def test_each_kind_is_capped_across_workers(self):
+        enqueue_ai_jobs('EVALUATE_RFP', ['1', '2'])
+        self.assertIsNotNone(self.worker.claim_next_job())
+
+        self.assertIsNone(AIJobWorker(name='worker-2').claim_next_job())
+        self.assertEqual(AIJob.objects.filter(status='PENDING').count(), 1)
+
+    def test_failures_back_off_then_give_up(self):
+        [job] = enqueue_ai_jobs('PARSE_RFP_TEXT', ['abc'], payload={'description': 'x'})
+        job = self.worker.claim_next_job()
+        with mock.patch.object(AIJobWorker, 'parse_rfp_text', side_effect=RuntimeError('model offline')):
+            self.worker.run_job(job)
+
+            job.refresh_from_db()
+            self.assertEqual((job.status, job.attempts, job.last_error), ('PENDING', 1, 'model offline'))
+            self.assertGreater(job.run_after, timezone.now() + timedelta(seconds=25))
+            self.assertIsNone(self.worker.claim_next_job())
+
+            AIJob.objects.filter(id=job.id).update(run_after=timezone.now())
+            self.worker.run_job(self.worker.claim_next_job())
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('FAILED', 2))
+
+    def test_claims_without_a_heartbeat_are_released(self):
+        enqueue_ai_jobs('PARSE_PROPOSAL', ['1'])
+        job = self.worker.claim_next_job()
+        AIJob.objects.filter(id=job.id).update(updated_at=timezone.now() - timedelta(seconds=901))
+
+        self.assertEqual(AIJobWorker(name='worker-2').release_stale_claims(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.worker), ('PENDING', ''))
+
+
+class AIJobHeartbeatTests(TransactionTestCase):
+    def test_long_running_job_keeps_its_claim(self):
+        [job] = enqueue_ai_jobs('PARSE_RFP_TEXT', ['abc'], payload={'description': 'x'})
+        worker = AIJobWorker(name='worker-1')
+        worker.claim_timeout = 0.3
+        other = AIJobWorker(name='worker-2')
+        other.claim_timeout = 0.3
+        released = []
+
+        def slow_handler(job):
+            for _ in range(4):
+                time.sleep(0.2)
+                released.append(other.release_stale_claims())
+            return {'ok': True}
+
+        with mock.patch.object(worker, 'parse_rfp_text', slow_handler):
+            worker.run_job(worker.claim_next_job())
+
+        self.assertEqual(released, [0, 0, 0, 0])
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.result), ('DONE', {'ok': True}))
@@ -1,6 +1,10 @@
 """AI app - urls"""
 from django.urls import path
-from .views import AIViewSet
+from rest_framework.renderers import JSONRenderer
+from .views import AIViewSet, EventStreamRenderer
+
+# Streaming endpoints also negotiate ``Accept: text/event-stream``
+stream_renderers = [JSONRenderer, EventStreamRenderer]
 
 ai_view = AIViewSet.as_view({
     'post': 'parse_natural_language'
@@ -8,6 +12,11 @@ ai_view = AIViewSet.as_view({
 
 urlpatterns = [
     path('parse-natural-language/', AIViewSet.as_view({'post': 'parse_natural_language'})),
+    path('parse-natural-language/stream/', AIViewSet.as_view({'post': 'parse_natural_language_stream'}, renderer_classes=stream_renderers)),
     path('parse-proposal/', AIViewSet.as_view({'post': 'parse_proposal'})),
     path('evaluate-proposals/', AIViewSet.as_view({'post': 'evaluate_proposals'})),
+    path('evaluate-proposals/stream/', AIViewSet.as_view({'post': 'evaluate_proposals_stream'}, renderer_classes=stream_renderers)),
+    path('generate-rfp-email/stream/', AIViewSet.as_view({'post': 'generate_rfp_email_stream'}, renderer_classes=stream_renderers)),
+    path('jobs/<int:pk>/', AIViewSet.as_view({'get': 'job'}), name='ai-job-detail'),
+    path('cache-stats/', AIViewSet.as_view({'get': 'cache_stats'})),
 ]
@@ -1,8 +1,72 @@
 """AI app - views"""
-from rest_framework import viewsets, status
+import json
+import math
+import time
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.urls import reverse
+from rest_framework import renderers, viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from .services import AIService
+from .models import AIJob
+from .serializers import AIJobSerializer
+from .services import AIService, LLMResponseCache, enqueue_ai_request
+from rfp_management.apps.rfps.models import RFP
+
+
+def wants_async(request) -> bool:
+    """Whether the client opted in to asynchronous processing (?async=true or Prefer: respond-async)"""
+    if request.query_params.get('async', '').lower() in ('1', 'true', 'yes'):
+        return True
+    return 'respond-async' in request.headers.get('Prefer', '').lower()
+
+
+def job_retry_after() -> str:
+    """Seconds a client should wait before polling an unfinished job again"""
+    return str(max(1, math.ceil(settings.AI_JOB_POLL_INTERVAL)))
+
+
+def job_accepted_response(request, job) -> Response:
+    """202 Accepted pointing the client at the job resource"""
+    url = request.build_absolute_uri(reverse('ai-job-detail', args=[job.id]))
+    return Response(
+        {'job_id': job.id, 'kind': job.kind, 'status': job.status, 'url': url},
+        status=status.HTTP_202_ACCEPTED,
+        headers={'Location': url, 'Retry-After': job_retry_after()}
+    )
+
+
+class EventStreamRenderer(renderers.BaseRenderer):
+    """Lets streaming endpoints accept ``Accept: text/event-stream``; error bodies are rendered as JSON"""
+    media_type = 'text/event-stream'
+    format = 'sse'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return json.dumps(data, default=str).encode('utf-8')
+
+
+def event_stream_response(events) -> StreamingHttpResponse:
+    """
+    Serve (event, data) pairs as Server-Sent Events.
+
+    Each AI stream sends 'token' events with pieces of model output and
+    ends with a 'result' event carrying the validated result, or an 'error'
+    event if generation or validation failed.
+    """
+    def stream():
+        # Sent straight away so clients see the response before the first token
+        yield ': stream opened\n\n'
+        try:
+            for event, data in events:
+                yield f'event: {event}\ndata: {json.dumps(data, default=str)}\n\n'
+        except Exception as e:
+            yield f'event: error\ndata: {json.dumps({"error": str(e)})}\n\n'
+
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Stop nginx from buffering the stream
+    return response
 
 
 class AIViewSet(viewsets.ViewSet):
@@ -19,6 +83,10 @@ class AIViewSet(viewsets.ViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+        if wants_async(request):
+            job = enqueue_ai_request('PARSE_RFP_TEXT', {'description': description})
+            return job_accepted_response(request, job)
+
         try:
             ai_service = AIService()
             result = ai_service.parse_natural_language_to_rfp(description)
@@ -40,6 +108,10 @@ class AIViewSet(viewsets.ViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+        if wants_async(request):
+            job = enqueue_ai_request('PARSE_PROPOSAL_TEXT', {'proposal_content': proposal_content})
+            return job_accepted_response(request, job)
+
         try:
             ai_service = AIService()
             result = ai_service.parse_proposal(proposal_content)
@@ -62,6 +134,12 @@ class AIViewSet(viewsets.ViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+        if wants_async(request):
+            job = enqueue_ai_request(
+                'EVALUATE_PROPOSALS', {'rfp_requirements': rfp_requirements, 'proposals': proposals}
+            )
+            return job_accepted_response(request, job)
+
         try:
             ai_service = AIService()
             result = ai_service.evaluate_proposals(rfp_requirements, proposals)
@@ -71,3 +149,105 @@ class AIViewSet(viewsets.ViewSet):
                 {'error': str(e)},
                 status=status.HTTP_400_BAD_REQUEST
             )
+
+    @action(detail=False, methods=['post'])
+    def parse_natural_language_stream(self, request):
+        """Stream the structuring of a natural language RFP as Server-Sent Events"""
+        description = request.data.get('description', '')
+        
+        if not description:
+            return Response(
+                {'error': 'description is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return event_stream_response(AIService().stream_natural_language_to_rfp(description))
+
+    @action(detail=False, methods=['post'])
+    def evaluate_proposals_stream(self, request):
+        """Stream a proposal evaluation as Server-Sent Events"""
+        rfp_requirements = request.data.get('rfp_requirements', {})
+        proposals = request.data.get('proposals', [])
+        
+        if not proposals:
+            return Response(
+                {'error': 'proposals list is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return event_stream_response(AIService().stream_evaluate_proposals(rfp_requirements, proposals))
+
+    @action(detail=False, methods=['post'])
+    def generate_rfp_email_stream(self, request):
+        """
+        Stream the vendor email for an RFP as Server-Sent Events.
+
+        The finished body is stored as the RFP's email template, so sending
+        the RFP afterwards reuses it instead of generating it again.
+        """
+        rfp_id = request.data.get('rfp_id')
+
+        if not rfp_id:
+            return Response(
+                {'error': 'rfp_id is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            rfp = RFP.objects.get(id=rfp_id)
+        except (RFP.DoesNotExist, ValueError):
+            return Response(
+                {'error': 'RFP not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        def events():
+            for event, data in AIService().stream_rfp_email_body(rfp.title, rfp.requirements):
+                if event == 'result':
+                    rfp.email_body_template = data
+                    rfp.email_body_fingerprint = rfp.compute_email_fingerprint()
+                    rfp.save(update_fields=['email_body_template', 'email_body_fingerprint'])
+                yield event, data
+
+        return event_stream_response(events())
+
+    @action(detail=True, methods=['get'])
+    def job(self, request, pk=None):
+        """
+        Get the status (and, once done, the result) of a queued AI job.
+
+        Pass ?wait=<seconds> to long-poll: the response is held until the job
+        finishes or the wait (capped at AI_JOB_MAX_WAIT, a few seconds, as it
+        holds a server thread) runs out. Unfinished jobs carry a Retry-After
+        header saying when to poll again.
+        """
+        try:
+            wait = min(float(request.query_params.get('wait', 0)), settings.AI_JOB_MAX_WAIT)
+        except ValueError:
+            return Response(
+                {'error': 'wait must be a number of seconds'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        deadline = time.monotonic() + max(0, wait)
+        interval = 0.25
+        while True:
+            job = AIJob.objects.filter(id=pk).first()
+            if job is None:
+                return Response(
+                    {'error': 'Job not found'},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+            remaining = deadline - time.monotonic()
+            if job.status in ('DONE', 'FAILED') or remaining <= 0:
+                break
+            time.sleep(min(interval, remaining))
+            interval = min(interval * 2, 2)
+
+        headers = {} if job.status in ('DONE', 'FAILED') else {'Retry-After': job_retry_after()}
+        return Response(AIJobSerializer(job).data, status=status.HTTP_200_OK, headers=headers)
+
+    @action(detail=False, methods=['get'])
+    def cache_stats(self, request):
+        """Get LLM response cache hit/miss statistics"""
+        return Response(LLMResponseCache().stats(), status=status.HTTP_200_OK)
@@ -0,0 +1,208 @@
+"""Email service - helpers for parsing IMAP FETCH responses and BODYSTRUCTURE"""
+import base64
+import binascii
+import quopri
+import re
+
+
+TOKEN_PATTERN = re.compile(
+    rb'\s*(?:(?P<open>\()|(?P<close>\))|"(?P<quoted>(?:[^"\\]|\\.)*)"'
+    rb'|\{(?P<literal>\d+)\}\s*$|(?P<atom>(?:[^\s()"\[]+|\[[^\]]*\])+))'
+)
+
+
+def _tokenize(data: list):
+    """
+    Turn the raw list returned by imaplib into a flat token stream.
+
+    imaplib returns plain bytes for text and (text, literal) tuples where
+    the text ends with a "{n}" literal marker; the literal bytes are emitted
+    as a single token in place of the marker.
+    """
+    for item in data:
+        text, literal = (item[0], item[1]) if isinstance(item, tuple) else (item, None)
+        if text is None:
+            continue
+
+        position = 0
+        while position < len(text):
+            match = TOKEN_PATTERN.match(text, position)
+            if not match or match.end() == position:
+                break
+            position = match.end()
+
+            if match.group('open'):
+                yield '('
+            elif match.group('close'):
+                yield ')'
+            elif match.group('quoted') is not None:
+                yield re.sub(rb'\\(.)', rb'\1', match.group('quoted')).decode('utf-8', errors='replace')
+            elif match.group('literal') is not None:
+                yield literal if literal is not None else b''
+            elif match.group('atom'):
+                atom = match.group('atom').decode('utf-8', errors='replace')
+                yield None if atom.upper() == 'NIL' else atom
+
+
+def _build(tokens) -> list:
+    """Nest a token stream into lists following its parentheses"""
+    stack = [[]]
+    for token in tokens:
+        if token == '(':
+            stack.append([])
+        elif token == ')':
+            if len(stack) > 1:
+                finished = stack.pop()
+                stack[-1].append(finished)
+        else:
+            stack[-1].append(token)
+    while len(stack) > 1:
+        finished = stack.pop()
+        stack[-1].append(finished)
+    return stack[0]
+
+
+def parse_fetch_response(data: list) -> list:
+    """
+    Parse the data returned by ``IMAP4.uid('FETCH', ...)``.
+
+    Args:
+        data: Raw response list from imaplib
+
+    Returns:
+        list: One dict per message mapping upper-cased item names (``UID``,
+              ``BODYSTRUCTURE``, ``BODY[1]<0>`` ...) to their values
+    """
+    messages = []
+    top_level = _build(_tokenize(data))
+    for index, value in enumerate(top_level):
+        if not isinstance(value, list) or index == 0 or isinstance(top_level[index - 1], list):
+            continue
+        items = {}
+        for position in range(0, len(value) - 1, 2):
+            name = value[position]
+            if isinstance(name, str):
+                items[name.upper()] = value[position + 1]
+        messages.append(items)
+    return messages
+
+
+def get_body_section(items: dict, section: str):
+    """Find a BODY[<section>] item, ignoring any <origin> partial suffix"""
+    prefix = f'BODY[{section}]'.upper()
+    for name, value in items.items():
+        if name == prefix or name.startswith(prefix + '<'):
+            return value
+    return None
+
+
+def _params(value) -> dict:
+    if not isinstance(value, list):
+        return {}
+    return {
+        str(value[i]).lower(): value[i + 1]
+        for i in range(0, len(value) - 1, 2)
+        if value[i] is not None
+    }
+
+
+def walk_bodystructure(structure: list, prefix: str = '') -> list:
+    """
+    Flatten a BODYSTRUCTURE into its leaf parts.
+
+    Args:
+        structure: Parsed BODYSTRUCTURE list
+        prefix: Section number of the enclosing multipart
+
+    Returns:
+        list: Dicts with section, content_type, params, encoding, size,
+              disposition and filename for every non-multipart part
+    """
+    if not isinstance(structure, list) or not structure:
+        return []
+
+    if isinstance(structure[0], list):
+        parts = []
+        child_number = 0
+        for child in structure:
+            if not isinstance(child, list):
+                break
+            child_number += 1
+            section = f'{prefix}.{child_number}' if prefix else str(child_number)
+            parts.extend(walk_bodystructure(child, section))
+        return parts
+
+    main_type = str(structure[0] or 'text').lower()
+    sub_type = str(structure[1] or 'plain').lower() if len(structure) > 1 else 'plain'
+    params = _params(structure[2] if len(structure) > 2 else None)
+    encoding = str(structure[5] or '7bit').lower() if len(structure) > 5 else '7bit'
+    try:
+        size = int(structure[6]) if len(structure) > 6 else 0
+    except (TypeError, ValueError):
+        size = 0
+
+    # Extension data: text parts carry an extra line count, message/rfc822
+    # parts an envelope, body and line count before MD5 and disposition.
+    if main_type == 'text':
+        disposition_index = 9
+    elif main_type == 'message' and sub_type == 'rfc822':
+        disposition_index = 11
+    else:
+        disposition_index = 8
+    disposition = structure[disposition_index] if len(structure) > disposition_index else None
+    disposition_type = ''
+    disposition_params = {}
+    if isinstance(disposition, list) and disposition:
+        disposition_type = str(disposition[0] or '').lower()
+        disposition_params = _params(disposition[1] if len(disposition) > 1 else None)
+
+    filename = disposition_params.get('filename') or params.get('name')
+    return [{
+        'section': prefix or '1',
+        'content_type': f'{main_type}/{sub_type}',
+        'params': params,
+        'encoding': encoding,
+        'size': size,
+        'disposition': disposition_type,
+        'filename': filename if isinstance(filename, str) else None,
+    }]
+
+
+def is_attachment(part: dict) -> bool:
+    """Whether a body part is an attachment rather than readable message text"""
+    return part['disposition'] == 'attachment' or bool(part['filename']) or \
+        not part['content_type'].startswith('text/')
+
+
+def select_text_part(parts: list):
+    """Pick the part holding the message text: text/plain first, then any text/*"""
+    inline = [part for part in parts if not is_attachment(part)]
+    for part in inline:
+        if part['content_type'] == 'text/plain':
+            return part
+    return inline[0] if inline else None
+
+
+def decode_part(data: bytes, encoding: str) -> bytes:
+    """
+    Undo a Content-Transfer-Encoding.
+
+    Partial fetches can cut base64 data mid-quantum, so trailing characters
+    that do not form a full 4-character group are dropped before decoding.
+    """
+    if data is None:
+        return b''
+    if isinstance(data, str):
+        data = data.encode('utf-8', errors='replace')
+
+    encoding = (encoding or '').lower()
+    if encoding == 'base64':
+        compact = re.sub(rb'[^A-Za-z0-9+/=]', b'', data)
+        compact = compact[:len(compact) - len(compact) % 4]
+        try:
+            return base64.b64decode(compact)
+        except (binascii.Error, ValueError):
+            return b''
+    if encoding == 'quoted-printable':
+        return quopri.decodestring(data)
+    return data
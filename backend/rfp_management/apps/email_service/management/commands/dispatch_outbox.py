@@ -0,0 +1,38 @@
+"""
+Django management command that delivers queued outgoing emails.
+Usage: python manage.py dispatch_outbox [--once] [--batch-size N] [--interval SECONDS]
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from rfp_management.apps.email_service.services import OutboxDispatcher
+
+
+class Command(BaseCommand):
+    help = 'Send queued outbox emails with retries and rate limiting'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Dispatch a single batch and exit')
+        parser.add_argument('--batch-size', type=int, default=None, help='Messages claimed per batch')
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=getattr(settings, 'EMAIL_OUTBOX_POLL_INTERVAL', 5),
+            help='Seconds to wait when the outbox is empty'
+        )
+
+    def handle(self, *args, **options):
+        dispatcher = OutboxDispatcher(batch_size=options['batch_size'])
+
+        if options['once']:
+            counts = dispatcher.dispatch_once()
+            self.stdout.write(self.style.SUCCESS(
+                f"Claimed {counts['claimed']}: sent {counts['sent']}, "
+                f"retrying {counts['retried']}, failed {counts['failed']}"
+            ))
+            return
+
+        self.stdout.write(self.style.SUCCESS('Outbox dispatcher started'))
+        try:
+            dispatcher.run(poll_interval=options['interval'])
+        except KeyboardInterrupt:
+            self.stdout.write('Outbox dispatcher stopped')
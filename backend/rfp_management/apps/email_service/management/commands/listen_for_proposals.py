@@ -0,0 +1,22 @@
+"""
+Django management command that ingests vendor proposals as they arrive.
+Usage: python manage.py listen_for_proposals [--mailbox INBOX]
+"""
+from django.core.management.base import BaseCommand
+from rfp_management.apps.email_service.services import IMAPIdleListener
+
+
+class Command(BaseCommand):
+    help = 'Keep an IMAP connection open and ingest proposal emails using IDLE push'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--mailbox', default='INBOX', help='IMAP folder to watch')
+
+    def handle(self, *args, **options):
+        listener = IMAPIdleListener(mailbox=options['mailbox'], log=self.stdout.write)
+
+        self.stdout.write(self.style.SUCCESS('Proposal listener started'))
+        try:
+            listener.run()
+        except KeyboardInterrupt:
+            self.stdout.write('Proposal listener stopped')
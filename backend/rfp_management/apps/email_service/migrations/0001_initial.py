@@ -0,0 +1,43 @@
+# Generated by Django 4.2.8 on 2026-10-18 20:08
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Outbox',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('RFP', 'RFP Invitation'), ('ACCEPTANCE', 'Proposal Acceptance')], max_length=20)),
+                ('rfp_id', models.CharField(max_length=255)),
+                ('vendor_id', models.CharField(max_length=255)),
+                ('recipient', models.EmailField(max_length=254)),
+                ('subject', models.CharField(max_length=500)),
+                ('body', models.TextField(blank=True)),
+                ('smtp_account', models.CharField(blank=True, max_length=255)),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('SENDING', 'Sending'), ('SENT', 'Sent'), ('FAILED', 'Failed')], default='PENDING', max_length=20)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('last_error', models.TextField(blank=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'email_outbox',
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='outbox_due_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='outbox',
+            constraint=models.UniqueConstraint(fields=('rfp_id', 'vendor_id', 'kind'), name='unique_outbox_message'),
+        ),
+    ]
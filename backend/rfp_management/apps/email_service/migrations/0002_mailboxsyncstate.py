@@ -0,0 +1,26 @@
+# Generated by Django 4.2.8 on 2026-10-18 20:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('email_service', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MailboxSyncState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mailbox', models.CharField(max_length=500, unique=True)),
+                ('uidvalidity', models.BigIntegerField(blank=True, null=True)),
+                ('last_uid', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'mailbox_sync_state',
+            },
+        ),
+    ]
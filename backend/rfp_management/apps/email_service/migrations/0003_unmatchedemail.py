@@ -0,0 +1,31 @@
+# Generated by Django 4.2.8 on 2026-10-18 20:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('email_service', '0002_mailboxsyncstate'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UnmatchedEmail',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('message_id', models.CharField(max_length=500, unique=True)),
+                ('sender', models.CharField(max_length=500)),
+                ('subject', models.CharField(blank=True, max_length=1000)),
+                ('body', models.TextField(blank=True)),
+                ('received_date', models.CharField(blank=True, max_length=255)),
+                ('reason', models.CharField(choices=[('UNKNOWN_VENDOR', 'Unknown Vendor'), ('UNKNOWN_RFP', 'Unknown RFP')], max_length=20)),
+                ('vendor_id', models.CharField(blank=True, max_length=255)),
+                ('rfp_id', models.CharField(blank=True, max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'email_triage',
+            },
+        ),
+    ]
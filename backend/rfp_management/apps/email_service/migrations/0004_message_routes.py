@@ -0,0 +1,31 @@
+# Generated by Django 4.2.8 on 2026-10-18 20:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('email_service', '0003_unmatchedemail'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MessageRoute',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('message_id', models.CharField(max_length=500, unique=True)),
+                ('rfp_id', models.CharField(max_length=255)),
+                ('vendor_id', models.CharField(max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'email_message_route',
+            },
+        ),
+        migrations.AddField(
+            model_name='outbox',
+            name='email_message_id',
+            field=models.CharField(blank=True, max_length=500),
+        ),
+    ]
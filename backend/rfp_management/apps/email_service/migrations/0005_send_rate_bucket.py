@@ -0,0 +1,30 @@
+# Generated by Django 4.2.8 on 2026-10-18 20:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('email_service', '0004_message_routes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SendRateBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('account', models.CharField(max_length=255, unique=True)),
+                ('tokens', models.FloatField()),
+                ('refilled_at', models.FloatField()),
+                ('version', models.PositiveBigIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'email_send_rate_bucket',
+            },
+        ),
+        migrations.RemoveField(
+            model_name='outbox',
+            name='smtp_account',
+        ),
+    ]
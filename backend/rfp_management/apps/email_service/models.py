@@ -0,0 +1,115 @@
+"""Email service app - models for outgoing mail, send rate limits, reply routing, mailbox sync state and triage"""
+from django.db import models
+from django.utils import timezone
+
+
+class Outbox(models.Model):
+    """Outgoing email waiting to be delivered by the outbox dispatcher"""
+    kind = models.CharField(
+        max_length=20,
+        choices=[
+            ('RFP', 'RFP Invitation'),
+            ('ACCEPTANCE', 'Proposal Acceptance'),
+        ]
+    )
+    rfp_id = models.CharField(max_length=255)
+    vendor_id = models.CharField(max_length=255)
+    recipient = models.EmailField()
+    subject = models.CharField(max_length=500)
+    body = models.TextField(blank=True)  # Rendered at dispatch time for RFP invitations
+    email_message_id = models.CharField(max_length=500, blank=True)  # Message-ID header, reused on retries
+    status = models.CharField(
+        max_length=20,
+        choices=[
+            ('PENDING', 'Pending'),
+            ('SENDING', 'Sending'),
+            ('SENT', 'Sent'),
+            ('FAILED', 'Failed'),
+        ],
+        default='PENDING'
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'email_outbox'
+        constraints = [
+            models.UniqueConstraint(fields=['rfp_id', 'vendor_id', 'kind'], name='unique_outbox_message'),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_due_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.kind} email to {self.recipient} ({self.status})'
+
+
+class SendRateBucket(models.Model):
+    """Token bucket state of one SMTP account, shared by every dispatcher process"""
+    account = models.CharField(max_length=255, unique=True)
+    tokens = models.FloatField()
+    refilled_at = models.FloatField()  # Unix time of the last refill
+    version = models.PositiveBigIntegerField(default=0)  # Bumped on every change, for compare-and-swap updates
+
+    class Meta:
+        db_table = 'email_send_rate_bucket'
+
+    def __str__(self):
+        return f'{self.account}: {self.tokens:.1f} tokens'
+
+
+class MessageRoute(models.Model):
+    """Message-ID of an outgoing RFP email, used to route vendor replies back to the RFP"""
+    message_id = models.CharField(max_length=500, unique=True)
+    rfp_id = models.CharField(max_length=255)
+    vendor_id = models.CharField(max_length=255)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'email_message_route'
+
+    def __str__(self):
+        return f'{self.message_id} -> RFP {self.rfp_id} / vendor {self.vendor_id}'
+
+
+class MailboxSyncState(models.Model):
+    """High-water mark of the IMAP UIDs already ingested from a mailbox"""
+    mailbox = models.CharField(max_length=500, unique=True)  # "<account>:<folder>"
+    uidvalidity = models.BigIntegerField(null=True, blank=True)
+    last_uid = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'mailbox_sync_state'
+
+    def __str__(self):
+        return f'{self.mailbox} @ UID {self.last_uid}'
+
+
+class UnmatchedEmail(models.Model):
+    """Incoming email that could not be turned into a proposal automatically"""
+    message_id = models.CharField(max_length=500, unique=True)
+    sender = models.CharField(max_length=500)
+    subject = models.CharField(max_length=1000, blank=True)
+    body = models.TextField(blank=True)
+    received_date = models.CharField(max_length=255, blank=True)  # Raw Date header
+    reason = models.CharField(
+        max_length=20,
+        choices=[
+            ('UNKNOWN_VENDOR', 'Unknown Vendor'),
+            ('UNKNOWN_RFP', 'Unknown RFP'),
+        ]
+    )
+    vendor_id = models.CharField(max_length=255, blank=True)
+    rfp_id = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'email_triage'
+
+    def __str__(self):
+        return f'{self.sender}: {self.subject} ({self.reason})'
@@ -0,0 +1,23 @@
+"""Email service app - serializers"""
+from rest_framework import serializers
+from .models import Outbox, UnmatchedEmail
+
+
+class OutboxSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Outbox
+        fields = [
+            'id', 'kind', 'rfp_id', 'vendor_id', 'recipient', 'subject', 'email_message_id', 'status',
+            'attempts', 'next_attempt_at', 'last_error', 'sent_at', 'created_at', 'updated_at'
+        ]
+        read_only_fields = fields
+
+
+class UnmatchedEmailSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = UnmatchedEmail
+        fields = [
+            'id', 'message_id', 'sender', 'subject', 'body', 'received_date',
+            'reason', 'vendor_id', 'rfp_id', 'created_at'
+        ]
+        read_only_fields = fields
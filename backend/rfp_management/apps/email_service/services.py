@@ -2,11 +2,137 @@
 import os
 import smtplib
 import imaplib
+import itertools
+import select
+import ssl
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import email
 from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from email.header import decode_header
-from datetime import datetime
+from email.header import decode_header, make_header
+from email.utils import make_msgid
+from datetime import datetime, timedelta
 import re
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from rfp_management.common.cache import ResponseCache
+from . import imap
+
+
+VENDOR_NAME_PLACEHOLDER = re.compile(
+    r'\[(?:vendor|supplier|company)(?: name)?\]', re.IGNORECASE
+)
+CONTACT_PLACEHOLDER = re.compile(
+    r'\[(?:contact(?: person)?|recipient(?: name)?|name)\]', re.IGNORECASE
+)
+
+# Headers fetched for every incoming message (needed for sender matching and routing)
+IMAP_HEADER_FIELDS = 'FROM SUBJECT DATE MESSAGE-ID IN-REPLY-TO REFERENCES'
+
+# Fallback for replies that cannot be routed by their thread headers
+RFP_ID_PATTERN = re.compile(r'RFP[:\s]+(\d+)', re.IGNORECASE)
+MESSAGE_ID_PATTERN = re.compile(r'<[^<>\s]+>')
+
+
+def is_smtp_connection_error(error: Exception) -> bool:
+    """
+    Whether an SMTP failure means the connection is dead and worth re-establishing.
+
+    smtplib.SMTPException subclasses OSError, so socket errors have to be told
+    apart from answers of a live server (refused recipient, data error, failed
+    login), which would fail again and could duplicate a partial delivery.
+    """
+    if isinstance(error, (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError)):
+        return True
+    return isinstance(error, OSError) and not isinstance(error, smtplib.SMTPException)
+
+
+class SMTPSession:
+    """
+    Authenticated SMTP connection that is reused for many messages.
+
+    The connection is opened lazily on the first send and re-established
+    (including STARTTLS and login) if the server drops it mid-batch.
+    """
+
+    def __init__(self, host: str, port: int, username: str, password: str,
+                 from_email: str, use_tls: bool = True, max_reconnects: int = 1):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.from_email = from_email
+        self.use_tls = use_tls
+        self.max_reconnects = max_reconnects
+        self._server = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def connect(self) -> None:
+        """Open the connection and authenticate"""
+        self.close()
+        server = smtplib.SMTP(self.host, self.port)
+        try:
+            if self.use_tls:
+                server.starttls()
+            if self.username:
+                server.login(self.username, self.password)
+        except Exception:
+            server.close()
+            raise
+        self._server = server
+
+    def close(self) -> None:
+        """Close the connection if it is open"""
+        if self._server is None:
+            return
+        try:
+            self._server.quit()
+        except Exception:
+            self._server.close()
+        self._server = None
+
+    def send(self, recipient: str, subject: str, body: str, headers: dict = None) -> None:
+        """
+        Send one message over the shared connection.
+        
+        A dropped connection is re-established and the message sent again,
+        up to max_reconnects times; errors reported by the server are raised
+        right away.
+        
+        Args:
+            recipient: Email address of recipient
+            subject: Email subject
+            body: Email body content
+            headers: Extra message headers
+        """
+        message = MIMEText(body, 'plain', 'utf-8')
+        message['From'] = self.from_email
+        message['To'] = recipient
+        message['Subject'] = subject
+        for name, value in (headers or {}).items():
+            message[name] = value
+
+        attempts = 0
+        while True:
+            try:
+                if self._server is None:
+                    self.connect()
+                self._server.sendmail(self.from_email, [recipient], message.as_string())
+                return
+            except Exception as e:
+                if not is_smtp_connection_error(e):
+                    raise
+                self.close()
+                attempts += 1
+                if attempts > self.max_reconnects:
+                    raise
 
 
 class EmailService:
@@ -21,40 +147,54 @@ class EmailService:
         self.email_address = os.getenv('EMAIL_HOST_USER', '')
         self.email_password = os.getenv('EMAIL_HOST_PASSWORD', '')
         self.from_email = os.getenv('DEFAULT_FROM_EMAIL', self.email_address)
+        self.smtp_use_tls = os.getenv('EMAIL_USE_TLS', 'True') == 'True'
+        self.max_in_flight = max(1, int(os.getenv('EMAIL_MAX_IN_FLIGHT', '5')))
+        self.imap_fetch_batch_size = max(1, int(os.getenv('IMAP_FETCH_BATCH_SIZE', '50')))
+        self.imap_max_body_bytes = max(1024, int(os.getenv('IMAP_MAX_BODY_BYTES', '262144')))
+        self.ingest_batch_size = max(1, int(os.getenv('EMAIL_INGEST_BATCH_SIZE', '100')))
+        self.sync_position = None  # (mailbox key, UIDVALIDITY, highest UID fetched)
 
-    def send_rfp_to_vendor(self, rfp, vendor_id: str) -> bool:
+    def open_smtp_session(self) -> SMTPSession:
+        """Create a reusable SMTP session for sending several messages"""
+        return SMTPSession(
+            self.smtp_server,
+            self.smtp_port,
+            self.email_address,
+            self.email_password,
+            self.from_email,
+            use_tls=self.smtp_use_tls
+        )
+
+    def send_rfp_to_vendor(self, rfp, vendor_id: str, session: SMTPSession = None) -> bool:
         """
         Send RFP to a vendor via email.
         
         Args:
             rfp: RFP object
             vendor_id: ID of the vendor
+            session: Optional open SMTP session to send through
             
         Returns:
             bool: Whether email was sent successfully
         """
         from rfp_management.apps.vendors.models import Vendor
-        from rfp_management.apps.ai.services import AIService
 
         try:
             # Get vendor details
             vendor = Vendor.objects.get(id=vendor_id)
             
-            # Generate RFP email body
-            ai_service = AIService()
-            email_body = ai_service.generate_rfp_email_body(rfp.title, rfp.requirements)
+            # Personalise the shared RFP email body for this vendor
+            email_body = self.render_rfp_email_body(self.get_rfp_email_template(rfp), vendor)
             
-            # Create email
-            subject = f"Request for Proposal: {rfp.title}"
-            message = MIMEMultipart()
-            message['From'] = self.from_email
-            message['To'] = vendor.email
-            message['Subject'] = subject
-            
-            message.attach(MIMEText(email_body, 'plain'))
+            # Record the Message-ID first so a fast reply can always be routed
+            message_id = self.new_message_id()
+            self.record_message_routes([(message_id, rfp.id, vendor.id)])
             
             # Send email
-            self._send_email(vendor.email, subject, email_body)
+            self._send_email(
+                vendor.email, self.rfp_email_subject(rfp), email_body,
+                session=session, headers={'Message-ID': message_id}
+            )
             
             return True
 
@@ -62,7 +202,317 @@ class EmailService:
             print(f"Error sending RFP to vendor {vendor_id}: {str(e)}")
             raise
 
-    def _send_email(self, recipient: str, subject: str, body: str) -> None:
+    def send_rfp_to_vendors(self, rfp, vendor_ids: list, max_in_flight: int = None) -> dict:
+        """
+        Send RFP to several vendors in parallel over pooled SMTP sessions.
+        
+        Args:
+            rfp: RFP object
+            vendor_ids: IDs of the vendors
+            max_in_flight: Concurrency limit (defaults to EMAIL_MAX_IN_FLIGHT)
+            
+        Returns:
+            dict: Per-vendor result keyed by vendor ID, each with
+                  'success', 'email' and (on failure) 'error'
+        """
+        from rfp_management.apps.vendors.models import Vendor
+
+        vendors = Vendor.objects.in_bulk([str(v) for v in vendor_ids if str(v).isdigit()])
+        results = {}
+        messages = []
+
+        for vendor_id in vendor_ids:
+            vendor = vendors.get(int(vendor_id)) if str(vendor_id).isdigit() else None
+            if vendor is None:
+                results[str(vendor_id)] = {'success': False, 'email': None, 'error': 'Vendor not found'}
+                continue
+            results[str(vendor_id)] = {'success': False, 'email': vendor.email}
+            messages.append((str(vendor_id), vendor))
+
+        if not messages:
+            return results
+
+        template = self.get_rfp_email_template(rfp)
+        subject = self.rfp_email_subject(rfp)
+        message_ids = [self.new_message_id() for _ in messages]
+        self.record_message_routes([
+            (message_id, rfp.id, vendor.id) for message_id, (_, vendor) in zip(message_ids, messages)
+        ])
+        outcomes = self.send_bulk([
+            (vendor.email, subject, self.render_rfp_email_body(template, vendor), {'Message-ID': message_id})
+            for message_id, (_, vendor) in zip(message_ids, messages)
+        ], max_in_flight=max_in_flight)
+
+        for (vendor_id, _), error in zip(messages, outcomes):
+            results[vendor_id]['success'] = error is None
+            if error is not None:
+                results[vendor_id]['error'] = error
+
+        self.discard_message_routes([
+            message_id for message_id, error in zip(message_ids, outcomes) if error is not None
+        ])
+        return results
+
+    def send_bulk(self, messages: list, max_in_flight: int = None, rate_limiter=None, on_result=None) -> list:
+        """
+        Send many messages concurrently over a bounded pool of SMTP sessions.
+        
+        Up to ``max_in_flight`` messages are in flight at once; each worker
+        thread keeps its own authenticated session for the whole batch. A
+        failure for one recipient is recorded and the rest are still sent.
+        
+        Args:
+            messages: List of (recipient, subject, body) or
+                      (recipient, subject, body, headers) tuples
+            max_in_flight: Concurrency limit (defaults to EMAIL_MAX_IN_FLIGHT)
+            rate_limiter: Optional TokenBucket acquired before every send
+            on_result: Optional callback(index, error) run in the calling
+                       thread as soon as each message is sent or has failed
+            
+        Returns:
+            list: None for each delivered message, else the error string,
+                  in the same order as ``messages``
+        """
+        if not messages:
+            return []
+
+        workers = min(max_in_flight or self.max_in_flight, len(messages))
+        local = threading.local()
+        sessions = []
+        sessions_lock = threading.Lock()
+
+        def send_one(message):
+            recipient, subject, body = message[:3]
+            headers = message[3] if len(message) > 3 else None
+            session = getattr(local, 'session', None)
+            if session is None:
+                session = local.session = self.open_smtp_session()
+                with sessions_lock:
+                    sessions.append(session)
+            try:
+                session.send(recipient, subject, body, headers=headers)
+                return None
+            except Exception as e:
+                print(f"Error sending email to {recipient}: {str(e)}")
+                return str(e)
+
+        results = [None] * len(messages)
+        running = {}
+
+        def collect(futures):
+            for future in futures:
+                index = running.pop(future)
+                results[index] = future.result()
+                if on_result is not None:
+                    on_result(index, results[index])
+
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for index, message in enumerate(messages):
+                    # Tokens are taken here, in the calling thread, which keeps
+                    # the database work of the limiter out of the worker threads
+                    if rate_limiter is not None:
+                        rate_limiter.acquire()
+                    running[executor.submit(send_one, message)] = index
+                    collect([future for future in list(running) if future.done()])
+                while running:
+                    done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                    collect(done)
+            return results
+        finally:
+            for session in sessions:
+                session.close()
+
+    def enqueue_rfp_to_vendors(self, rfp, vendor_ids: list) -> dict:
+        """
+        Queue RFP invitations in the outbox instead of sending them inline.
+        
+        Args:
+            rfp: RFP object
+            vendor_ids: IDs of the vendors
+            
+        Returns:
+            dict: Per-vendor result keyed by vendor ID, with the outbox
+                  'message_id' and 'status' for queued messages
+        """
+        from rfp_management.apps.vendors.models import Vendor
+
+        vendors = Vendor.objects.in_bulk([str(v) for v in vendor_ids if str(v).isdigit()])
+        subject = self.rfp_email_subject(rfp)
+        results = {}
+
+        for vendor_id in vendor_ids:
+            vendor = vendors.get(int(vendor_id)) if str(vendor_id).isdigit() else None
+            if vendor is None:
+                results[str(vendor_id)] = {'success': False, 'email': None, 'error': 'Vendor not found'}
+                continue
+
+            message = self.enqueue_email('RFP', rfp.id, vendor.id, vendor.email, subject)
+            results[str(vendor_id)] = {
+                'success': True,
+                'email': vendor.email,
+                'message_id': message.id,
+                'status': message.status
+            }
+
+        return results
+
+    def enqueue_email(self, kind: str, rfp_id, vendor_id, recipient: str,
+                      subject: str, body: str = ''):
+        """
+        Add a message to the outbox, deduplicated on (rfp, vendor, kind).
+        
+        A message that previously failed for good is re-queued; pending or
+        already delivered messages are returned unchanged.
+        
+        Args:
+            kind: 'RFP' or 'ACCEPTANCE'
+            rfp_id: ID of the RFP
+            vendor_id: ID of the vendor
+            recipient: Email address of recipient
+            subject: Email subject
+            body: Email body (left blank for RFP invitations, which are
+                  rendered from the RFP template at dispatch time)
+            
+        Returns:
+            Outbox: The queued message
+        """
+        from .models import Outbox
+
+        message, created = Outbox.objects.get_or_create(
+            rfp_id=str(rfp_id),
+            vendor_id=str(vendor_id),
+            kind=kind,
+            defaults={'recipient': recipient, 'subject': subject, 'body': body}
+        )
+
+        if not created and message.status == 'FAILED':
+            message.recipient = recipient
+            message.subject = subject
+            message.body = body
+            message.status = 'PENDING'
+            message.attempts = 0
+            message.next_attempt_at = timezone.now()
+            message.last_error = ''
+            message.save()
+
+        return message
+
+    def rfp_email_subject(self, rfp) -> str:
+        """Subject line used for RFP emails (the ID comes first so replies still match the fallback regex)"""
+        return f"[RFP: {rfp.id}] Request for Proposal: {rfp.title}"
+
+    def new_message_id(self) -> str:
+        """Generate a Message-ID header value for an outgoing email"""
+        domain = self.from_email.rpartition('@')[2].strip('<> ') or None
+        return make_msgid(domain=domain)
+
+    def record_message_routes(self, routes: list) -> None:
+        """
+        Remember which RFP and vendor outgoing Message-IDs belong to.
+        
+        Args:
+            routes: List of (message_id, rfp_id, vendor_id) tuples
+        """
+        from .models import MessageRoute
+
+        MessageRoute.objects.bulk_create([
+            MessageRoute(message_id=message_id, rfp_id=str(rfp_id), vendor_id=str(vendor_id))
+            for message_id, rfp_id, vendor_id in routes
+        ], ignore_conflicts=True)
+
+    def discard_message_routes(self, message_ids: list) -> None:
+        """Forget routes of emails that were never delivered"""
+        from .models import MessageRoute
+
+        if message_ids:
+            MessageRoute.objects.filter(message_id__in=message_ids).delete()
+
+    def route_replies(self, emails: list) -> dict:
+        """
+        Find the RFP email each incoming email replies to with one indexed query.
+        
+        In-Reply-To is checked first, then References from the newest
+        entry backwards, so the closest known ancestor in the thread wins.
+        
+        Args:
+            emails: Emails as yielded by receive_proposal_emails
+            
+        Returns:
+            dict: MessageRoute keyed by the incoming email's message_id
+                  (emails that reply to no known message are omitted)
+        """
+        from .models import MessageRoute
+
+        candidates = {
+            email_data['message_id']: self.thread_references(email_data)
+            for email_data in emails
+        }
+        referenced = {message_id for refs in candidates.values() for message_id in refs}
+        if not referenced:
+            return {}
+
+        routes = MessageRoute.objects.in_bulk(list(referenced), field_name='message_id')
+        routed = {}
+        for message_id, refs in candidates.items():
+            for ref in refs:
+                if ref in routes:
+                    routed[message_id] = routes[ref]
+                    break
+        return routed
+
+    @staticmethod
+    def thread_references(email_data: dict) -> list:
+        """Message-IDs an email refers to, most specific first"""
+        refs = MESSAGE_ID_PATTERN.findall(email_data.get('in_reply_to') or '')
+        refs += reversed(MESSAGE_ID_PATTERN.findall(email_data.get('references') or ''))
+        return list(dict.fromkeys(refs))
+
+    def get_rfp_email_template(self, rfp) -> str:
+        """
+        Get the AI-generated email body for an RFP, generating it only when
+        the RFP title or requirements changed since it was last stored.
+        
+        Args:
+            rfp: RFP object
+            
+        Returns:
+            str: Email body containing vendor placeholders
+        """
+        from rfp_management.apps.ai.services import AIService
+
+        if rfp.has_current_email_body:
+            return rfp.email_body_template
+
+        ai_service = AIService()
+        rfp.email_body_template = ai_service.generate_rfp_email_body(rfp.title, rfp.requirements)
+        rfp.email_body_fingerprint = rfp.compute_email_fingerprint()
+        rfp.save(update_fields=['email_body_template', 'email_body_fingerprint'])
+
+        return rfp.email_body_template
+
+    def render_rfp_email_body(self, template: str, vendor) -> str:
+        """
+        Fill vendor-specific placeholders in a shared RFP email body.
+        
+        Args:
+            template: Email body returned by get_rfp_email_template
+            vendor: Vendor object
+            
+        Returns:
+            str: Email body addressed to the vendor
+        """
+        contact = vendor.contact_person or vendor.name
+        body = VENDOR_NAME_PLACEHOLDER.sub(lambda m: vendor.name, template)
+        body = CONTACT_PLACEHOLDER.sub(lambda m: contact, body)
+
+        if not body.lstrip().lower().startswith(('dear', 'hello', 'hi ')):
+            body = f"Dear {contact},\n\n{body.lstrip()}"
+
+        return body
+
+    def _send_email(self, recipient: str, subject: str, body: str,
+                    session: SMTPSession = None, headers: dict = None) -> None:
         """
         Send email using SMTP.
         
@@ -70,105 +520,526 @@ class EmailService:
             recipient: Email address of recipient
             subject: Email subject
             body: Email body content
+            session: Optional open SMTP session; a one-off session is used otherwise
+            headers: Extra message headers
         """
         try:
-            # Create message
-            message = f"Subject: {subject}\n\n{body}"
-            
-            # Connect to SMTP server
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.email_address, self.email_password)
-                server.sendmail(self.from_email, recipient, message)
+            if session is not None:
+                session.send(recipient, subject, body, headers=headers)
+                return
+
+            with self.open_smtp_session() as one_off:
+                one_off.send(recipient, subject, body, headers=headers)
                 
         except Exception as e:
             raise Exception(f"Failed to send email: {str(e)}")
 
-    def receive_proposal_emails(self) -> list:
+    def connect_imap(self):
+        """Open an authenticated IMAP connection"""
+        mail = imaplib.IMAP4_SSL(self.imap_server, self.imap_port)
+        mail.login(self.email_address, self.email_password)
+        return mail
+
+    def ingest_proposal_emails(self, mailbox: str = 'INBOX', mail=None) -> dict:
         """
-        Check for incoming proposal emails from vendors.
+        Fetch new emails and store those matching a vendor and RFP as proposals.
+        
+        Emails are streamed from IMAP and committed in batches of
+        EMAIL_INGEST_BATCH_SIZE. Each batch's proposals and the UID
+        checkpoint are written in one transaction, so memory use stays
+        bounded and a crash mid-run neither loses nor duplicates proposals.
+        
+        This is the single ingestion path used by the check-proposals
+        endpoint and the listen_for_proposals command.
         
+        Args:
+            mailbox: IMAP folder to sync
+            mail: Optional open IMAP connection to reuse
+            
         Returns:
-            list: List of tuples (sender_email, subject, body, message_id)
+            dict: 'checked' email count, 'proposals_received' summaries and
+                  the number of unmatched emails 'triaged' for manual review
         """
+        checked = 0
+        triaged = 0
+        received_proposals = []
+        batch = []
+
+        for email_data in self.receive_proposal_emails(mailbox, mail=mail):
+            checked += 1
+            batch.append(email_data)
+            if len(batch) >= self.ingest_batch_size:
+                created, unmatched = self._ingest_batch(batch)
+                received_proposals.extend(created)
+                triaged += unmatched
+                batch = []
+
+        if batch:
+            created, unmatched = self._ingest_batch(batch)
+            received_proposals.extend(created)
+            triaged += unmatched
+        # Everything fetched is processed. After a complete first sync this also
+        # moves the checkpoint past the read mail that was skipped; after a
+        # failed fetch it only covers the messages that were received.
+        self.commit_sync_checkpoint()
+
+        return {'checked': checked, 'proposals_received': received_proposals, 'triaged': triaged}
+
+    def _ingest_batch(self, emails: list) -> tuple:
+        """
+        Create proposals for a batch of emails and checkpoint it atomically.
+        
+        Returns:
+            tuple: (summaries of new proposals, number of emails sent to triage)
+        """
+        from rfp_management.apps.proposals.models import Proposal
+        from rfp_management.apps.proposals.services import ProposalService
+        from .models import UnmatchedEmail
+
+        from rfp_management.apps.rfps.models import RFP
+        from rfp_management.apps.vendors.models import Vendor
+
         proposals = []
+        summaries = []
+        unmatched = []
+
+        # Replies to our RFP emails carry the RFP and vendor in their thread
+        # headers; only the remaining emails need sender and regex matching
+        routes = self.route_replies(emails)
+        routed_vendors = Vendor.objects.in_bulk(
+            list({route.vendor_id for route in routes.values() if route.vendor_id.isdigit()})
+        )
+        vendors = self.resolve_vendors([
+            email_data['sender'] for email_data in emails if email_data['message_id'] not in routes
+        ])
+
+        matches = []
+        for email_data in emails:
+            route = routes.get(email_data['message_id'])
+            if route is not None:
+                rfp_id = route.rfp_id
+                vendor = routed_vendors.get(int(route.vendor_id)) if route.vendor_id.isdigit() else None
+            else:
+                vendor = vendors.get(self.extract_vendor_email(email_data['sender']).lower())
+                # Try to find RFP from subject or email content
+                rfp_id = self.extract_rfp_id(email_data['subject'], email_data['body'])
+            matches.append((email_data, vendor, rfp_id))
+
+        # Proposals reference their RFP by foreign key, so quoted IDs of
+        # deleted RFPs must go to triage instead of failing the batch
+        known_rfps = set(map(str, RFP.objects.filter(
+            id__in={int(rfp_id) for _, _, rfp_id in matches if rfp_id.isdigit()}
+        ).values_list('id', flat=True)))
+
+        for email_data, vendor, rfp_id in matches:
+            if vendor and rfp_id in known_rfps:
+                proposals.append(Proposal(
+                    rfp_id=int(rfp_id),
+                    vendor=vendor,
+                    vendor_name=vendor.name,
+                    proposal_content=email_data['body'],
+                    email_message_id=email_data['message_id'],
+                    status='RECEIVED'
+                ))
+                summaries.append({
+                    'vendor': vendor.name,
+                    'rfp_id': rfp_id,
+                    'subject': email_data['subject']
+                })
+            else:
+                unmatched.append(UnmatchedEmail(
+                    message_id=email_data['message_id'],
+                    sender=email_data['sender'][:500],
+                    subject=email_data['subject'][:1000],
+                    body=email_data['body'],
+                    received_date=str(email_data['received_date'] or '')[:255],
+                    reason='UNKNOWN_VENDOR' if vendor is None else 'UNKNOWN_RFP',
+                    vendor_id=str(vendor.id) if vendor else '',
+                    rfp_id=rfp_id
+                ))
+
+        # Skip emails that were already ingested (re-runs, parallel workers)
+        message_ids = [proposal.email_message_id for proposal in proposals]
+        existing = set(
+            Proposal.objects.filter(email_message_id__in=message_ids)
+            .values_list('email_message_id', flat=True)
+        )
+        new_proposals = {}
+        for proposal, summary in zip(proposals, summaries):
+            if proposal.email_message_id not in existing and proposal.email_message_id not in new_proposals:
+                new_proposals[proposal.email_message_id] = (proposal, summary)
+
+        with transaction.atomic():
+            # ignore_conflicts turns a race with another worker into a no-op
+            Proposal.objects.bulk_create(
+                [proposal for proposal, _ in new_proposals.values()],
+                ignore_conflicts=True
+            )
+            UnmatchedEmail.objects.bulk_create(unmatched, ignore_conflicts=True)
+            created_ids = dict(
+                Proposal.objects.filter(email_message_id__in=list(new_proposals))
+                .values_list('email_message_id', 'id')
+            )
+            # bulk_create sends no post_save
+            ResponseCache().invalidate(*{
+                ResponseCache.RFP_PROPOSALS.format(proposal.rfp_id) for proposal, _ in new_proposals.values()
+            })
+            # Queued in the same transaction, so no stored proposal is left unparsed
+            if settings.AI_AUTO_PIPELINE:
+                ProposalService.schedule_parsing(list(created_ids.values()))
+            self.commit_sync_checkpoint(last_uid=max(email_data['uid'] for email_data in emails))
+
+        return [
+            {'id': str(created_ids[message_id]), **summary}
+            for message_id, (_, summary) in new_proposals.items()
+            if message_id in created_ids
+        ], len(unmatched)
+
+    def resolve_vendors(self, senders: list) -> dict:
+        """
+        Match email senders to vendors with at most two indexed IN queries.
+        
+        Senders are matched on the exact (lower-cased) address first. The
+        rest fall back to the sender's domain, which only counts when
+        exactly one vendor uses that domain and it is not a public mail
+        provider listed in VENDOR_DOMAIN_MATCH_EXCLUDE.
+        
+        Args:
+            senders: From headers or bare email addresses
+            
+        Returns:
+            dict: Vendor keyed by lower-cased sender address (unmatched omitted)
+        """
+        from rfp_management.apps.vendors.models import Vendor
+
+        addresses = {self.extract_vendor_email(sender).lower() for sender in senders if sender}
+        resolved = {vendor.email: vendor for vendor in Vendor.objects.filter(email__in=addresses)}
+        matches = {address: resolved[address] for address in addresses if address in resolved}
+
+        excluded = set(getattr(settings, 'VENDOR_DOMAIN_MATCH_EXCLUDE', []))
+        pending = {
+            address: address.rpartition('@')[2]
+            for address in addresses
+            if address not in matches and address.rpartition('@')[2] not in excluded
+        }
+        if pending:
+            by_domain = {}
+            for vendor in Vendor.objects.filter(email_domain__in=set(pending.values())):
+                by_domain.setdefault(vendor.email_domain, []).append(vendor)
+            for address, domain in pending.items():
+                candidates = by_domain.get(domain, [])
+                if len(candidates) == 1:
+                    matches[address] = candidates[0]
+
+        return matches
+
+    def receive_proposal_emails(self, mailbox: str = 'INBOX', mail=None):
+        """
+        Stream proposal emails that arrived since the last committed sync.
+        
+        Messages are located by UID against the high-water mark stored in
+        MailboxSyncState and read in batched UID FETCH commands with
+        BODY.PEEK, so reading does not change their Seen flag. Only the
+        headers and the text part are downloaded; attachments are listed
+        with their section so fetch_attachment() can retrieve them later. Call
+        commit_sync_checkpoint() once the yielded emails are processed to
+        advance the high-water mark; until then a re-run fetches them again.
+        
+        Args:
+            mailbox: IMAP folder to sync
+            mail: Optional open IMAP connection to reuse (left open)
+            
+        Yields:
+            dict: Email with sender, subject, body, message_id, in_reply_to,
+                  references, uid, received_date, truncated and attachments
+        """
+        owns_connection = mail is None
+        self.sync_position = None
 
         try:
             # Connect to IMAP server
-            mail = imaplib.IMAP4_SSL(self.imap_server, self.imap_port)
-            mail.login(self.email_address, self.email_password)
-            mail.select('INBOX')
+            if owns_connection:
+                mail = self.connect_imap()
 
-            # Search for unseen emails
-            status, messages = mail.search(None, 'UNSEEN')
-            
-            if status == 'OK':
-                message_ids = messages[0].split()
-                
-                for message_id in message_ids:
-                    status, msg_data = mail.fetch(message_id, '(RFC822)')
-                    
-                    if status == 'OK':
-                        msg = self._parse_email(msg_data[0][1])
-                        proposals.append({
-                            'sender': msg['from'],
-                            'subject': msg['subject'],
-                            'body': msg['body'],
-                            'message_id': message_id.decode(),
-                            'received_date': msg.get('date', datetime.now().isoformat())
-                        })
-
-            mail.close()
-            mail.logout()
-            
-            return proposals
+            try:
+                for uid, msg in self._fetch_new_messages(mail, mailbox):
+                    yield {
+                        'sender': msg['from'],
+                        'subject': msg['subject'],
+                        'body': msg['body'],
+                        'message_id': msg['message_id'] or self._fallback_message_id(uid),
+                        'in_reply_to': msg['in_reply_to'],
+                        'references': msg['references'],
+                        'uid': uid,
+                        'received_date': msg['date'],
+                        'truncated': msg['truncated'],
+                        'attachments': msg['attachments']
+                    }
+            finally:
+                if owns_connection:
+                    mail.logout()
 
+        except (imaplib.IMAP4.abort, OSError):
+            if not owns_connection:
+                raise  # Let the caller re-establish its long-lived connection
+            print("Error receiving proposal emails: connection lost")
         except Exception as e:
             print(f"Error receiving proposal emails: {str(e)}")
-            return []
 
-    def _parse_email(self, email_data):
+    def _fallback_message_id(self, uid: int) -> str:
+        """Stable stand-in for emails without a Message-ID header"""
+        state_key, uidvalidity, _ = self.sync_position
+        mailbox = state_key.rsplit(':', 1)[-1]
+        return f'<{uidvalidity}.{uid}.{mailbox}@{self.imap_server}>'
+
+    def commit_sync_checkpoint(self, last_uid: int = None) -> None:
         """
-        Parse email message data.
+        Persist the UID high-water mark of the mailbox being synced.
         
         Args:
-            email_data: Raw email data from IMAP
-            
-        Returns:
-            dict: Parsed email with from, subject, body
+            last_uid: Highest UID fully processed; defaults to the highest
+                      UID fetched by the current receive call
         """
-        import email
-        from email.header import decode_header, make_header
+        from .models import MailboxSyncState
 
-        msg = email.message_from_bytes(email_data)
+        if self.sync_position is None:
+            return
+
+        state_key, uidvalidity, fetched_uid = self.sync_position
+        last_uid = fetched_uid if last_uid is None else last_uid
+        if last_uid is None:
+            return  # First sync of a mailbox whose end could not be determined
+        MailboxSyncState.objects.update_or_create(
+            mailbox=state_key,
+            defaults={'uidvalidity': uidvalidity, 'last_uid': last_uid}
+        )
+
+    def _fetch_new_messages(self, mail, mailbox: str):
+        """
+        Yield (uid, message) for messages above the stored high-water mark.
         
-        # Decode subject
-        subject_header = msg.get('Subject', '')
-        if isinstance(subject_header, email.header.Header):
-            subject = str(subject_header)
-        else:
-            subject = subject_header
-
-        # Get sender
-        from_header = msg.get('From', '')
-        sender = from_header
-
-        # Get body
-        body = ''
-        if msg.is_multipart():
-            for part in msg.walk():
-                if part.get_content_type() == 'text/plain':
-                    body = part.get_payload(decode=True).decode(errors='ignore')
-                    break
+        Each batch costs two round trips: one FETCH for BODYSTRUCTURE and
+        the routing headers, then one per distinct text section for just
+        the readable body, capped at IMAP_MAX_BODY_BYTES. Attachments are
+        only described; use fetch_attachment() to download one on demand.
+        
+        On first sync, or when the server reports a new UIDVALIDITY (UIDs
+        were renumbered), only UNSEEN messages are picked up, matching the
+        behaviour before incremental sync existed. Once all of them have
+        been fetched the high-water mark moves to the newest UID in the
+        mailbox, so already read mail is never fetched by a later sync. A
+        run that fails part-way only advances it past the UIDs it fetched.
+        """
+        from .models import MailboxSyncState
+
+        status, _ = mail.select(mailbox, readonly=True)
+        if status != 'OK':
+            raise Exception(f"Could not select mailbox {mailbox}")
+
+        _, validity_data = mail.response('UIDVALIDITY')
+        uidvalidity = int(validity_data[0]) if validity_data and validity_data[0] else None
+
+        state_key = f'{self.email_address}:{mailbox}'
+        state = MailboxSyncState.objects.filter(mailbox=state_key).first()
+
+        if state is None or state.uidvalidity != uidvalidity:
+            last_uid = 0
+            high_water = self._highest_uid(mail, mailbox)
+            self.sync_position = (state_key, uidvalidity, None)
+            status, data = mail.uid('SEARCH', None, 'UNSEEN')
         else:
-            body = msg.get_payload(decode=True).decode(errors='ignore')
+            last_uid = state.last_uid
+            high_water = None
+            self.sync_position = (state_key, uidvalidity, last_uid)
+            status, data = mail.uid('SEARCH', None, 'UID', f'{last_uid + 1}:*')
 
-        return {
-            'from': sender,
-            'subject': subject,
-            'body': body,
-            'date': msg.get('Date', datetime.now().isoformat())
-        }
+        if status != 'OK':
+            raise Exception(f"UID SEARCH failed in mailbox {mailbox}")
+
+        # "N:*" always matches the newest message, even when its UID is below N
+        uids = sorted(int(uid) for uid in data[0].split() if int(uid) > last_uid) if data and data[0] else []
+
+        for start in range(0, len(uids), self.imap_fetch_batch_size):
+            batch = uids[start:start + self.imap_fetch_batch_size]
+            for uid, message in self._fetch_batch(mail, batch):
+                yield uid, message
+                self.sync_position = (state_key, uidvalidity, max(self.sync_position[2] or 0, uid))
+
+        # Only reached when every message was fetched: skip the read mail too
+        if high_water is not None:
+            self.sync_position = (state_key, uidvalidity, max(self.sync_position[2] or 0, high_water))
+
+    @staticmethod
+    def _highest_uid(mail, mailbox: str):
+        """
+        UID of the newest message in the selected mailbox.
+
+        Returns:
+            int or None: UIDNEXT - 1 (0 for an empty mailbox), None when the
+                         server reports no UIDNEXT
+        """
+        _, data = mail.response('UIDNEXT')
+        if not data or not data[0]:
+            status, data = mail.status(mailbox, '(UIDNEXT)')
+            match = re.search(rb'UIDNEXT (\d+)', data[0]) if status == 'OK' and data and data[0] else None
+            data = [match.group(1)] if match else None
+        return int(data[0]) - 1 if data and data[0] else None
+
+    def _fetch_batch(self, mail, uids: list) -> list:
+        """Fetch headers, structure and text body for a batch of UIDs"""
+        status, fetched = mail.uid(
+            'FETCH', self._uid_set(uids), f'(UID BODYSTRUCTURE BODY.PEEK[HEADER.FIELDS ({IMAP_HEADER_FIELDS})])'
+        )
+        if status != 'OK':
+            raise Exception(f"UID FETCH failed for {uids[0]}-{uids[-1]}")
+
+        messages = {}
+        text_parts = {}
+        for items in imap.parse_fetch_response(fetched):
+            try:
+                uid = int(items.get('UID'))
+            except (TypeError, ValueError):
+                continue
+
+            parts = imap.walk_bodystructure(items.get('BODYSTRUCTURE'))
+            headers = email.message_from_bytes(
+                imap.get_body_section(items, f'HEADER.FIELDS ({IMAP_HEADER_FIELDS})') or b''
+            )
+            messages[uid] = {
+                'from': self._decode_header(headers.get('From', '')),
+                'subject': self._decode_header(headers.get('Subject', '')),
+                'date': headers.get('Date', datetime.now().isoformat()),
+                'message_id': (headers.get('Message-ID') or '').strip(),
+                'in_reply_to': (headers.get('In-Reply-To') or '').strip(),
+                'references': (headers.get('References') or '').strip(),
+                'body': '',
+                'truncated': False,
+                'attachments': [
+                    {
+                        'section': part['section'],
+                        'filename': part['filename'],
+                        'content_type': part['content_type'],
+                        'encoding': part['encoding'],
+                        'size': part['size'],
+                    }
+                    for part in parts if imap.is_attachment(part)
+                ],
+            }
+            text_part = imap.select_text_part(parts)
+            if text_part is not None:
+                text_parts[uid] = text_part
+
+        # One FETCH per distinct text section, usually just "1" or "1.1"
+        by_section = {}
+        for uid, part in text_parts.items():
+            by_section.setdefault(part['section'], []).append(uid)
+
+        for section, section_uids in by_section.items():
+            status, fetched = mail.uid(
+                'FETCH', self._uid_set(sorted(section_uids)),
+                f'(UID BODY.PEEK[{section}]<0.{self.imap_max_body_bytes}>)'
+            )
+            if status != 'OK':
+                raise Exception(f"UID FETCH of section {section} failed")
+
+            for items in imap.parse_fetch_response(fetched):
+                try:
+                    uid = int(items.get('UID'))
+                except (TypeError, ValueError):
+                    continue
+                if uid not in text_parts:
+                    continue
+                part = text_parts[uid]
+                raw = imap.decode_part(imap.get_body_section(items, section), part['encoding'])
+                charset = part['params'].get('charset') or 'utf-8'
+                try:
+                    body = raw.decode(charset, errors='ignore')
+                except LookupError:
+                    body = raw.decode('utf-8', errors='ignore')
+                messages[uid]['body'] = body
+                messages[uid]['truncated'] = part['size'] > self.imap_max_body_bytes
+
+        return sorted(messages.items())
+
+    def fetch_attachment(self, uid: int, section: str, encoding: str = 'base64',
+                         mailbox: str = 'INBOX', mail=None) -> bytes:
+        """
+        Download a single attachment described by receive_proposal_emails.
+        
+        Args:
+            uid: UID of the message (valid for the mailbox's current UIDVALIDITY)
+            section: Body section of the attachment, e.g. "2"
+            encoding: Content-Transfer-Encoding reported for the part
+            mailbox: IMAP folder holding the message
+            mail: Optional open IMAP connection to reuse
+            
+        Returns:
+            bytes: Decoded attachment content
+        """
+        owns_connection = mail is None
+        if owns_connection:
+            mail = self.connect_imap()
+
+        try:
+            mail.select(mailbox, readonly=True)
+            status, fetched = mail.uid('FETCH', str(uid), f'(UID BODY.PEEK[{section}])')
+            if status != 'OK':
+                raise Exception(f"Could not fetch attachment {section} of message {uid}")
+
+            for items in imap.parse_fetch_response(fetched):
+                content = imap.get_body_section(items, section)
+                if content is not None:
+                    return imap.decode_part(content, encoding)
+            raise Exception(f"Attachment {section} of message {uid} not found")
+        finally:
+            if owns_connection:
+                mail.logout()
+
+    @staticmethod
+    def _decode_header(value: str) -> str:
+        """Decode RFC 2047 encoded words in a header value"""
+        try:
+            return str(make_header(decode_header(value)))
+        except Exception:
+            return value
+
+    @staticmethod
+    def _uid_set(uids: list) -> str:
+        """Compress sorted UIDs into an IMAP sequence set such as 1:3,7,9:10"""
+        ranges = []
+        range_start = previous = uids[0]
+        for uid in uids[1:]:
+            if uid != previous + 1:
+                ranges.append((range_start, previous))
+                range_start = uid
+            previous = uid
+        ranges.append((range_start, previous))
+        return ','.join(str(a) if a == b else f'{a}:{b}' for a, b in ranges)
+
+    def extract_rfp_id(self, subject: str, body: str) -> str:
+        """
+        Extract RFP ID from email subject or body.
+        
+        Only used for emails that route_replies() cannot place in a thread.
+        
+        Args:
+            subject: Email subject
+            body: Email body
+            
+        Returns:
+            str: RFP ID if found, else empty string
+        """
+        # Search in subject
+        match = RFP_ID_PATTERN.search(subject)
+        if match:
+            return match.group(1)
+        
+        # Search in body
+        match = RFP_ID_PATTERN.search(body)
+        if match:
+            return match.group(1)
+        
+        return ''
 
     def extract_vendor_email(self, email_address: str) -> str:
         """
@@ -185,3 +1056,410 @@ class EmailService:
         if match:
             return match.group(1)
         return email_address.strip()
+
+
+class IMAPIdleListener:
+    """
+    Keeps one authenticated IMAP connection open and ingests proposals as
+    soon as the server announces new mail.
+
+    Servers with the IDLE capability push "* n EXISTS" notifications; IDLE
+    is re-issued every IMAP_IDLE_TIMEOUT seconds to stay within the RFC 2177
+    29 minute limit. Servers without IDLE are polled on the same connection,
+    starting at IMAP_POLL_MIN_INTERVAL and backing off to
+    EMAIL_CHECK_INTERVAL while the mailbox stays quiet.
+    """
+
+    def __init__(self, email_service: EmailService = None, mailbox: str = 'INBOX', log=print):
+        self.email_service = email_service or EmailService()
+        self.mailbox = mailbox
+        self.log = log
+        self.idle_timeout = getattr(settings, 'IMAP_IDLE_TIMEOUT', 600)
+        self.min_poll_interval = getattr(settings, 'IMAP_POLL_MIN_INTERVAL', 15)
+        self.max_poll_interval = max(self.min_poll_interval, getattr(settings, 'EMAIL_CHECK_INTERVAL', 300))
+        self.reconnect_delay = getattr(settings, 'IMAP_RECONNECT_DELAY', 30)
+        # imaplib tags only use the letters A-P, so these never clash with its own
+        self._idle_tags = itertools.count(1)
+
+    def run(self) -> None:
+        """Listen until interrupted, reconnecting whenever the connection drops"""
+        while True:
+            mail = None
+            try:
+                mail = self.email_service.connect_imap()
+                self._ingest(mail)  # Catch up on anything that arrived while disconnected
+
+                if 'IDLE' in mail.capabilities:
+                    self.log(f'Listening for new mail in {self.mailbox} with IMAP IDLE')
+                    self._idle_loop(mail)
+                else:
+                    self.log(f'Server lacks IDLE; polling {self.mailbox} adaptively')
+                    self._poll_loop(mail)
+            except (imaplib.IMAP4.error, OSError) as e:
+                self.log(f'IMAP connection lost ({e}); reconnecting in {self.reconnect_delay}s')
+                time.sleep(self.reconnect_delay)
+            except Exception as e:
+                self.log(f'Listener error ({e}); reconnecting in {self.reconnect_delay}s')
+                time.sleep(self.reconnect_delay)
+            finally:
+                if mail is not None:
+                    try:
+                        mail.logout()
+                    except Exception:
+                        pass
+
+    def _ingest(self, mail):
+        """
+        Ingest new mail on the open connection.
+
+        Database connections are checked before and after, since the
+        listener holds them for days. Errors other than a lost IMAP
+        connection are logged and the listener keeps going; the checkpoint
+        was not advanced, so the mail is picked up by the next attempt.
+
+        Returns:
+            int or None: Number of emails checked, None if the ingest failed
+        """
+        close_old_connections()
+        try:
+            result = self.email_service.ingest_proposal_emails(self.mailbox, mail=mail)
+        except (imaplib.IMAP4.error, OSError):
+            raise  # run() re-establishes the connection
+        except Exception as e:
+            self.log(f'Ingesting proposal emails failed ({e}); retrying on the next check')
+            return None
+        finally:
+            close_old_connections()
+
+        received = len(result['proposals_received'])
+        if result['checked']:
+            self.log(f"Checked {result['checked']} emails, created {received} proposals")
+        return result['checked']
+
+    def _idle_loop(self, mail) -> None:
+        retry = False
+        while True:
+            if self._idle(mail) or retry:
+                retry = self._ingest(mail) is None
+
+    def _poll_loop(self, mail) -> None:
+        interval = self.min_poll_interval
+        while True:
+            time.sleep(interval)
+            if self._ingest(mail):
+                interval = self.min_poll_interval
+            else:
+                interval = min(interval * 2, self.max_poll_interval)
+
+    def _idle(self, mail) -> bool:
+        """
+        Run one IDLE cycle.
+        
+        Returns:
+            bool: True if the server reported new messages
+        """
+        tag = f'RFPIDLE{next(self._idle_tags)}'.encode('ascii')
+        mail.send(tag + b' IDLE\r\n')
+        response = mail.readline()
+        if not response.startswith(b'+'):
+            raise imaplib.IMAP4.abort(f'IDLE rejected: {response!r}')
+
+        has_new_mail = False
+        deadline = time.monotonic() + self.idle_timeout
+        while not has_new_mail:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            if not self._has_buffered_data(mail):
+                ready, _, _ = select.select([mail.sock], [], [], remaining)
+                if not ready:
+                    break
+            line = mail.readline()
+            if not line:
+                raise imaplib.IMAP4.abort('Connection closed during IDLE')
+            has_new_mail = self._is_new_mail(line)
+
+        mail.send(b'DONE\r\n')
+        while True:
+            line = mail.readline()
+            if not line:
+                raise imaplib.IMAP4.abort('Connection closed while leaving IDLE')
+            if line.startswith(tag):
+                break
+            has_new_mail = has_new_mail or self._is_new_mail(line)
+
+        return has_new_mail
+
+    @staticmethod
+    def _has_buffered_data(mail) -> bool:
+        """
+        Whether a response can be read without waiting on the socket.
+
+        Lines that arrived together with an earlier one sit in imaplib's
+        buffered reader (or in the TLS layer), where select() cannot see
+        them. Peeking with the socket briefly non-blocking finds both.
+        """
+        timeout = mail.sock.gettimeout()
+        mail.sock.setblocking(False)
+        try:
+            return bool(mail.file.peek(1))
+        except (BlockingIOError, ssl.SSLWantReadError):
+            return False
+        finally:
+            mail.sock.settimeout(timeout)
+
+    @staticmethod
+    def _is_new_mail(line: bytes) -> bool:
+        return re.match(rb'\* \d+ (EXISTS|RECENT)', line) is not None
+
+
+class TokenBucket:
+    """
+    Token bucket limiting the send rate of one SMTP account.
+
+    The bucket lives in a SendRateBucket row and is updated with a
+    compare-and-swap on its version, so every dispatcher process draws from
+    the same per-account budget. A rate of 0 or less means unlimited.
+    """
+
+    def __init__(self, account: str, rate: float, capacity: int):
+        """
+        Args:
+            account: SMTP account the budget belongs to
+            rate: Tokens added per second (<= 0 disables the limit)
+            capacity: Maximum burst size
+        """
+        self.account = account
+        self.rate = rate
+        self.capacity = max(1, capacity)
+
+    def acquire(self) -> None:
+        """Block until a token is available, then consume it"""
+        if self.rate <= 0:
+            return
+        while True:
+            wait = self.try_acquire()
+            if wait is None:
+                return
+            time.sleep(wait)
+
+    def try_acquire(self):
+        """
+        Take a token if one is available.
+
+        Returns:
+            float or None: None when a token was taken, otherwise the seconds
+                           to wait before trying again
+        """
+        from .models import SendRateBucket
+
+        now = time.time()
+        bucket, _ = SendRateBucket.objects.get_or_create(
+            account=self.account,
+            defaults={'tokens': float(self.capacity), 'refilled_at': now}
+        )
+        tokens = min(self.capacity, bucket.tokens + max(0.0, now - bucket.refilled_at) * self.rate)
+        wait = None if tokens >= 1 else (1 - tokens) / self.rate
+        updated = SendRateBucket.objects.filter(id=bucket.id, version=bucket.version).update(
+            tokens=tokens - 1 if wait is None else tokens,
+            refilled_at=now,
+            version=bucket.version + 1
+        )
+        if not updated:
+            return 0  # Another sender changed the bucket first; read it again
+        return wait
+
+
+def get_rate_limiter(account: str) -> TokenBucket:
+    """Get the token bucket for an SMTP account (EMAIL_RATE_LIMIT_PER_MINUTE=0 disables it)"""
+    return TokenBucket(
+        account,
+        rate=getattr(settings, 'EMAIL_RATE_LIMIT_PER_MINUTE', 60) / 60.0,
+        capacity=getattr(settings, 'EMAIL_RATE_LIMIT_BURST', 10)
+    )
+
+
+class OutboxDispatcher:
+    """
+    Drains the email outbox.
+
+    Due messages are claimed (PENDING -> SENDING) one by one with a
+    conditional update, so several dispatchers can run side by side. A claim
+    is a lease: each message is marked SENT or failed as soon as its send
+    finishes, which also renews the lease on the rest of the batch, and only
+    claims idle for EMAIL_OUTBOX_CLAIM_TIMEOUT are returned to the queue.
+    Failed sends are retried with exponential backoff until
+    EMAIL_OUTBOX_MAX_ATTEMPTS is reached.
+    """
+
+    def __init__(self, email_service: EmailService = None, batch_size: int = None):
+        self.email_service = email_service or EmailService()
+        self.batch_size = batch_size or getattr(settings, 'EMAIL_OUTBOX_BATCH_SIZE', 50)
+        self.max_attempts = getattr(settings, 'EMAIL_OUTBOX_MAX_ATTEMPTS', 5)
+        self.backoff_base = getattr(settings, 'EMAIL_OUTBOX_BACKOFF_BASE', 30)
+        self.backoff_max = getattr(settings, 'EMAIL_OUTBOX_BACKOFF_MAX', 3600)
+        self.claim_timeout = getattr(settings, 'EMAIL_OUTBOX_CLAIM_TIMEOUT', 300)
+
+    def run(self, poll_interval: float = 5, once: bool = False) -> None:
+        """Dispatch batches until interrupted (or a single batch with once=True)"""
+        while True:
+            close_old_connections()
+            counts = self.dispatch_once()
+            if once:
+                return
+            if not counts['claimed']:
+                time.sleep(poll_interval)
+
+    def dispatch_once(self) -> dict:
+        """
+        Claim and send one batch of due messages.
+        
+        Returns:
+            dict: Counts of claimed, sent, retried and failed messages
+        """
+        counts = {'claimed': 0, 'sent': 0, 'retried': 0, 'failed': 0}
+
+        self.release_stale_claims()
+        messages = self.claim_due_messages()
+        counts['claimed'] = len(messages)
+        if not messages:
+            return counts
+
+        sendable = []
+        for message, body, error, permanent in self._render(messages):
+            if error is not None:
+                counts[self._record_failure(message, error, permanent=permanent)] += 1
+            else:
+                sendable.append((message, body))
+
+        self._assign_message_ids([message for message, _ in sendable])
+        unfinished = {message.id for message, _ in sendable}
+
+        def record(index, error):
+            message = sendable[index][0]
+            if error is None:
+                self._record_success(message)
+                counts['sent'] += 1
+            else:
+                counts[self._record_failure(message, error)] += 1
+            unfinished.discard(message.id)
+            self.renew_claims(unfinished)
+
+        self.email_service.send_bulk(
+            [
+                (message.recipient, message.subject, body, {'Message-ID': message.email_message_id})
+                for message, body in sendable
+            ],
+            rate_limiter=get_rate_limiter(self.email_service.email_address),
+            on_result=record
+        )
+        return counts
+
+    def claim_due_messages(self) -> list:
+        """Atomically move a batch of due PENDING messages to SENDING"""
+        from .models import Outbox
+
+        now = timezone.now()
+        candidate_ids = list(
+            Outbox.objects.filter(status='PENDING', next_attempt_at__lte=now)
+            .order_by('next_attempt_at', 'id')
+            .values_list('id', flat=True)[:self.batch_size]
+        )
+
+        claimed_ids = [
+            message_id for message_id in candidate_ids
+            if Outbox.objects.filter(id=message_id, status='PENDING').update(status='SENDING', updated_at=now)
+        ]
+        return list(Outbox.objects.filter(id__in=claimed_ids).order_by('next_attempt_at', 'id'))
+
+    def renew_claims(self, message_ids) -> None:
+        """Extend the lease on claimed messages that are still waiting to be sent"""
+        from .models import Outbox
+
+        if message_ids:
+            Outbox.objects.filter(id__in=list(message_ids), status='SENDING').update(updated_at=timezone.now())
+
+    def release_stale_claims(self) -> int:
+        """Return messages whose lease expired (e.g. after a worker crash) to the queue"""
+        from .models import Outbox
+
+        cutoff = timezone.now() - timedelta(seconds=self.claim_timeout)
+        return Outbox.objects.filter(status='SENDING', updated_at__lt=cutoff).update(status='PENDING')
+
+    def backoff_delay(self, attempts: int) -> int:
+        """Seconds to wait before retry number ``attempts``"""
+        return min(self.backoff_max, self.backoff_base * (2 ** max(0, attempts - 1)))
+
+    def _render(self, messages: list) -> list:
+        """
+        Build the body for each message; RFP templates are loaded once per RFP.
+        
+        Returns:
+            list: (message, body, error, permanent) tuples
+        """
+        from rfp_management.apps.rfps.models import RFP
+        from rfp_management.apps.vendors.models import Vendor
+
+        rfp_messages = [m for m in messages if m.kind == 'RFP']
+        rfps = RFP.objects.in_bulk([m.rfp_id for m in rfp_messages if m.rfp_id.isdigit()])
+        vendors = Vendor.objects.in_bulk([m.vendor_id for m in rfp_messages if m.vendor_id.isdigit()])
+        templates = {}
+        rendered = []
+
+        for message in messages:
+            if message.kind != 'RFP':
+                rendered.append((message, message.body, None, False))
+                continue
+
+            rfp = rfps.get(int(message.rfp_id)) if message.rfp_id.isdigit() else None
+            vendor = vendors.get(int(message.vendor_id)) if message.vendor_id.isdigit() else None
+            if rfp is None or vendor is None:
+                rendered.append((message, None, 'RFP or vendor no longer exists', True))
+                continue
+
+            try:
+                if rfp.id not in templates:
+                    templates[rfp.id] = self.email_service.get_rfp_email_template(rfp)
+                body = self.email_service.render_rfp_email_body(templates[rfp.id], vendor)
+                rendered.append((message, body, None, False))
+            except Exception as e:
+                rendered.append((message, None, str(e), False))
+
+        return rendered
+
+    def _assign_message_ids(self, messages: list) -> None:
+        """Give messages a Message-ID on their first attempt and route RFP replies to it"""
+        from .models import Outbox
+
+        new = [message for message in messages if not message.email_message_id]
+        if not new:
+            return
+
+        for message in new:
+            message.email_message_id = self.email_service.new_message_id()
+        Outbox.objects.bulk_update(new, ['email_message_id'])
+        self.email_service.record_message_routes([
+            (message.email_message_id, message.rfp_id, message.vendor_id)
+            for message in new if message.kind == 'RFP'
+        ])
+
+    def _record_success(self, message) -> None:
+        message.status = 'SENT'
+        message.attempts += 1
+        message.sent_at = timezone.now()
+        message.last_error = ''
+        message.save(update_fields=['status', 'attempts', 'sent_at', 'last_error', 'updated_at'])
+
+    def _record_failure(self, message, error: str, permanent: bool = False) -> str:
+        """Schedule a retry or give up; returns the matching counter name"""
+        message.attempts += 1
+        message.last_error = error
+        if permanent or message.attempts >= self.max_attempts:
+            message.status = 'FAILED'
+            outcome = 'failed'
+        else:
+            message.status = 'PENDING'
+            message.next_attempt_at = timezone.now() + timedelta(seconds=self.backoff_delay(message.attempts))
+            outcome = 'retried'
+        message.save(update_fields=['status', 'attempts', 'last_error', 'next_attempt_at', 'updated_at'])
+        return outcome
@@ -0,0 +1,660 @@
+"""Email service app - tests"""
+import smtplib
+import socket
+import threading
+import time
+from datetime import timedelta
+from unittest import mock
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rfp_management.apps.proposals.models import Proposal
+from rfp_management.apps.rfps.models import RFP
+from rfp_management.apps.vendors.models import Vendor
+from . import imap
+from .models import MailboxSyncState, MessageRoute, Outbox, SendRateBucket, UnmatchedEmail
+from .services import EmailService, IMAPIdleListener, OutboxDispatcher, SMTPSession, TokenBucket
+
+
+class FakeMailbox:
+    """Stand-in for an imaplib connection with a selected, fully read mailbox"""
+
+    def __init__(self, uidvalidity=7, uidnext=101, unseen=(), status_uidnext=None, search_status='OK'):
+        self.uidvalidity = uidvalidity
+        self.uidnext = uidnext
+        self.unseen = unseen
+        self.status_uidnext = status_uidnext
+        self.search_status = search_status
+        self.searches = []
+        self.fetches = []
+
+    def select(self, mailbox, readonly=False):
+        return 'OK', [b'100']
+
+    def response(self, code):
+        value = {'UIDVALIDITY': self.uidvalidity, 'UIDNEXT': self.uidnext}[code]
+        return code, [None if value is None else str(value).encode()]
+
+    def status(self, mailbox, names):
+        if self.status_uidnext is None:
+            return 'NO', [None]
+        return 'OK', [f'"{mailbox}" (UIDNEXT {self.status_uidnext})'.encode()]
+
+    def uid(self, command, *args):
+        if command == 'FETCH':
+            # The server refuses to hand out the messages
+            self.fetches.append(args[0])
+            return 'NO', [b'FETCH failed']
+        self.searches.append(args[1:])
+        return self.search_status, [b' '.join(str(uid).encode() for uid in self.unseen)]
+
+    def logout(self):
+        pass
+
+
+class MailboxSyncTests(TestCase):
+    def setUp(self):
+        self.service = EmailService()
+        self.state_key = f'{self.service.email_address}:INBOX'
+
+    def test_first_sync_without_unseen_mail_starts_at_newest_uid(self):
+        mail = FakeMailbox(uidnext=101)
+        result = self.service.ingest_proposal_emails(mail=mail)
+
+        self.assertEqual(result['checked'], 0)
+        self.assertEqual(mail.searches, [('UNSEEN',)])
+        state = MailboxSyncState.objects.get(mailbox=self.state_key)
+        self.assertEqual((state.uidvalidity, state.last_uid), (7, 100))
+
+        # The next poll only looks past the existing mail
+        self.service.ingest_proposal_emails(mail=mail)
+        self.assertEqual(mail.searches[-1], ('UID', '101:*'))
+
+    def test_uidvalidity_change_restarts_at_newest_uid(self):
+        MailboxSyncState.objects.create(mailbox=self.state_key, uidvalidity=6, last_uid=5000)
+        self.service.ingest_proposal_emails(mail=FakeMailbox(uidnext=None, status_uidnext=43))
+
+        state = MailboxSyncState.objects.get(mailbox=self.state_key)
+        self.assertEqual((state.uidvalidity, state.last_uid), (7, 42))
+
+    def test_failed_first_fetch_does_not_skip_unseen_mail(self):
+        mail = FakeMailbox(uidnext=101, unseen=(95, 99))
+        result = self.service.ingest_proposal_emails(mail=mail)
+
+        self.assertEqual(result['checked'], 0)
+        self.assertEqual(mail.fetches, ['95,99'])
+        self.assertFalse(MailboxSyncState.objects.exists())
+
+        # The next poll looks for the unseen mail again instead of UID 101:*
+        self.service.ingest_proposal_emails(mail=mail)
+        self.assertEqual(mail.searches, [('UNSEEN',), ('UNSEEN',)])
+
+    def test_failed_fetch_keeps_the_stored_checkpoint(self):
+        MailboxSyncState.objects.create(mailbox=self.state_key, uidvalidity=7, last_uid=90)
+        self.service.ingest_proposal_emails(mail=FakeMailbox(uidnext=101, unseen=(95, 99)))
+
+        self.assertEqual(MailboxSyncState.objects.get(mailbox=self.state_key).last_uid, 90)
+
+    def test_failed_search_saves_no_checkpoint(self):
+        self.service.ingest_proposal_emails(mail=FakeMailbox(uidnext=101, search_status='NO'))
+
+        self.assertFalse(MailboxSyncState.objects.exists())
+
+    def test_unknown_mailbox_end_saves_no_checkpoint(self):
+        self.service.ingest_proposal_emails(mail=FakeMailbox(uidnext=None))
+
+        self.assertFalse(MailboxSyncState.objects.exists())
+
+
+class FakeInbox:
+    """receive_proposal_emails stand-in that streams prepared emails above the checkpoint"""
+
+    def __init__(self, service, emails, fail_after=None):
+        self.service = service
+        self.emails = emails
+        self.fail_after = fail_after
+
+    def __call__(self, mailbox='INBOX', mail=None):
+        service = self.service
+        state_key = f'{service.email_address}:{mailbox}'
+        state = MailboxSyncState.objects.filter(mailbox=state_key).first()
+        last_uid = state.last_uid if state else 0
+        service.sync_position = (state_key, 7, last_uid)
+        for count, email_data in enumerate([e for e in self.emails if e['uid'] > last_uid]):
+            if count == self.fail_after:
+                raise ConnectionResetError('Connection lost')
+            yield email_data
+            service.sync_position = (state_key, 7, email_data['uid'])
+
+
+def incoming(uid, sender='sales@acme.com', subject='Re: Laptops', body='Total: $48,500', **headers):
+    """Email as yielded by receive_proposal_emails"""
+    return {
+        'sender': sender, 'subject': subject, 'body': body, 'uid': uid,
+        'message_id': headers.get('message_id', f'<{uid}@mail.example.com>'),
+        'in_reply_to': headers.get('in_reply_to', ''), 'references': headers.get('references', ''),
+        'received_date': '', 'truncated': False, 'attachments': []
+    }
+
+
+class IngestTestCase(TestCase):
+    def setUp(self):
+        self.service = EmailService()
+        self.service.ingest_batch_size = 2
+        self.state_key = f'{self.service.email_address}:INBOX'
+        self.rfp = RFP.objects.create(
+            title='Laptops', description='Office laptops', deadline=timezone.now() + timedelta(days=14)
+        )
+        self.acme = Vendor.objects.create(name='Acme', email='sales@acme.com')
+
+    def ingest(self, emails, fail_after=None):
+        with mock.patch.object(self.service, 'receive_proposal_emails', FakeInbox(self.service, emails, fail_after)):
+            return self.service.ingest_proposal_emails()
+
+    def quote(self, uid, **fields):
+        return incoming(uid, subject=f'Re: [RFP: {self.rfp.id}] Laptops', **fields)
+
+
+class EmailIngestBatchTests(IngestTestCase):
+    def test_emails_are_stored_in_batches(self):
+        with mock.patch.object(EmailService, '_ingest_batch', autospec=True,
+                               side_effect=EmailService._ingest_batch) as ingest_batch:
+            result = self.ingest([self.quote(uid) for uid in range(1, 6)])
+
+        self.assertEqual([len(call.args[1]) for call in ingest_batch.call_args_list], [2, 2, 1])
+        self.assertEqual(result['checked'], 5)
+        self.assertEqual(len(result['proposals_received']), 5)
+        self.assertEqual(Proposal.objects.filter(rfp=self.rfp).count(), 5)
+        self.assertEqual(MailboxSyncState.objects.get(mailbox=self.state_key).last_uid, 5)
+
+    def test_crash_keeps_committed_batches_and_resumes_after_them(self):
+        emails = [self.quote(uid) for uid in range(1, 6)]
+        with self.assertRaises(ConnectionResetError):
+            self.ingest(emails, fail_after=3)
+
+        # The first batch and its checkpoint were committed together
+        self.assertEqual(MailboxSyncState.objects.get(mailbox=self.state_key).last_uid, 2)
+        self.assertEqual(Proposal.objects.count(), 2)
+
+        result = self.ingest(emails)
+        self.assertEqual(result['checked'], 3)
+        self.assertEqual(sorted(Proposal.objects.values_list('email_message_id', flat=True)),
+                         sorted(email_data['message_id'] for email_data in emails))
+        self.assertEqual(MailboxSyncState.objects.get(mailbox=self.state_key).last_uid, 5)
+
+    def test_unmatched_emails_are_checkpointed_with_the_batch(self):
+        result = self.ingest([incoming(1, sender='someone@unknown.org'), self.quote(2)])
+
+        self.assertEqual(result['triaged'], 1)
+        self.assertEqual(UnmatchedEmail.objects.get().reason, 'UNKNOWN_VENDOR')
+        self.assertEqual(MailboxSyncState.objects.get(mailbox=self.state_key).last_uid, 2)
+
+
+class MessageIdDedupTests(IngestTestCase):
+    def test_reingesting_a_mailbox_is_a_no_op(self):
+        emails = [self.quote(uid) for uid in range(1, 4)]
+        self.ingest(emails)
+        # A lost checkpoint makes the next run read the same mail again
+        MailboxSyncState.objects.all().delete()
+
+        with CaptureQueriesContext(connection) as queries:
+            result = self.ingest(emails)
+
+        self.assertEqual(result['checked'], 3)
+        self.assertEqual(result['proposals_received'], [])
+        self.assertEqual(Proposal.objects.count(), 3)
+        self.assertFalse([q for q in queries.captured_queries if q['sql'].startswith('INSERT INTO "proposals"')])
+
+    def test_duplicate_message_ids_in_one_batch_are_stored_once(self):
+        result = self.ingest([self.quote(1, message_id='<quote@acme.com>'),
+                              self.quote(2, message_id='<quote@acme.com>')])
+
+        self.assertEqual(len(result['proposals_received']), 1)
+        self.assertEqual(Proposal.objects.get().email_message_id, '<quote@acme.com>')
+
+    def test_proposal_stored_by_another_worker_is_ignored(self):
+        Proposal.objects.create(rfp=self.rfp, vendor=self.acme, vendor_name='Acme',
+                                proposal_content='Total: $48,500', email_message_id='<1@mail.example.com>')
+
+        # The pre-check misses the row, as if the other worker committed in between
+        with mock.patch.object(Proposal.objects, 'filter', wraps=Proposal.objects.filter) as filter_:
+            filter_.side_effect = lambda *args, **kwargs: (
+                Proposal.objects.none() if 'email_message_id__in' in kwargs and filter_.call_count == 1
+                else Proposal.objects.all().filter(*args, **kwargs)
+            )
+            self.ingest([self.quote(1)])
+
+        # The unique index turns the second insert into a no-op instead of an error
+        self.assertEqual(Proposal.objects.count(), 1)
+        self.assertEqual(MailboxSyncState.objects.get(mailbox=self.state_key).last_uid, 1)
+
+
+@override_settings(VENDOR_DOMAIN_MATCH_EXCLUDE=['gmail.com'])
+class VendorResolutionTests(IngestTestCase):
+    def setUp(self):
+        super().setUp()
+        self.globex = Vendor.objects.create(name='Globex', email='Bids@Globex.com')
+        Vendor.objects.create(name='Initech East', email='east@initech.com')
+        Vendor.objects.create(name='Initech West', email='west@initech.com')
+        Vendor.objects.create(name='Freelancer', email='freelancer@gmail.com')
+
+    def test_exact_address_then_domain(self):
+        with self.assertNumQueries(2):
+            matches = self.service.resolve_vendors([
+                'Sales <SALES@acme.com>', 'bids@globex.com', 'jane@acme.com',
+                'someone@initech.com', 'other@gmail.com', 'east@initech.com'
+            ])
+
+        self.assertEqual(matches, {
+            'sales@acme.com': self.acme,
+            'bids@globex.com': self.globex,
+            'jane@acme.com': self.acme,
+            'east@initech.com': Vendor.objects.get(name='Initech East'),
+        })
+
+    def test_exact_matches_need_one_query(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(self.service.resolve_vendors(['sales@acme.com', '']), {'sales@acme.com': self.acme})
+
+    def test_unmatched_mail_goes_to_triage(self):
+        result = self.ingest([
+            self.quote(1, sender='Jane <jane@acme.com>'),
+            self.quote(2, sender='someone@initech.com'),
+            incoming(3, subject='Re: [RFP: 999] Laptops'),
+        ])
+
+        self.assertEqual(result['checked'], 3)
+        self.assertEqual(result['triaged'], 2)
+        self.assertEqual(Proposal.objects.get().vendor, self.acme)
+        triage = {email.sender: (email.reason, email.vendor_id, email.rfp_id) for email in UnmatchedEmail.objects.all()}
+        self.assertEqual(triage, {
+            'someone@initech.com': ('UNKNOWN_VENDOR', '', str(self.rfp.id)),
+            'sales@acme.com': ('UNKNOWN_RFP', str(self.acme.id), '999'),
+        })
+
+
+class ReplyRoutingTests(IngestTestCase):
+    def setUp(self):
+        super().setUp()
+        self.other_rfp = RFP.objects.create(
+            title='Monitors', description='Office monitors', deadline=timezone.now() + timedelta(days=14)
+        )
+        self.service.record_message_routes([
+            ('<rfp-laptops@rfp.example.com>', self.rfp.id, self.acme.id),
+            ('<rfp-monitors@rfp.example.com>', self.other_rfp.id, self.acme.id),
+        ])
+
+    def test_in_reply_to_routes_without_subject_or_sender_match(self):
+        email_data = incoming(1, sender='jane.doe@gmail.com', subject='Our quote',
+                              body=f'> RFP: {self.other_rfp.id}', in_reply_to='<rfp-laptops@rfp.example.com>')
+        result = self.ingest([email_data])
+
+        self.assertEqual(result['triaged'], 0)
+        proposal = Proposal.objects.get()
+        self.assertEqual((proposal.rfp_id, proposal.vendor), (self.rfp.id, self.acme))
+
+    def test_newest_known_reference_wins(self):
+        email_data = incoming(1, references='<rfp-monitors@rfp.example.com> <rfp-laptops@rfp.example.com> '
+                                            '<unknown@acme.com>')
+
+        with self.assertNumQueries(1):
+            routes = self.service.route_replies([email_data])
+        self.assertEqual(routes[email_data['message_id']].rfp_id, str(self.rfp.id))
+
+        # In-Reply-To is more specific than References
+        email_data['in_reply_to'] = '<rfp-monitors@rfp.example.com>'
+        self.assertEqual(self.service.route_replies([email_data])[email_data['message_id']].rfp_id,
+                         str(self.other_rfp.id))
+
+    def test_unrouted_mail_falls_back_to_the_subject(self):
+        self.assertEqual(self.service.route_replies([incoming(1)]), {})
+
+        subject = 'Re: ' + self.service.rfp_email_subject(self.other_rfp)
+        self.ingest([incoming(1, subject=subject, in_reply_to='<unknown@acme.com>')])
+        self.assertEqual(Proposal.objects.get().rfp_id, self.other_rfp.id)
+
+
+class SocketMailbox:
+    """IMAP connection whose server side is the other end of a socket pair"""
+
+    def __init__(self):
+        self.sock, self.server = socket.socketpair()
+        self.file = self.sock.makefile('rb')
+        self.commands = []
+
+    def send(self, data):
+        self.commands.append(data)
+        self.sock.sendall(data)
+
+    def readline(self):
+        return self.file.readline()
+
+    def close(self):
+        self.file.close()
+        self.sock.close()
+        self.server.close()
+
+
+@override_settings(IMAP_IDLE_TIMEOUT=3)
+class IMAPIdleListenerTests(TestCase):
+    def setUp(self):
+        self.mail = SocketMailbox()
+        self.addCleanup(self.mail.close)
+        self.listener = IMAPIdleListener(email_service=mock.Mock(), log=lambda message: None)
+
+    def test_exists_sent_with_the_continuation_is_seen_at_once(self):
+        # Both lines arrive in one packet, so the reader buffers the EXISTS
+        self.mail.server.sendall(b'+ idling\r\n* 3 EXISTS\r\n')
+        self.mail.server.sendall(b'RFPIDLE1 OK IDLE terminated\r\n')
+
+        started = time.monotonic()
+        self.assertTrue(self.listener._idle(self.mail))
+
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertEqual(self.mail.commands, [b'RFPIDLE1 IDLE\r\n', b'DONE\r\n'])
+
+    def test_quiet_mailbox_ends_the_cycle_at_the_timeout(self):
+        self.listener.idle_timeout = 0.2
+        self.mail.server.sendall(b'+ idling\r\n')
+        threading.Timer(0.4, self.mail.server.sendall, [b'RFPIDLE1 OK IDLE terminated\r\n']).start()
+
+        self.assertFalse(self.listener._idle(self.mail))
+
+    def test_failed_ingest_is_logged_and_retried(self):
+        service = self.listener.email_service
+        service.ingest_proposal_emails.side_effect = [
+            RuntimeError('database is locked'),
+            {'checked': 1, 'proposals_received': [{'id': '1'}], 'triaged': 0},
+        ]
+
+        with mock.patch('rfp_management.apps.email_service.services.close_old_connections') as close:
+            self.assertIsNone(self.listener._ingest(self.mail))
+            self.assertEqual(self.listener._ingest(self.mail), 1)
+        self.assertEqual(close.call_count, 4)
+
+    def test_lost_connection_still_propagates(self):
+        self.listener.email_service.ingest_proposal_emails.side_effect = ConnectionResetError()
+
+        with self.assertRaises(ConnectionResetError):
+            self.listener._ingest(self.mail)
+
+
+class BodyStructureTests(TestCase):
+    HEADER = b'From: sales@vendor.com\r\nSubject: Re: RFP\r\n\r\n'
+    FETCH = [
+        (b'1 (UID 42 BODYSTRUCTURE ((("TEXT" "PLAIN" ("CHARSET" "utf-8") NIL NIL "QUOTED-PRINTABLE" 20 1 NIL NIL NIL)'
+         b'("TEXT" "HTML" ("CHARSET" "utf-8") NIL NIL "7BIT" 30 1 NIL NIL NIL) "ALTERNATIVE" ("BOUNDARY" "b1") NIL NIL)'
+         b'("APPLICATION" "PDF" ("NAME" "quote.pdf") NIL NIL "BASE64" 1000 NIL ("ATTACHMENT" ("FILENAME" "quote.pdf")) NIL)'
+         b' "MIXED" ("BOUNDARY" "b0") NIL NIL) BODY[HEADER.FIELDS (FROM SUBJECT)] {%d}' % len(HEADER), HEADER),
+        b')',
+    ]
+
+    def test_fetch_response_is_split_into_items(self):
+        [items] = imap.parse_fetch_response(self.FETCH)
+
+        self.assertEqual(items['UID'], '42')
+        self.assertEqual(imap.get_body_section(items, 'HEADER.FIELDS (FROM SUBJECT)'), self.HEADER)
+
+    def test_nested_parts_are_numbered_and_the_plain_text_is_chosen(self):
+        [items] = imap.parse_fetch_response(self.FETCH)
+        parts = imap.walk_bodystructure(items['BODYSTRUCTURE'])
+
+        self.assertEqual([(part['section'], part['content_type']) for part in parts],
+                         [('1.1', 'text/plain'), ('1.2', 'text/html'), ('2', 'application/pdf')])
+        self.assertEqual((parts[2]['disposition'], parts[2]['filename']), ('attachment', 'quote.pdf'))
+        self.assertEqual(imap.select_text_part(parts)['section'], '1.1')
+        self.assertEqual(parts[0]['encoding'], 'quoted-printable')
+
+    def test_single_part_message_is_section_one(self):
+        parts = imap.walk_bodystructure(['TEXT', 'HTML', ['CHARSET', 'utf-8'], None, None, '7BIT', '12', '1'])
+
+        self.assertEqual(parts[0]['section'], '1')
+        self.assertEqual(imap.select_text_part(parts)['content_type'], 'text/html')
+
+    def test_partial_transfer_encodings_are_decoded(self):
+        # A partial fetch may end in the middle of a base64 quantum
+        self.assertEqual(imap.decode_part(b'VG90YWw6ICQ0OCw1MDA=\r\nVG9', 'BASE64'), b'Total: $48,500')
+        self.assertEqual(imap.decode_part(b'Net=2030 =E2=82=AC', 'quoted-printable'), 'Net 30 €'.encode())
+        self.assertEqual(imap.decode_part(None, '7bit'), b'')
+
+
+class RecordingSession:
+    """SMTP session that records recipients and refuses the given addresses"""
+
+    def __init__(self, sent: list, refused=()):
+        self.sent = sent
+        self.refused = refused
+
+    def send(self, recipient, subject, body, headers=None):
+        if recipient in self.refused:
+            raise Exception(f'Recipient refused: {recipient}')
+        self.sent.append(recipient)
+
+    def close(self):
+        pass
+
+
+class FakeSMTP:
+    """smtplib.SMTP stand-in that counts connections and can fail sends"""
+
+    connections = 0
+
+    def __init__(self, host, port):
+        FakeSMTP.connections += 1
+
+    def starttls(self):
+        pass
+
+    def login(self, username, password):
+        pass
+
+    def sendmail(self, sender, recipients, message):
+        if FakeSMTP.failures:
+            raise FakeSMTP.failures.pop(0)
+        FakeSMTP.sent.extend(recipients)
+
+    def quit(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class SMTPSessionTests(TestCase):
+    def setUp(self):
+        FakeSMTP.connections = 0
+        FakeSMTP.failures = []
+        FakeSMTP.sent = []
+        patcher = mock.patch('smtplib.SMTP', FakeSMTP)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.session = SMTPSession('smtp.example.com', 587, 'user', 'secret', 'rfp@example.com')
+
+    def test_one_connection_serves_many_messages(self):
+        with self.session:
+            for recipient in ['a@example.com', 'b@example.com', 'c@example.com']:
+                self.session.send(recipient, 'RFP', 'Body')
+
+        self.assertEqual(FakeSMTP.connections, 1)
+        self.assertEqual(FakeSMTP.sent, ['a@example.com', 'b@example.com', 'c@example.com'])
+
+    def test_dropped_connection_is_reopened_once(self):
+        FakeSMTP.failures.append(smtplib.SMTPServerDisconnected('gone'))
+        self.session.send('a@example.com', 'RFP', 'Body')
+
+        self.assertEqual(FakeSMTP.connections, 2)
+        self.assertEqual(FakeSMTP.sent, ['a@example.com'])
+
+        # A connection that fails again right after reopening gives up
+        FakeSMTP.failures.extend([ConnectionResetError(), ConnectionResetError()])
+        with self.assertRaises(ConnectionResetError):
+            self.session.send('b@example.com', 'RFP', 'Body')
+        self.assertEqual(FakeSMTP.connections, 3)
+
+    def test_server_errors_are_not_retried(self):
+        for error in [smtplib.SMTPRecipientsRefused({'a@example.com': (550, b'No such user')}),
+                      smtplib.SMTPDataError(554, b'Rejected'),
+                      smtplib.SMTPAuthenticationError(535, b'Bad credentials')]:
+            FakeSMTP.failures.append(error)
+            with self.assertRaises(type(error)):
+                self.session.send('a@example.com', 'RFP', 'Body')
+
+        # The connection stays usable for the next message
+        self.session.send('b@example.com', 'RFP', 'Body')
+        self.assertEqual(FakeSMTP.connections, 1)
+        self.assertEqual(FakeSMTP.sent, ['b@example.com'])
+
+
+@mock.patch('rfp_management.apps.ai.services.AIService.generate_rfp_email_body',
+            return_value='Hello [Vendor Name],\n\nPlease quote for 20 laptops.\n\nRegards')
+class RFPEmailTemplateTests(TestCase):
+    def setUp(self):
+        self.service = EmailService()
+        self.rfp = RFP.objects.create(
+            title='Laptops', description='Office laptops', deadline=timezone.now() + timedelta(days=14),
+            requirements={'items': [{'name': 'Laptop', 'quantity': 20}]}
+        )
+
+    def test_stored_body_is_reused(self, generate):
+        first = self.service.get_rfp_email_template(self.rfp)
+        second = self.service.get_rfp_email_template(RFP.objects.get(id=self.rfp.id))
+
+        self.assertEqual(first, second)
+        self.assertEqual(generate.call_count, 1)
+        self.assertTrue(RFP.objects.get(id=self.rfp.id).has_current_email_body)
+
+    def test_changed_requirements_regenerate_the_body(self, generate):
+        self.service.get_rfp_email_template(self.rfp)
+        self.rfp.requirements = {'items': [{'name': 'Laptop', 'quantity': 40}]}
+        self.rfp.save()
+
+        self.assertFalse(self.rfp.has_current_email_body)
+        self.service.get_rfp_email_template(self.rfp)
+        self.assertEqual(generate.call_count, 2)
+        generate.assert_called_with('Laptops', self.rfp.requirements)
+
+    def test_body_is_personalised_per_vendor(self, generate):
+        template = self.service.get_rfp_email_template(self.rfp)
+        acme = Vendor(name='Acme', email='sales@acme.com', contact_person='Jane')
+        globex = Vendor(name='Globex', email='bids@globex.com')
+
+        self.assertTrue(self.service.render_rfp_email_body(template, acme).startswith('Hello Acme,'))
+        self.assertTrue(self.service.render_rfp_email_body(template, globex).startswith('Hello Globex,'))
+        # Bodies without a greeting are addressed to the contact person
+        self.assertTrue(self.service.render_rfp_email_body('Please quote.', acme).startswith('Dear Jane,'))
+
+
+class TokenBucketTests(TestCase):
+    def test_buckets_of_one_account_share_the_budget(self):
+        first = TokenBucket('sales@example.com', rate=1 / 60, capacity=2)
+        second = TokenBucket('sales@example.com', rate=1 / 60, capacity=2)
+
+        self.assertIsNone(first.try_acquire())
+        self.assertIsNone(second.try_acquire())
+        wait = first.try_acquire()
+        self.assertGreater(wait, 50)
+        # Another account has its own budget
+        self.assertIsNone(TokenBucket('ops@example.com', rate=1 / 60, capacity=2).try_acquire())
+
+    def test_tokens_refill_over_time(self):
+        bucket = TokenBucket('sales@example.com', rate=1, capacity=1)
+        self.assertIsNone(bucket.try_acquire())
+        SendRateBucket.objects.update(refilled_at=SendRateBucket.objects.get().refilled_at - 2)
+        self.assertIsNone(bucket.try_acquire())
+
+    def test_zero_rate_is_unlimited(self):
+        bucket = TokenBucket('sales@example.com', rate=0, capacity=1)
+        for _ in range(5):
+            bucket.acquire()
+        self.assertFalse(SendRateBucket.objects.exists())
+
+
+@override_settings(EMAIL_RATE_LIMIT_PER_MINUTE=0)
+class OutboxDispatcherTests(TestCase):
+    def setUp(self):
+        self.service = EmailService()
+        self.sent = []
+        for vendor_id, recipient in enumerate(['a@example.com', 'b@example.com', 'c@example.com']):
+            self.service.enqueue_email('ACCEPTANCE', 1, vendor_id, recipient, 'Accepted', 'Body')
+
+    def dispatch(self, refused=()):
+        with mock.patch.object(EmailService, 'open_smtp_session', lambda _: RecordingSession(self.sent, refused)):
+            return OutboxDispatcher(email_service=self.service).dispatch_once()
+
+    def test_each_message_is_recorded_as_it_finishes(self):
+        counts = self.dispatch(refused={'b@example.com'})
+
+        self.assertEqual(counts, {'claimed': 3, 'sent': 2, 'retried': 1, 'failed': 0})
+        self.assertEqual(sorted(self.sent), ['a@example.com', 'c@example.com'])
+        statuses = dict(Outbox.objects.values_list('recipient', 'status'))
+        self.assertEqual(statuses, {'a@example.com': 'SENT', 'b@example.com': 'PENDING', 'c@example.com': 'SENT'})
+
+    def test_results_are_reported_in_the_calling_thread(self):
+        threads = []
+        self.service.max_in_flight = 3
+        with mock.patch.object(EmailService, 'open_smtp_session', lambda _: RecordingSession(self.sent)):
+            results = self.service.send_bulk(
+                [('x@example.com', 's', 'b'), ('y@example.com', 's', 'b')],
+                on_result=lambda index, error: threads.append((index, threading.get_ident()))
+            )
+        self.assertEqual(results, [None, None])
+        self.assertEqual(sorted(index for index, _ in threads), [0, 1])
+        self.assertEqual({ident for _, ident in threads}, {threading.get_ident()})
+
+    def test_only_expired_leases_are_released(self):
+        dispatcher = OutboxDispatcher(email_service=self.service)
+        claimed = dispatcher.claim_due_messages()
+        Outbox.objects.update(updated_at=timezone.now() - timedelta(seconds=dispatcher.claim_timeout + 1))
+        dispatcher.renew_claims([claimed[0].id])
+
+        self.assertEqual(dispatcher.release_stale_claims(), 2)
+        self.assertEqual(Outbox.objects.get(id=claimed[0].id).status, 'SENDING')
+
+
+@mock.patch('rfp_management.apps.ai.services.AIService.generate_rfp_email_body',
+            return_value='Hello [Vendor Name],\n\nPlease quote for 20 laptops.')
+class RFPFanOutTests(TestCase):
+    def setUp(self):
+        self.service = EmailService()
+        self.service.max_in_flight = 2
+        self.sent = []
+        self.rfp = RFP.objects.create(
+            title='Laptops', description='Office laptops', deadline=timezone.now() + timedelta(days=14)
+        )
+        self.acme = Vendor.objects.create(name='Acme', email='sales@acme.com')
+        self.globex = Vendor.objects.create(name='Globex', email='bids@globex.com')
+        self.initech = Vendor.objects.create(name='Initech', email='rfp@initech.com')
+
+    def send(self, vendor_ids, refused=()):
+        with mock.patch.object(EmailService, 'open_smtp_session', lambda _: RecordingSession(self.sent, refused)):
+            return self.service.send_rfp_to_vendors(self.rfp, vendor_ids)
+
+    def test_results_are_keyed_by_vendor_id(self, generate):
+        vendor_ids = [self.acme.id, str(self.globex.id), self.initech.id, 999, 'not-an-id']
+        results = self.send(vendor_ids, refused={'bids@globex.com'})
+
+        self.assertEqual(list(results), [str(vendor_id) for vendor_id in vendor_ids])
+        self.assertEqual(results[str(self.acme.id)], {'success': True, 'email': 'sales@acme.com'})
+        self.assertEqual(results[str(self.globex.id)], {
+            'success': False, 'email': 'bids@globex.com', 'error': 'Recipient refused: bids@globex.com'
+        })
+        self.assertEqual(results[str(self.initech.id)], {'success': True, 'email': 'rfp@initech.com'})
+        self.assertEqual(results['999'], {'success': False, 'email': None, 'error': 'Vendor not found'})
+        self.assertEqual(results['not-an-id'], {'success': False, 'email': None, 'error': 'Vendor not found'})
+        self.assertEqual(sorted(self.sent), ['rfp@initech.com', 'sales@acme.com'])
+        # The body is generated once for the whole fan-out
+        self.assertEqual(generate.call_count, 1)
+
+    def test_only_delivered_emails_keep_a_reply_route(self, generate):
+        self.send([self.acme.id, self.globex.id], refused={'bids@globex.com'})
+
+        routes = MessageRoute.objects.values_list('rfp_id', 'vendor_id')
+        self.assertEqual(list(routes), [(str(self.rfp.id), str(self.acme.id))])
+
+    def test_unknown_vendors_send_nothing(self, generate):
+        results = self.send([999])
+
+        self.assertEqual(results, {'999': {'success': False, 'email': None, 'error': 'Vendor not found'}})
+        self.assertEqual(self.sent, [])
+        generate.assert_not_called()
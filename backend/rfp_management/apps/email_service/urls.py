@@ -5,4 +5,6 @@ from .views import EmailServiceViewSet
 urlpatterns = [
     path('check-proposals/', EmailServiceViewSet.as_view({'post': 'check_proposals'})),
     path('send-rfp/', EmailServiceViewSet.as_view({'post': 'send_rfp'})),
+    path('outbox/<int:pk>/', EmailServiceViewSet.as_view({'get': 'outbox_status'})),
+    path('triage/', EmailServiceViewSet.as_view({'get': 'triage'})),
 ]
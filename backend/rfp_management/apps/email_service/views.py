@@ -1,12 +1,12 @@
 """Email service app - views"""
+from django.conf import settings
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from .models import Outbox, UnmatchedEmail
+from .serializers import OutboxSerializer, UnmatchedEmailSerializer
 from .services import EmailService
-from rfp_management.apps.proposals.models import Proposal
-from rfp_management.apps.vendors.models import Vendor
 from rfp_management.apps.rfps.models import RFP
-import re
 
 
 class EmailServiceViewSet(viewsets.ViewSet):
@@ -17,43 +17,12 @@ class EmailServiceViewSet(viewsets.ViewSet):
         """Check for incoming proposal emails"""
         try:
             email_service = EmailService()
-            emails = email_service.receive_proposal_emails()
-            
-            received_proposals = []
-            
-            for email_data in emails:
-                sender = email_service.extract_vendor_email(email_data['sender'])
-                
-                # Try to match vendor
-                try:
-                    vendor = Vendor.objects.get(email=sender)
-                except Vendor.DoesNotExist:
-                    vendor = None
-                
-                # Try to find RFP from subject or email content
-                rfp_id = self._extract_rfp_id(email_data['subject'], email_data['body'])
-                
-                if vendor and rfp_id:
-                    # Create proposal
-                    proposal = Proposal.objects.create(
-                        rfp_id=rfp_id,
-                        vendor_id=str(vendor.id),
-                        vendor_name=vendor.name,
-                        proposal_content=email_data['body'],
-                        email_message_id=email_data['message_id'],
-                        status='RECEIVED'
-                    )
-                    
-                    received_proposals.append({
-                        'id': str(proposal.id),
-                        'vendor': vendor.name,
-                        'rfp_id': rfp_id,
-                        'subject': email_data['subject']
-                    })
+            result = email_service.ingest_proposal_emails()
             
             return Response({
-                'message': f'Checked {len(emails)} emails',
-                'proposals_received': received_proposals
+                'message': f"Checked {result['checked']} emails",
+                'proposals_received': result['proposals_received'],
+                'triaged': result['triaged']
             }, status=status.HTTP_200_OK)
             
         except Exception as e:
@@ -77,6 +46,17 @@ class EmailServiceViewSet(viewsets.ViewSet):
         try:
             rfp = RFP.objects.get(id=rfp_id)
             email_service = EmailService()
+
+            if settings.EMAIL_USE_OUTBOX:
+                result = email_service.enqueue_rfp_to_vendors(rfp, [vendor_id])[str(vendor_id)]
+                if not result['success']:
+                    raise Exception(result['error'])
+                return Response({
+                    'message': f'RFP queued for vendor {vendor_id}',
+                    'outbox_message_id': result['message_id'],
+                    'status': result['status']
+                }, status=status.HTTP_202_ACCEPTED)
+
             email_service.send_rfp_to_vendor(rfp, vendor_id)
             
             return Response({
@@ -94,28 +74,26 @@ class EmailServiceViewSet(viewsets.ViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-    def _extract_rfp_id(self, subject: str, body: str) -> str:
-        """
-        Extract RFP ID from email subject or body.
-        
-        Args:
-            subject: Email subject
-            body: Email body
-            
-        Returns:
-            str: RFP ID if found, else empty string
-        """
-        # Try to find RFP ID pattern
-        pattern = r'RFP[:\s]+(\d+)'
-        
-        # Search in subject
-        match = re.search(pattern, subject, re.IGNORECASE)
-        if match:
-            return match.group(1)
-        
-        # Search in body
-        match = re.search(pattern, body, re.IGNORECASE)
-        if match:
-            return match.group(1)
-        
-        return ''
+    @action(detail=True, methods=['get'])
+    def outbox_status(self, request, pk=None):
+        """Get delivery status of a queued outbox message"""
+        try:
+            message = Outbox.objects.get(id=pk)
+        except Outbox.DoesNotExist:
+            return Response(
+                {'error': 'Outbox message not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        return Response(OutboxSerializer(message).data, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['get'])
+    def triage(self, request):
+        """List incoming emails that could not be matched to a vendor or RFP"""
+        emails = UnmatchedEmail.objects.order_by('-created_at')
+        reason = request.query_params.get('reason')
+        if reason:
+            emails = emails.filter(reason=reason)
+
+        serializer = UnmatchedEmailSerializer(emails, many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.8 on 2026-10-18 20:12
+
+from django.db import migrations, models
+
+
+def clear_legacy_message_ids(apps, schema_editor):
+    """
+    Blank out values that are not RFC 5322 Message-IDs (earlier versions
+    stored IMAP sequence numbers) and duplicates, so the unique index can
+    be created.
+    """
+    Proposal = apps.get_model('proposals', 'Proposal')
+    seen = set()
+    for proposal in Proposal.objects.exclude(email_message_id='').order_by('id').only('id', 'email_message_id'):
+        message_id = proposal.email_message_id
+        if '@' not in message_id or message_id in seen:
+            Proposal.objects.filter(id=proposal.id).update(email_message_id='')
+        else:
+            seen.add(message_id)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('proposals', '0004_alter_proposal_status'),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_legacy_message_ids, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='proposal',
+            constraint=models.UniqueConstraint(condition=models.Q(('email_message_id', ''), _negated=True), fields=('email_message_id',), name='unique_proposal_email_message_id'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.8 on 2026-10-18 20:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('proposals', '0005_unique_email_message_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='proposal',
+            name='evaluation_hash',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+    ]
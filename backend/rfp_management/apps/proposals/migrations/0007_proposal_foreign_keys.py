@@ -0,0 +1,59 @@
+# Generated by Django 4.2.8 on 2026-10-18 20:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rfps', '0003_rfp_evaluation_summary'),
+        ('vendors', '0002_vendor_email_index'),
+        ('proposals', '0006_proposal_evaluation_hash'),
+    ]
+
+    operations = [
+        # Keep the string IDs under a new name; 0008 copies them into the foreign keys
+        migrations.RenameField(
+            model_name='proposal',
+            old_name='rfp_id',
+            new_name='legacy_rfp_id',
+        ),
+        migrations.RenameField(
+            model_name='proposal',
+            old_name='vendor_id',
+            new_name='legacy_vendor_id',
+        ),
+        migrations.AlterField(
+            model_name='proposal',
+            name='legacy_rfp_id',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='proposal',
+            name='legacy_vendor_id',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='proposal',
+            name='rfp',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='proposals', to='rfps.rfp'),
+        ),
+        migrations.AddField(
+            model_name='proposal',
+            name='vendor',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='proposals', to='vendors.vendor'),
+        ),
+        migrations.AddIndex(
+            model_name='proposal',
+            index=models.Index(fields=['rfp', 'received_at'], name='proposal_rfp_received_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='proposal',
+            index=models.Index(fields=['vendor', 'received_at'], name='proposal_vendor_received_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='proposal',
+            index=models.Index(fields=['rfp', 'status'], name='proposal_rfp_status_idx'),
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 4.2.8 on 2026-10-18 20:40
+
+from django.db import migrations, transaction
+
+BATCH_SIZE = 1000
+
+
+def backfill_foreign_keys(apps, schema_editor):
+    """
+    Link proposals to their RFP and vendor rows from the legacy string IDs.
+
+    The migration is not atomic: every BATCH_SIZE proposals are committed in
+    their own transaction, so a large table is never locked for the whole
+    backfill. IDs that match no row (e.g. a deleted RFP) are left unlinked;
+    the legacy columns keep the original values.
+    """
+    Proposal = apps.get_model('proposals', 'Proposal')
+    RFP = apps.get_model('rfps', 'RFP')
+    Vendor = apps.get_model('vendors', 'Vendor')
+
+    def known_ids(model, values):
+        ids = {int(value) for value in values if value.strip().isdigit()}
+        return set(model.objects.filter(id__in=ids).values_list('id', flat=True))
+
+    last_id = 0
+    while True:
+        with transaction.atomic():
+            batch = list(
+                Proposal.objects.filter(id__gt=last_id).order_by('id')
+                .only('id', 'legacy_rfp_id', 'legacy_vendor_id')[:BATCH_SIZE]
+            )
+            if not batch:
+                break
+            last_id = batch[-1].id
+
+            rfp_ids = known_ids(RFP, [proposal.legacy_rfp_id for proposal in batch])
+            vendor_ids = known_ids(Vendor, [proposal.legacy_vendor_id for proposal in batch])
+            for proposal in batch:
+                rfp_id = proposal.legacy_rfp_id.strip()
+                vendor_id = proposal.legacy_vendor_id.strip()
+                proposal.rfp_id = int(rfp_id) if rfp_id.isdigit() and int(rfp_id) in rfp_ids else None
+                proposal.vendor_id = int(vendor_id) if vendor_id.isdigit() and int(vendor_id) in vendor_ids else None
+            Proposal.objects.bulk_update(batch, ['rfp', 'vendor'])
+
+
+def restore_legacy_ids(apps, schema_editor):
+    """Fill the legacy string IDs of proposals created after the backfill"""
+    Proposal = apps.get_model('proposals', 'Proposal')
+    for proposal in Proposal.objects.filter(legacy_rfp_id='').exclude(rfp=None).iterator(chunk_size=BATCH_SIZE):
+        proposal.legacy_rfp_id = str(proposal.rfp_id)
+        proposal.legacy_vendor_id = str(proposal.vendor_id or '')
+        proposal.save(update_fields=['legacy_rfp_id', 'legacy_vendor_id'])
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('proposals', '0007_proposal_foreign_keys'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_foreign_keys, restore_legacy_ids),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.8 on 2026-10-18 20:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('proposals', '0008_backfill_proposal_foreign_keys'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='proposal',
+            index=models.Index(fields=['received_at', 'id'], name='proposal_received_idx'),
+        ),
+    ]
@@ -1,11 +1,19 @@
 """Proposals app - models for vendor proposals"""
 from django.db import models
+import hashlib
+import json
 
 
 class Proposal(models.Model):
     """Model for vendor proposals in response to RFPs"""
-    rfp_id = models.CharField(max_length=255)
-    vendor_id = models.CharField(max_length=255)
+    rfp = models.ForeignKey(
+        'rfps.RFP', on_delete=models.CASCADE, null=True, related_name='proposals', db_index=False
+    )
+    vendor = models.ForeignKey(
+        'vendors.Vendor', on_delete=models.SET_NULL, null=True, related_name='proposals', db_index=False
+    )
+    legacy_rfp_id = models.CharField(max_length=255, blank=True)  # String ID from before `rfp` existed
+    legacy_vendor_id = models.CharField(max_length=255, blank=True)  # String ID from before `vendor` existed
     vendor_name = models.CharField(max_length=255)
     proposal_content = models.TextField()
     parsed_data = models.JSONField(default=dict)
@@ -15,9 +23,10 @@ class Proposal(models.Model):
     payment_terms = models.CharField(max_length=255, blank=True)
     score = models.FloatField(null=True, blank=True)
     evaluation = models.JSONField(default=dict)
+    evaluation_hash = models.CharField(max_length=64, blank=True)  # Hash of the inputs `evaluation` was scored from
     received_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
-    email_message_id = models.CharField(max_length=500, blank=True)
+    email_message_id = models.CharField(max_length=500, blank=True)  # RFC 5322 Message-ID of the source email
     status = models.CharField(
         max_length=20,
         choices=[
@@ -31,6 +40,35 @@ class Proposal(models.Model):
 
     class Meta:
         db_table = 'proposals'
+        # Also serve the foreign key lookups, so `rfp` and `vendor` carry no index of their own
+        indexes = [
+            models.Index(fields=['rfp', 'received_at'], name='proposal_rfp_received_idx'),
+            models.Index(fields=['vendor', 'received_at'], name='proposal_vendor_received_idx'),
+            models.Index(fields=['rfp', 'status'], name='proposal_rfp_status_idx'),
+            models.Index(fields=['received_at', 'id'], name='proposal_received_idx'),  # Cursor pagination
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['email_message_id'],
+                condition=~models.Q(email_message_id=''),
+                name='unique_proposal_email_message_id'
+            ),
+        ]
 
     def __str__(self):
         return f'Proposal from {self.vendor_name} for RFP {self.rfp_id}'
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        proposal = super().from_db(db, field_names, values)
+        # The RFP as loaded, so moving the proposal also refreshes the old RFP's cached list
+        proposal._loaded_rfp_id = proposal.__dict__.get('rfp_id')
+        return proposal
+
+    def compute_evaluation_hash(self, rfp_requirements: dict, scoring_mode: str = '') -> str:
+        """Hash of the proposal fields and RFP requirements the evaluation is scored from"""
+        payload = json.dumps([
+            scoring_mode, rfp_requirements, self.vendor_name, str(self.price or ''), self.delivery_time,
+            self.warranty, self.payment_terms, self.parsed_data, self.proposal_content,
+        ], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
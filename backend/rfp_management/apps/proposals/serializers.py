@@ -1,9 +1,14 @@
 """Proposals app - serializers"""
 from rest_framework import serializers
 from .models import Proposal
+from rfp_management.apps.rfps.models import RFP
+from rfp_management.apps.vendors.models import Vendor
 
 
 class ProposalSerializer(serializers.ModelSerializer):
+    rfp_id = serializers.PrimaryKeyRelatedField(source='rfp', queryset=RFP.objects.all())
+    vendor_id = serializers.PrimaryKeyRelatedField(source='vendor', queryset=Vendor.objects.all(), allow_null=True)
+
     class Meta:
         model = Proposal
         fields = [
@@ -0,0 +1,188 @@
+"""Proposal Services - AI parsing and evaluation of vendor proposals"""
+import hashlib
+import json
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from rfp_management.apps.ai.services import AIService, enqueue_ai_jobs
+from rfp_management.common.cache import ResponseCache
+
+
+class ProposalService:
+    """Applies AI parsing and scoring results to stored proposals"""
+
+    def __init__(self, ai_service: AIService = None):
+        self.ai_service = ai_service or AIService()
+
+    def parse_proposal(self, proposal):
+        """
+        Extract structured data from a proposal and store it.
+
+        When the AI pipeline is enabled, a re-evaluation of the proposal's
+        RFP is scheduled because its set of parsed proposals changed.
+
+        Args:
+            proposal: Proposal object
+
+        Returns:
+            Proposal: The updated proposal
+        """
+        parsed_data = self.ai_service.parse_proposal(proposal.proposal_content)
+
+        proposal.parsed_data = parsed_data
+        proposal.price = parsed_data.get('price')
+        proposal.delivery_time = parsed_data.get('delivery_time', '')
+        proposal.warranty = parsed_data.get('warranty', '')
+        proposal.payment_terms = parsed_data.get('payment_terms', '')
+        proposal.status = 'PARSED'
+
+        with transaction.atomic():
+            proposal.save()
+            if settings.AI_AUTO_PIPELINE:
+                self.schedule_evaluation(proposal.rfp_id)
+
+        return proposal
+
+    def evaluate_rfp(self, rfp, force: bool = False) -> dict:
+        """
+        Score all proposals of an RFP against its requirements.
+
+        Each proposal stores a hash of the inputs it was scored from, so only
+        new or changed proposals are scored again. The ranking across vendors
+        is rebuilt from the stored results and the summary is only rewritten
+        when a score changed: re-evaluating an unchanged RFP makes no LLM call.
+
+        Args:
+            rfp: RFP object
+            force: Re-score every proposal and rewrite the summary
+
+        Returns:
+            dict: Evaluation with 'summary', 'recommendation', 'evaluations'
+                  keyed by proposal id, the number of 'rescored' proposals and the
+                  updated Proposal objects as 'proposals'
+        """
+        from .models import Proposal
+
+        proposals = list(Proposal.objects.filter(rfp_id=rfp.id).order_by('id'))
+        if not proposals:
+            raise ValueError('No proposals found for this RFP')
+
+        local_scoring = getattr(settings, 'AI_LOCAL_SCORING', True)
+        scoring_mode = 'local' if local_scoring else f'llm:{self.ai_service.model}'
+        hashes = [prop.compute_evaluation_hash(rfp.requirements, scoring_mode) for prop in proposals]
+        stale = [force or not prop.evaluation or prop.evaluation_hash != evaluation_hash
+                 for prop, evaluation_hash in zip(proposals, hashes)]
+        proposal_data = [self._evaluation_input(prop) for prop in proposals]
+
+        if local_scoring:
+            # Scores are relative to the other offers, so every proposal is
+            # re-scored, but unchanged ones reuse their stored features
+            features = [None if is_stale else prop.evaluation.get('features')
+                        for prop, is_stale in zip(proposals, stale)]
+            scored = self.ai_service.score_proposals(rfp.requirements, proposal_data, features=features)
+            results = [self._scored_result(scored, prop) for prop in proposals]
+        else:
+            changed = [data for data, is_stale in zip(proposal_data, stale) if is_stale]
+            scored = self.ai_service.score_proposals(rfp.requirements, changed) if changed else {}
+            results = [self._scored_result(scored, prop) if is_stale else prop.evaluation
+                       for prop, is_stale in zip(proposals, stale)]
+
+        # Rank across vendors from the scores alone
+        order = sorted(range(len(results)), key=lambda i: self._score(results[i]), reverse=True)
+        for rank, i in enumerate(order, start=1):
+            results[i] = {**results[i], 'rank': rank}
+
+        now = timezone.now()
+        updated = []
+        for prop, evaluation_hash, result in zip(proposals, hashes, results):
+            fields = {
+                'evaluation': result,
+                'evaluation_hash': evaluation_hash,
+                'score': self._score(result),
+                'status': prop.status if prop.status == 'ACCEPTED' else 'EVALUATED',
+            }
+            if any(getattr(prop, name) != value for name, value in fields.items()):
+                for name, value in fields.items():
+                    setattr(prop, name, value)
+                prop.updated_at = now  # bulk_update skips auto_now
+                updated.append(prop)
+        if updated:
+            # Only the evaluation columns, never the large proposal_content
+            with transaction.atomic():
+                Proposal.objects.bulk_update(
+                    updated, ['evaluation', 'evaluation_hash', 'score', 'status', 'updated_at']
+                )
+                # bulk_update sends no post_save
+                ResponseCache().invalidate(ResponseCache.RFP_PROPOSALS.format(rfp.id))
+
+        # Keyed by proposal, since two vendors may share a name
+        evaluations = {str(prop.id): result for prop, result in zip(proposals, results)}
+        fingerprint = self.evaluation_fingerprint(rfp, proposals)
+        if force or not rfp.evaluation_summary or rfp.evaluation_fingerprint != fingerprint:
+            summary = self.ai_service.summarize_evaluations(rfp.requirements, proposal_data, evaluations)
+            rfp.evaluation_summary = {
+                'summary': summary.get('summary', ''),
+                'recommendation': summary.get('recommendation', '')
+            }
+            rfp.evaluation_fingerprint = fingerprint
+            rfp.save(update_fields=['evaluation_summary', 'evaluation_fingerprint', 'updated_at'])
+
+        return {
+            'evaluations': evaluations,
+            'summary': rfp.evaluation_summary.get('summary', ''),
+            'recommendation': rfp.evaluation_summary.get('recommendation', ''),
+            'rescored': sum(stale),
+            'proposals': proposals
+        }
+
+    @staticmethod
+    def evaluation_fingerprint(rfp, proposals: list) -> str:
+        """Hash of the scored proposals an RFP's evaluation summary is written from"""
+        payload = json.dumps(
+            [rfp.requirements, [[prop.id, prop.evaluation_hash, prop.evaluation] for prop in proposals]],
+            sort_keys=True, default=str
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _scored_result(scored: dict, prop) -> dict:
+        """A proposal's evaluation: local scores are keyed by proposal id, the model's by vendor name"""
+        result = scored.get(str(prop.id)) or scored.get(prop.vendor_name) or {}
+        return {**result, 'vendor_name': prop.vendor_name}
+
+    @staticmethod
+    def _evaluation_input(prop) -> dict:
+        """The proposal fields sent for scoring"""
+        return {
+            'id': prop.id,
+            'vendor_name': prop.vendor_name,
+            'price': float(prop.price) if prop.price else None,
+            'delivery_time': prop.delivery_time,
+            'warranty': prop.warranty,
+            'payment_terms': prop.payment_terms,
+            'parsed_data': prop.parsed_data,
+            'proposal_content': prop.proposal_content
+        }
+
+    @staticmethod
+    def _score(evaluation: dict) -> float:
+        try:
+            return float(evaluation.get('score') or 0)
+        except (TypeError, ValueError):
+            return 0.0
+
+    @staticmethod
+    def schedule_parsing(proposal_ids: list) -> None:
+        """Queue newly received proposals for AI parsing"""
+        enqueue_ai_jobs('PARSE_PROPOSAL', proposal_ids)
+
+    @staticmethod
+    def schedule_evaluation(rfp_id) -> None:
+        """
+        Queue a re-evaluation of an RFP.
+
+        The job is delayed by AI_EVALUATE_DELAY seconds and coalesced with
+        any evaluation already waiting, so a burst of parsed proposals
+        triggers a single scoring run.
+        """
+        enqueue_ai_jobs('EVALUATE_RFP', [rfp_id], delay=settings.AI_EVALUATE_DELAY)
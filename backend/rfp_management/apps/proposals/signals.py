@@ -0,0 +1,14 @@
+"""Proposals app - signals"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .models import Proposal
+from rfp_management.common.cache import ResponseCache
+
+
+@receiver(post_save, sender=Proposal)
+@receiver(post_delete, sender=Proposal)
+def invalidate_rfp_proposals(sender, instance, **kwargs):
+    """A proposal moved to another RFP also leaves the list of the RFP it was loaded from"""
+    rfp_ids = {instance.rfp_id, getattr(instance, '_loaded_rfp_id', None)} - {None}
+    ResponseCache().invalidate(*[ResponseCache.RFP_PROPOSALS.format(rfp_id) for rfp_id in rfp_ids])
+    instance._loaded_rfp_id = instance.rfp_id
@@ -0,0 +1,294 @@
+"""Proposals app - tests"""
+import base64
+import json
+from datetime import timedelta
+from importlib import import_module
+from unittest import mock
+from django.apps import apps
+from django.core.cache import caches
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from .models import Proposal
+from .services import ProposalService
+from rfp_management.apps.ai.services import AIService
+from rfp_management.apps.rfps.models import RFP
+from rfp_management.apps.vendors.models import Vendor
+
+
+def make_cursor(payload) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload).encode('ascii')).decode('ascii')
+
+
+backfill_migration = import_module('rfp_management.apps.proposals.migrations.0008_backfill_proposal_foreign_keys')
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        caches['api'].clear()
+        self.client = APIClient()
+        self.rfp = RFP.objects.create(title='Laptops', description='d', deadline=timezone.now())
+        Proposal.objects.bulk_create([
+            Proposal(rfp=self.rfp, vendor_name=f'Vendor {i}', proposal_content='x') for i in range(7)
+        ])
+        # Three proposals share a timestamp, so pages have to break ties on id
+        now = timezone.now()
+        for index, proposal in enumerate(Proposal.objects.order_by('id')):
+            Proposal.objects.filter(id=proposal.id).update(received_at=now - timedelta(minutes=min(index, 3)))
+
+    def test_pages_cover_every_proposal_once_in_order(self):
+        expected = list(Proposal.objects.order_by('-received_at', '-id').values_list('id', flat=True))
+        url, seen, pages = f'/api/proposals/by_rfp/?rfp_id={self.rfp.id}&page_size=2', [], []
+        while url:
+            page = self.client.get(url).json()
+            pages.append(page)
+            seen.extend(proposal['id'] for proposal in page['results'])
+            url = page['next']
+
+        self.assertEqual(seen, expected)
+        self.assertNotIn('count', pages[0])
+        self.assertIsNone(pages[0]['previous'])
+
+        previous = self.client.get(pages[2]['previous']).json()
+        self.assertEqual(previous['results'], pages[1]['results'])
+
+    def test_count_is_only_added_on_request(self):
+        page = self.client.get('/api/proposals/?count=true&page_size=1').json()
+        self.assertEqual(page['count'], 7)
+        self.assertEqual(len(page['results']), 1)
+
+    def test_invalid_cursor_is_not_found(self):
+        for cursor in ['not-base64!', make_cursor(['list']), make_cursor({'p': ['garbage', 1]}),
+                       make_cursor({'p': [None, 1]}), make_cursor({'p': ['2026-01-01T00:00:00Z', 'x']})]:
+            response = self.client.get(f'/api/proposals/by_rfp/?rfp_id={self.rfp.id}&cursor={cursor}')
+            self.assertEqual(response.status_code, 404, cursor)
+            self.assertEqual(response.json()['detail'], 'Invalid cursor')
+
+
+class SparseFieldsetTests(TestCase):
+    def setUp(self):
+        caches['api'].clear()
+        self.client = APIClient()
+        self.rfp = RFP.objects.create(title='Laptops', description='d', deadline=timezone.now())
+        self.proposal = Proposal.objects.create(
+            rfp=self.rfp, vendor_name='Acme', proposal_content='Total: $48,500', price=48500,
+            parsed_data={'price': 48500}, evaluation={'score': 80}
+        )
+
+    def get(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        selects = [q['sql'] for q in queries.captured_queries if 'FROM "proposals"' in q['sql']]
+        return response, selects[-1]
+
+    def test_lists_leave_out_the_large_fields(self):
+        response, sql = self.get(f'/api/proposals/by_rfp/?rfp_id={self.rfp.id}')
+
+        result = response.json()['results'][0]
+        for name in ('proposal_content', 'parsed_data', 'evaluation'):
+            self.assertNotIn(name, result)
+            self.assertNotIn(f'"proposals"."{name}"', sql)
+        self.assertEqual(result['vendor_name'], 'Acme')
+
+        # A single proposal is sent in full
+        detail = self.client.get(f'/api/proposals/{self.proposal.id}/').json()
+        self.assertEqual(detail['proposal_content'], 'Total: $48,500')
+
+    def test_fields_limit_the_response_and_the_columns(self):
+        response, sql = self.get('/api/proposals/?fields=vendor_name,rfp_id,evaluation')
+
+        self.assertEqual(set(response.json()['results'][0]), {'id', 'vendor_name', 'rfp_id', 'evaluation'})
+        columns = sql.split(' FROM ')[0]
+        for name in ('id', 'vendor_name', 'rfp_id', 'evaluation'):
+            self.assertIn(f'"proposals"."{name}"', columns)
+        for name in ('proposal_content', 'price', 'parsed_data'):
+            self.assertNotIn(f'"proposals"."{name}"', columns)
+
+    def test_empty_exclude_returns_every_field(self):
+        result = self.client.get('/api/proposals/?exclude=').json()['results'][0]
+
+        self.assertEqual(result['proposal_content'], 'Total: $48,500')
+        # Cached per URL, so the sparse list does not answer the full one
+        self.assertNotIn('proposal_content', self.client.get('/api/proposals/').json()['results'][0])
+
+    def test_unknown_fields_are_rejected(self):
+        response = self.client.get('/api/proposals/?fields=vendor_name,secret')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('secret', str(response.json()))
+
+
+class ProposalCacheTests(TestCase):
+    def setUp(self):
+        caches['api'].clear()
+        self.client = APIClient()
+        self.first, self.second = [
+            RFP.objects.create(title=title, description='d', deadline=timezone.now()) for title in ('A', 'B')
+        ]
+        self.proposal = Proposal.objects.create(rfp=self.first, vendor_name='Acme', proposal_content='x')
+
+    def listed(self, rfp) -> list:
+        page = self.client.get(f'/api/proposals/by_rfp/?rfp_id={rfp.id}').json()
+        return [proposal['id'] for proposal in page['results']]
+
+    def test_moving_a_proposal_refreshes_both_rfps(self):
+        self.assertEqual(self.listed(self.first), [self.proposal.id])
+        self.assertEqual(self.listed(self.second), [])
+
+        proposal = Proposal.objects.get(id=self.proposal.id)
+        proposal.rfp = self.second
+        with self.captureOnCommitCallbacks(execute=True):
+            proposal.save()
+
+        self.assertEqual(self.listed(self.first), [])
+        self.assertEqual(self.listed(self.second), [self.proposal.id])
+
+
+class IncrementalEvaluationTests(TestCase):
+    def setUp(self):
+        self.rfp = RFP.objects.create(title='Laptops', description='d', deadline=timezone.now(),
+                                      requirements={'budget': 60000, 'delivery_days': 30})
+        self.proposals = [
+            Proposal.objects.create(rfp=self.rfp, vendor_name=name, proposal_content='x', price=price,
+                                    delivery_time='3 weeks', warranty='2 years', payment_terms='Net 30')
+            for name, price in (('Acme', 48500), ('Globex', 52000))
+        ]
+        self.ai_service = AIService()
+        self.service = ProposalService(ai_service=self.ai_service)
+        summary = {'summary': 'Two offers', 'recommendation': 'Acme'}
+        patcher = mock.patch.object(self.ai_service, 'summarize_evaluations', return_value=summary)
+        self.summarize = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def change_price(self, proposal, price):
+        proposal.refresh_from_db()
+        proposal.price = price
+        proposal.save()
+
+    @override_settings(AI_LOCAL_SCORING=False)
+    def test_only_changed_proposals_are_sent_to_the_model(self):
+        scores = {'Acme': {'score': 80}, 'Globex': {'score': 70}}
+        with mock.patch.object(self.ai_service, 'score_proposals',
+                               side_effect=lambda _, data: {p['vendor_name']: scores[p['vendor_name']] for p in data}
+                               ) as score:
+            self.assertEqual(self.service.evaluate_rfp(self.rfp)['rescored'], 2)
+            self.assertEqual(self.service.evaluate_rfp(self.rfp)['rescored'], 0)
+            self.assertEqual(score.call_count, 1)
+            self.assertEqual(self.summarize.call_count, 1)
+
+            scores['Globex'] = {'score': 90}
+            self.change_price(self.proposals[1], 45000)
+            result = self.service.evaluate_rfp(self.rfp)
+
+        self.assertEqual(result['rescored'], 1)
+        self.assertEqual([p['vendor_name'] for p in score.call_args.args[1]], ['Globex'])
+        self.assertEqual(self.summarize.call_count, 2)
+        self.assertEqual(result['evaluations'][str(self.proposals[1].id)]['rank'], 1)
+        self.assertEqual(Proposal.objects.get(vendor_name='Acme').evaluation['rank'], 2)
+
+    @override_settings(AI_LOCAL_SCORING=True)
+    def test_vendors_with_the_same_name_are_scored_separately(self):
+        twin = Proposal.objects.create(rfp=self.rfp, vendor_name='Acme', proposal_content='x', price=99000,
+                                       delivery_time='3 weeks', warranty='2 years', payment_terms='Net 30')
+
+        evaluations = self.service.evaluate_rfp(self.rfp)['evaluations']
+
+        self.assertEqual(len(evaluations), 3)
+        self.assertEqual(evaluations[str(twin.id)]['vendor_name'], 'Acme')
+        self.assertLess(evaluations[str(twin.id)]['score'], evaluations[str(self.proposals[0].id)]['score'])
+        self.assertEqual(Proposal.objects.get(id=twin.id).evaluation['rank'], 3)
+
+    @override_settings(AI_LOCAL_SCORING=True)
+    def test_scores_are_written_back_in_one_update(self):
+        self.proposals[1].status = 'ACCEPTED'
+        self.proposals[1].save()
+        before = {p.id: p.updated_at for p in Proposal.objects.all()}
+
+        with CaptureQueriesContext(connection) as queries:
+            self.service.evaluate_rfp(self.rfp)
+
+        updates = [q['sql'] for q in queries.captured_queries if q['sql'].startswith('UPDATE "proposals"')]
+        self.assertEqual(len(updates), 1)
+        self.assertNotIn('proposal_content', updates[0])
+        stored = {p.vendor_name: p for p in Proposal.objects.all()}
+        self.assertEqual((stored['Acme'].status, stored['Globex'].status), ('EVALUATED', 'ACCEPTED'))
+        self.assertEqual(stored['Acme'].score, stored['Acme'].evaluation['score'])
+        self.assertTrue(all(p.updated_at > before[p.id] for p in stored.values()))
+
+        # Nothing changed, so nothing is written
+        with CaptureQueriesContext(connection) as queries:
+            self.service.evaluate_rfp(self.rfp)
+        self.assertFalse([q for q in queries.captured_queries if q['sql'].startswith('UPDATE "proposals"')])
+
+    @override_settings(AI_LOCAL_SCORING=True)
+    def test_compare_and_evaluate_returns_the_written_scores(self):
+        with mock.patch('rfp_management.apps.proposals.views.ProposalService', return_value=self.service):
+            response = APIClient().post('/api/proposals/compare_and_evaluate/', {'rfp_id': self.rfp.id},
+                                        format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['rescored'], 2)
+        stored = dict(Proposal.objects.values_list('id', 'score'))
+        self.assertEqual({p['id']: p['score'] for p in response.data['proposals']}, stored)
+
+    @override_settings(AI_LOCAL_SCORING=True)
+    def test_unchanged_rfp_is_not_summarised_again(self):
+        first = self.service.evaluate_rfp(self.rfp)
+        second = self.service.evaluate_rfp(self.rfp)
+
+        self.assertEqual((first['rescored'], second['rescored']), (2, 0))
+        self.assertEqual(second['evaluations'], first['evaluations'])
+        self.assertEqual(self.summarize.call_count, 1)
+
+        self.assertEqual(self.service.evaluate_rfp(self.rfp, force=True)['rescored'], 2)
+        self.assertEqual(self.summarize.call_count, 2)
+
+
+@mock.patch.object(backfill_migration, 'BATCH_SIZE', 2)
+class ForeignKeyBackfillMigrationTests(TestCase):
+    def setUp(self):
+        self.rfp = RFP.objects.create(title='Laptops', description='d', deadline=timezone.now())
+        self.acme = Vendor.objects.create(name='Acme', email='sales@acme.com')
+
+    def legacy_proposal(self, rfp_id, vendor_id):
+        return Proposal.objects.create(vendor_name='Acme', proposal_content='x',
+                                       legacy_rfp_id=rfp_id, legacy_vendor_id=vendor_id)
+
+    def test_legacy_ids_are_linked_in_batches(self):
+        linked = self.legacy_proposal(str(self.rfp.id), str(self.acme.id))
+        padded = self.legacy_proposal(f' {self.rfp.id} ', '')
+        deleted_rfp = self.legacy_proposal('999', str(self.acme.id))
+        invalid = self.legacy_proposal('RFP-7', 'acme')
+        deleted_vendor = self.legacy_proposal(str(self.rfp.id), '999')
+
+        with mock.patch.object(Proposal, 'save') as save:
+            backfill_migration.backfill_foreign_keys(apps, None)
+        save.assert_not_called()
+
+        links = {p.id: (p.rfp_id, p.vendor_id) for p in Proposal.objects.all()}
+        self.assertEqual(links, {
+            linked.id: (self.rfp.id, self.acme.id),
+            padded.id: (self.rfp.id, None),
+            deleted_rfp.id: (None, self.acme.id),
+            invalid.id: (None, None),
+            deleted_vendor.id: (self.rfp.id, None),
+        })
+        # The legacy columns keep the original values
+        self.assertEqual(Proposal.objects.get(id=invalid.id).legacy_rfp_id, 'RFP-7')
+
+    def test_reverse_fills_legacy_ids_of_new_proposals(self):
+        migrated = self.legacy_proposal(str(self.rfp.id), str(self.acme.id))
+        backfill_migration.backfill_foreign_keys(apps, None)
+        new = Proposal.objects.create(rfp=self.rfp, vendor=self.acme, vendor_name='Acme', proposal_content='x')
+        unmatched = Proposal.objects.create(rfp=self.rfp, vendor_name='Unknown', proposal_content='x')
+
+        backfill_migration.restore_legacy_ids(apps, None)
+
+        legacy = {p.id: (p.legacy_rfp_id, p.legacy_vendor_id) for p in Proposal.objects.all()}
+        self.assertEqual(legacy, {
+            migrated.id: (str(self.rfp.id), str(self.acme.id)),
+            new.id: (str(self.rfp.id), str(self.acme.id)),
+            unmatched.id: (str(self.rfp.id), ''),
+        })
@@ -1,17 +1,34 @@
 """Proposals app - views"""
+from django.conf import settings
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from .models import Proposal
 from .serializers import ProposalSerializer
+from .services import ProposalService
 from rfp_management.apps.rfps.models import RFP
-from rfp_management.apps.ai.services import AIService
+from rfp_management.apps.ai.services import enqueue_ai_jobs
+from rfp_management.apps.ai.views import job_accepted_response, wants_async
+from rfp_management.common.pagination import KeysetPagination
+from rfp_management.common.cache import ResponseCache
+from rfp_management.common.views import CachedResponseMixin, ConditionalGetMixin, SparseFieldsetMixin
 
 
-class ProposalViewSet(viewsets.ModelViewSet):
+class ProposalViewSet(ConditionalGetMixin, CachedResponseMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
     """ViewSet for Proposal management"""
     queryset = Proposal.objects.all()
     serializer_class = ProposalSerializer
+    pagination_class = KeysetPagination
+    cursor_ordering = ('-received_at', '-id')
+    # Email bodies and AI output are only sent for a single proposal (or when asked for)
+    list_exclude_fields = ('proposal_content', 'parsed_data', 'evaluation')
+
+    def perform_destroy(self, instance):
+        """Delete a proposal and re-score the remaining proposals of its RFP"""
+        was_parsed = instance.status != 'RECEIVED'
+        instance.delete()
+        if was_parsed and settings.AI_AUTO_PIPELINE:
+            ProposalService.schedule_evaluation(instance.rfp_id)
 
     @action(detail=False, methods=['get'])
     def by_rfp(self, request):
@@ -24,9 +41,23 @@ class ProposalViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        proposals = Proposal.objects.filter(rfp_id=rfp_id).order_by('-received_at')
-        serializer = self.get_serializer(proposals, many=True)
-        return Response(serializer.data)
+        if not rfp_id.isdigit():
+            return Response(
+                {'error': 'rfp_id must be a number'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        proposals = self.get_queryset().filter(rfp_id=rfp_id)
+        not_modified = self.not_modified(proposals)
+        if not_modified:
+            return not_modified
+
+        def build():
+            page = self.paginate_queryset(proposals)
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
+        return self.cached_response(ResponseCache.RFP_PROPOSALS.format(int(rfp_id)), build)
 
     @action(detail=False, methods=['get'])
     def by_vendor(self, request):
@@ -39,26 +70,32 @@ class ProposalViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        proposals = Proposal.objects.filter(vendor_id=vendor_id).order_by('-received_at')
-        serializer = self.get_serializer(proposals, many=True)
-        return Response(serializer.data)
+        if not vendor_id.isdigit():
+            return Response(
+                {'error': 'vendor_id must be a number'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        proposals = self.get_queryset().filter(vendor_id=vendor_id)
+        not_modified = self.not_modified(proposals)
+        if not_modified:
+            return not_modified
+
+        page = self.paginate_queryset(proposals)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
 
     @action(detail=True, methods=['post'])
     def parse(self, request, pk=None):
         """Parse proposal content using AI"""
         proposal = self.get_object()
+
+        if wants_async(request):
+            job, = enqueue_ai_jobs('PARSE_PROPOSAL', [proposal.id], priority=20, payload={'force': True})
+            return job_accepted_response(request, job)
         
         try:
-            ai_service = AIService()
-            parsed_data = ai_service.parse_proposal(proposal.proposal_content)
-            
-            proposal.parsed_data = parsed_data
-            proposal.price = parsed_data.get('price')
-            proposal.delivery_time = parsed_data.get('delivery_time', '')
-            proposal.warranty = parsed_data.get('warranty', '')
-            proposal.payment_terms = parsed_data.get('payment_terms', '')
-            proposal.status = 'PARSED'
-            proposal.save()
+            proposal = ProposalService().parse_proposal(proposal)
 
             serializer = self.get_serializer(proposal)
             return Response(serializer.data)
@@ -80,14 +117,12 @@ class ProposalViewSet(viewsets.ModelViewSet):
             
             # Send acceptance email
             from rfp_management.apps.email_service.services import EmailService
-            from rfp_management.apps.vendors.models import Vendor
             email_service = EmailService()
             
-            # Get RFP details
-            rfp = RFP.objects.get(id=proposal.rfp_id)
-            
-            # Get vendor email
-            vendor = Vendor.objects.get(id=proposal.vendor_id)
+            rfp = proposal.rfp
+            vendor = proposal.vendor
+            if rfp is None or vendor is None:
+                raise Exception('Proposal is not linked to an RFP and vendor')
             
             # Send acceptance email to vendor
             subject = f"Proposal Accepted: {rfp.title}"
@@ -107,9 +142,21 @@ Best regards,
 Procurement Team
 """
             
-            email_service._send_email(vendor.email, subject, body)
-            
             serializer = self.get_serializer(proposal)
+
+            if settings.EMAIL_USE_OUTBOX:
+                message = email_service.enqueue_email(
+                    'ACCEPTANCE', rfp.id, vendor.id, vendor.email, subject, body
+                )
+                return Response(
+                    {**serializer.data, 'outbox_message_id': message.id},
+                    status=status.HTTP_202_ACCEPTED
+                )
+
+            error, = email_service.send_bulk([(vendor.email, subject, body)])
+            if error is not None:
+                raise Exception(f"Failed to send acceptance email: {error}")
+            
             return Response(serializer.data)
         except Exception as e:
             return Response(
@@ -138,39 +185,18 @@ Procurement Team
                     status=status.HTTP_404_NOT_FOUND
                 )
 
-            # Prepare data for AI evaluation
-            proposal_data = []
-            for prop in proposals:
-                proposal_data.append({
-                    'vendor_name': prop.vendor_name,
-                    'price': float(prop.price) if prop.price else None,
-                    'delivery_time': prop.delivery_time,
-                    'warranty': prop.warranty,
-                    'payment_terms': prop.payment_terms,
-                    'parsed_data': prop.parsed_data
-                })
-
-            ai_service = AIService()
-            evaluation = ai_service.evaluate_proposals(
-                rfp_requirements=rfp.requirements,
-                proposals=proposal_data
-            )
+            if wants_async(request):
+                job, = enqueue_ai_jobs('EVALUATE_RFP', [rfp.id], priority=20)
+                return job_accepted_response(request, job)
 
-            # Update proposals with evaluation scores
-            for prop in proposals:
-                vendor_eval = evaluation['evaluations'].get(prop.vendor_name, {})
-                prop.score = vendor_eval.get('score', 0)
-                prop.evaluation = vendor_eval
-                prop.status = 'EVALUATED'
-                prop.save()
-
-            # Fetch updated proposals
-            updated_proposals = Proposal.objects.filter(rfp_id=rfp_id)
-            serializer = self.get_serializer(updated_proposals, many=True)
+            force = str(request.data.get('force', '')).lower() in ('1', 'true', 'yes')
+            evaluation = ProposalService().evaluate_rfp(rfp, force=force)
+            serializer = self.get_serializer(evaluation['proposals'], many=True)
             
             return Response({
                 'summary': evaluation.get('summary', ''),
                 'recommendation': evaluation.get('recommendation', ''),
+                'rescored': evaluation.get('rescored', 0),
                 'proposals': serializer.data
             })
         except RFP.DoesNotExist:
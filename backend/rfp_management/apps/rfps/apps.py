@@ -5,3 +5,6 @@ from django.apps import AppConfig
 class RfpsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'rfp_management.apps.rfps'
+
+    def ready(self):
+        from . import signals  # noqa: F401  Cache invalidation receivers
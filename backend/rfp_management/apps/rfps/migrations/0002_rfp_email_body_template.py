@@ -0,0 +1,23 @@
+# Generated by Django 4.2.8 on 2026-10-18 20:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rfps', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rfp',
+            name='email_body_fingerprint',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='rfp',
+            name='email_body_template',
+            field=models.TextField(blank=True),
+        ),
+    ]
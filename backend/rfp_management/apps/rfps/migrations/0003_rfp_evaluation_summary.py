@@ -0,0 +1,23 @@
+# Generated by Django 4.2.8 on 2026-10-18 20:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rfps', '0002_rfp_email_body_template'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rfp',
+            name='evaluation_fingerprint',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='rfp',
+            name='evaluation_summary',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.8 on 2026-10-18 20:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vendors', '0002_vendor_email_index'),
+        ('rfps', '0003_rfp_evaluation_summary'),
+    ]
+
+    operations = [
+        # Keep the JSON list under a new name; 0005 copies it into the M2M table
+        migrations.RenameField(
+            model_name='rfp',
+            old_name='selected_vendors',
+            new_name='legacy_selected_vendors',
+        ),
+        migrations.AlterField(
+            model_name='rfp',
+            name='legacy_selected_vendors',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name='rfp',
+            name='selected_vendors',
+            field=models.ManyToManyField(blank=True, db_table='rfp_selected_vendors', related_name='selected_for_rfps', to='vendors.vendor'),
+        ),
+    ]
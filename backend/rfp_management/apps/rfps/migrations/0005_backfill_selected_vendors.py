@@ -0,0 +1,63 @@
+# Generated by Django 4.2.8 on 2026-10-18 20:40
+
+from django.db import migrations, transaction
+
+BATCH_SIZE = 500
+
+
+def backfill_selected_vendors(apps, schema_editor):
+    """
+    Copy the legacy JSON vendor ID lists into the selected vendors table.
+
+    Every BATCH_SIZE RFPs are committed in their own transaction (the
+    migration is not atomic). IDs of vendors that no longer exist are skipped.
+    """
+    RFP = apps.get_model('rfps', 'RFP')
+    Vendor = apps.get_model('vendors', 'Vendor')
+    Selection = RFP.selected_vendors.through
+
+    last_id = 0
+    while True:
+        with transaction.atomic():
+            batch = list(
+                RFP.objects.filter(id__gt=last_id).order_by('id')
+                .only('id', 'legacy_selected_vendors')[:BATCH_SIZE]
+            )
+            if not batch:
+                break
+            last_id = batch[-1].id
+
+            selections = {
+                (rfp.id, int(vendor_id))
+                for rfp in batch
+                for vendor_id in (rfp.legacy_selected_vendors or [])
+                if str(vendor_id).strip().isdigit()
+            }
+            known = set(
+                Vendor.objects.filter(id__in={vendor_id for _, vendor_id in selections})
+                .values_list('id', flat=True)
+            )
+            Selection.objects.bulk_create([
+                Selection(rfp_id=rfp_id, vendor_id=vendor_id)
+                for rfp_id, vendor_id in sorted(selections) if vendor_id in known
+            ], ignore_conflicts=True)
+
+
+def restore_legacy_selection(apps, schema_editor):
+    """Write the selected vendors back into the legacy JSON lists"""
+    RFP = apps.get_model('rfps', 'RFP')
+    for rfp in RFP.objects.prefetch_related('selected_vendors').iterator(chunk_size=BATCH_SIZE):
+        rfp.legacy_selected_vendors = [str(vendor.id) for vendor in rfp.selected_vendors.all()]
+        rfp.save(update_fields=['legacy_selected_vendors'])
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('rfps', '0004_rfp_selected_vendors_m2m'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_selected_vendors, restore_legacy_selection),
+    ]
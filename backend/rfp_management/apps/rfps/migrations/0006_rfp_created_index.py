@@ -0,0 +1,17 @@
+# Generated by Django 4.2.8 on 2026-10-18 20:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rfps', '0005_backfill_selected_vendors'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='rfp',
+            index=models.Index(fields=['created_at', 'id'], name='rfp_created_idx'),
+        ),
+    ]
@@ -1,5 +1,6 @@
 """RFPs app - models for RFP management"""
 from django.db import models
+import hashlib
 import json
 
 
@@ -22,16 +23,37 @@ class RFP(models.Model):
         ],
         default='DRAFT'
     )
-    selected_vendors = models.JSONField(default=list)  # List of vendor IDs
+    selected_vendors = models.ManyToManyField(
+        'vendors.Vendor', blank=True, related_name='selected_for_rfps', db_table='rfp_selected_vendors'
+    )
+    legacy_selected_vendors = models.JSONField(default=list, blank=True)  # Vendor IDs from before the M2M table
     awarded_vendor = models.CharField(max_length=255, blank=True, null=True)
     natural_language_input = models.TextField(blank=True)  # Original user input
+    email_body_template = models.TextField(blank=True)  # AI-generated body, shared by all vendors
+    email_body_fingerprint = models.CharField(max_length=64, blank=True)  # Hash of title + requirements
+    evaluation_summary = models.JSONField(default=dict, blank=True)  # Last AI 'summary' and 'recommendation'
+    evaluation_fingerprint = models.CharField(max_length=64, blank=True)  # Hash of the scores it was written from
 
     class Meta:
         db_table = 'rfps'
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='rfp_created_idx'),  # Cursor pagination
+        ]
 
     def __str__(self):
         return self.title
 
+    def compute_email_fingerprint(self) -> str:
+        """Hash of the fields the vendor email body is generated from"""
+        payload = json.dumps([self.title, self.requirements], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    @property
+    def has_current_email_body(self) -> bool:
+        """Whether the stored email body still matches the title and requirements"""
+        return bool(self.email_body_template) and \
+            self.email_body_fingerprint == self.compute_email_fingerprint()
+
 
 class RFPField(models.Model):
     """Model for tracking structured fields in an RFP"""
@@ -15,6 +15,6 @@ class RFPSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'title', 'description', 'requirements', 'budget', 'deadline',
             'created_at', 'updated_at', 'status', 'selected_vendors', 'awarded_vendor',
-            'natural_language_input'
+            'natural_language_input', 'evaluation_summary'
         ]
-        read_only_fields = ['created_at', 'updated_at']
+        read_only_fields = ['created_at', 'updated_at', 'evaluation_summary']
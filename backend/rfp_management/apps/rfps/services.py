@@ -0,0 +1,33 @@
+"""RFP Services - Creating RFPs from natural language"""
+from rfp_management.apps.ai.services import AIService
+
+
+class RFPService:
+    """Builds RFPs from AI-structured procurement descriptions"""
+
+    def __init__(self, ai_service: AIService = None):
+        self.ai_service = ai_service or AIService()
+
+    def create_from_natural_language(self, natural_language: str):
+        """
+        Structure a free-text description with the AI service and store it as a draft RFP.
+
+        Args:
+            natural_language: Procurement need described in plain language
+
+        Returns:
+            RFP: The created draft RFP
+        """
+        from .models import RFP
+
+        structured_rfp = self.ai_service.parse_natural_language_to_rfp(natural_language)
+
+        return RFP.objects.create(
+            title=structured_rfp.get('title', 'Untitled RFP'),
+            description=natural_language,
+            requirements=structured_rfp.get('requirements', {}),
+            budget=structured_rfp.get('budget'),
+            deadline=structured_rfp.get('deadline'),
+            natural_language_input=natural_language,
+            status='DRAFT'
+        )
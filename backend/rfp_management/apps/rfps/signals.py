@@ -0,0 +1,24 @@
+"""RFPs app - signals"""
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from .models import RFP
+from rfp_management.common.cache import ResponseCache
+
+
+@receiver(post_save, sender=RFP)
+@receiver(post_delete, sender=RFP)
+def invalidate_rfp_detail(sender, instance, **kwargs):
+    ResponseCache().invalidate(ResponseCache.RFP_DETAIL.format(instance.pk))
+
+
+@receiver(m2m_changed, sender=RFP.selected_vendors.through)
+def invalidate_selected_vendors(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if not reverse:
+        rfp_ids = [instance.pk]
+    elif pk_set is not None:
+        rfp_ids = pk_set
+    else:
+        rfp_ids = instance.selected_for_rfps.values_list('id', flat=True)
+    ResponseCache().invalidate(*[ResponseCache.RFP_DETAIL.format(rfp_id) for rfp_id in rfp_ids])
@@ -0,0 +1,119 @@
+"""RFPs app - tests"""
+from datetime import timedelta
+from importlib import import_module
+from unittest import mock
+from django.apps import apps
+from django.core.cache import caches
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.http import http_date
+from rest_framework.test import APIClient
+from .models import RFP
+from rfp_management.apps.vendors.models import Vendor
+
+backfill_migration = import_module('rfp_management.apps.rfps.migrations.0005_backfill_selected_vendors')
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        caches['api'].clear()
+        self.client = APIClient()
+        self.rfp = RFP.objects.create(title='Laptops', description='d', deadline=timezone.now())
+        self.url = f'/api/rfps/{self.rfp.id}/'
+
+    def test_current_detail_is_not_modified(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Cache-Control'], 'private, no-cache')
+
+        # Only the updated_at lookup runs
+        with self.assertNumQueries(1):
+            cached = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached['ETag'], response['ETag'])
+        self.assertEqual(self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code, 304)
+
+    def test_changed_detail_is_sent_again(self):
+        etag = self.client.get(self.url)['ETag']
+        RFP.objects.filter(id=self.rfp.id).update(updated_at=timezone.now() + timedelta(seconds=5))
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        stale = http_date((timezone.now() - timedelta(days=1)).timestamp())
+        self.assertEqual(self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=stale).status_code, 200)
+
+    def test_list_etag_follows_deletes_and_query_string(self):
+        RFP.objects.create(title='Monitors', description='d', deadline=timezone.now())
+        etag = self.client.get('/api/rfps/')['ETag']
+        self.assertNotIn('Last-Modified', self.client.get('/api/rfps/'))
+        self.assertEqual(self.client.get('/api/rfps/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(self.client.get('/api/rfps/?fields=id', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        # Deleting an older row leaves the newest updated_at unchanged
+        RFP.objects.filter(id=self.rfp.id).delete()
+        self.assertEqual(self.client.get('/api/rfps/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_list_etag_only_reads_the_requested_page(self):
+        older = RFP.objects.create(title='Monitors', description='d', deadline=timezone.now())
+        RFP.objects.filter(id=older.id).update(created_at=timezone.now() - timedelta(days=1))
+        first_page = self.client.get('/api/rfps/?page_size=1')
+        etag = first_page['ETag']
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get('/api/rfps/?page_size=1', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('COUNT(', queries[0]['sql'].upper())
+        self.assertNotIn('MAX(', queries[0]['sql'].upper())
+
+        # A change on another page leaves this page's ETag alone
+        RFP.objects.filter(id=older.id).update(updated_at=timezone.now() + timedelta(seconds=5))
+        self.assertEqual(self.client.get('/api/rfps/?page_size=1', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        second_page = self.client.get(first_page.json()['next'], HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(second_page.status_code, 200)
+
+        RFP.objects.filter(id=self.rfp.id).update(updated_at=timezone.now() + timedelta(seconds=5))
+        self.assertEqual(self.client.get('/api/rfps/?page_size=1', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_unknown_rfp_is_still_not_found(self):
+        self.assertEqual(self.client.get('/api/rfps/999999/', HTTP_IF_NONE_MATCH='W/"x"').status_code, 404)
+
+
+@mock.patch.object(backfill_migration, 'BATCH_SIZE', 2)
+class SelectedVendorsBackfillMigrationTests(TestCase):
+    def setUp(self):
+        self.acme = Vendor.objects.create(name='Acme', email='sales@acme.com')
+        self.globex = Vendor.objects.create(name='Globex', email='bids@globex.com')
+
+    def legacy_rfp(self, vendor_ids):
+        return RFP.objects.create(title='Laptops', description='d', deadline=timezone.now(),
+                                  legacy_selected_vendors=vendor_ids)
+
+    def selection(self):
+        return {rfp.id: sorted(v.id for v in rfp.selected_vendors.all()) for rfp in RFP.objects.all()}
+
+    def test_legacy_lists_are_copied_and_unknown_vendors_skipped(self):
+        both = self.legacy_rfp([str(self.acme.id), self.globex.id, f' {self.acme.id}'])
+        stale = self.legacy_rfp(['999', 'acme', str(self.globex.id)])
+        empty = self.legacy_rfp([])
+
+        backfill_migration.backfill_selected_vendors(apps, None)
+        # Running it again after a partial failure adds nothing twice
+        backfill_migration.backfill_selected_vendors(apps, None)
+
+        self.assertEqual(self.selection(), {
+            both.id: [self.acme.id, self.globex.id],
+            stale.id: [self.globex.id],
+            empty.id: [],
+        })
+
+    def test_reverse_writes_the_selection_back(self):
+        rfp = self.legacy_rfp([])
+        rfp.selected_vendors.set([self.acme, self.globex])
+
+        backfill_migration.restore_legacy_selection(apps, None)
+
+        rfp.refresh_from_db()
+        self.assertEqual(sorted(rfp.legacy_selected_vendors), sorted([str(self.acme.id), str(self.globex.id)]))
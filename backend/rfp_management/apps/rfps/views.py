@@ -1,17 +1,32 @@
 """RFPs app - views"""
+from django.conf import settings
+from django.db.models import Prefetch
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from .models import RFP
+from rfp_management.apps.vendors.models import Vendor
 from .serializers import RFPSerializer
-from rfp_management.apps.ai.services import AIService
+from .services import RFPService
+from rfp_management.apps.ai.services import enqueue_ai_request
+from rfp_management.apps.ai.views import job_accepted_response, wants_async
 from rfp_management.apps.email_service.services import EmailService
+from rfp_management.common.pagination import KeysetPagination
+from rfp_management.common.cache import ResponseCache
+from rfp_management.common.views import CachedResponseMixin, ConditionalGetMixin, SparseFieldsetMixin
 
 
-class RFPViewSet(viewsets.ModelViewSet):
+class RFPViewSet(ConditionalGetMixin, CachedResponseMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
     """ViewSet for RFP management"""
-    queryset = RFP.objects.all()
+    queryset = RFP.objects.prefetch_related(Prefetch('selected_vendors', queryset=Vendor.objects.only('id')))
     serializer_class = RFPSerializer
+    pagination_class = KeysetPagination
+    cursor_ordering = ('-created_at', '-id')
+    list_exclude_fields = ('description', 'natural_language_input', 'evaluation_summary')
+
+    def cache_namespace(self):
+        pk = self.kwargs.get('pk', '')
+        return ResponseCache.RFP_DETAIL.format(int(pk)) if self.action == 'retrieve' and pk.isdigit() else None
 
     @action(detail=False, methods=['post'])
     def create_from_natural_language(self, request):
@@ -24,20 +39,13 @@ class RFPViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+        if wants_async(request):
+            # Not coalesced: two identical submissions still create two RFPs
+            job = enqueue_ai_request('CREATE_RFP', {'description': natural_language}, coalesce=False)
+            return job_accepted_response(request, job)
+
         try:
-            ai_service = AIService()
-            structured_rfp = ai_service.parse_natural_language_to_rfp(natural_language)
-            
-            # Create RFP object
-            rfp = RFP.objects.create(
-                title=structured_rfp.get('title', 'Untitled RFP'),
-                description=natural_language,
-                requirements=structured_rfp.get('requirements', {}),
-                budget=structured_rfp.get('budget'),
-                deadline=structured_rfp.get('deadline'),
-                natural_language_input=natural_language,
-                status='DRAFT'
-            )
+            rfp = RFPService().create_from_natural_language(natural_language)
             
             serializer = self.get_serializer(rfp)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
@@ -61,17 +69,32 @@ class RFPViewSet(viewsets.ModelViewSet):
 
         try:
             email_service = EmailService()
-            for vendor_id in vendor_ids:
-                email_service.send_rfp_to_vendor(rfp, vendor_id)
-            
-            rfp.selected_vendors = vendor_ids
+            use_outbox = settings.EMAIL_USE_OUTBOX
+            if use_outbox:
+                results = email_service.enqueue_rfp_to_vendors(rfp, vendor_ids)
+            else:
+                results = email_service.send_rfp_to_vendors(rfp, vendor_ids)
+            sent_ids = [vendor_id for vendor_id, result in results.items() if result['success']]
+
+            if not sent_ids:
+                return Response(
+                    {'error': 'RFP could not be sent to any vendor', 'results': results},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            rfp.selected_vendors.set(sent_ids)
             rfp.status = 'SENT'
             rfp.save()
 
             serializer = self.get_serializer(rfp)
+            action_text = 'queued for' if use_outbox else 'sent to'
             return Response(
-                {'message': 'RFP sent to vendors', 'rfp': serializer.data},
-                status=status.HTTP_200_OK
+                {
+                    'message': f'RFP {action_text} {len(sent_ids)} of {len(results)} vendors',
+                    'rfp': serializer.data,
+                    'results': results
+                },
+                status=status.HTTP_202_ACCEPTED if use_outbox else status.HTTP_200_OK
             )
         except Exception as e:
             return Response(
@@ -173,7 +173,9 @@ class Command(BaseCommand):
 
         rfps = []
         for rfp_data in rfps_data:
+            selected = rfp_data.pop('selected_vendors')
             rfp = RFP.objects.create(**rfp_data)
+            rfp.selected_vendors.set([vendors[number - 1] for number in selected])
             rfps.append(rfp)
             self.stdout.write(f'Created RFP: {rfp.title}')
 
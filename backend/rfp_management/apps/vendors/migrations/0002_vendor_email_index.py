@@ -0,0 +1,34 @@
+# Generated by Django 4.2.8 on 2026-10-18 20:13
+
+from django.db import migrations, models
+
+
+def normalize_emails(apps, schema_editor):
+    """Lower-case existing vendor emails and fill in their domain"""
+    Vendor = apps.get_model('vendors', 'Vendor')
+    vendors = list(Vendor.objects.only('id', 'email'))
+    for vendor in vendors:
+        vendor.email = (vendor.email or '').strip().lower()
+        vendor.email_domain = vendor.email.rpartition('@')[2]
+    Vendor.objects.bulk_update(vendors, ['email', 'email_domain'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vendors', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vendor',
+            name='email_domain',
+            field=models.CharField(blank=True, db_index=True, max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='vendor',
+            name='email',
+            field=models.EmailField(db_index=True, max_length=254),
+        ),
+        migrations.RunPython(normalize_emails, migrations.RunPython.noop),
+    ]
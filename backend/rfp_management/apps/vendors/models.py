@@ -5,7 +5,8 @@ from django.db import models
 class Vendor(models.Model):
     """Model for managing vendor information"""
     name = models.CharField(max_length=255)
-    email = models.EmailField()
+    email = models.EmailField(db_index=True)  # Stored lower-cased
+    email_domain = models.CharField(max_length=255, blank=True, db_index=True)
     contact_person = models.CharField(max_length=255, blank=True)
     phone = models.CharField(max_length=20, blank=True)
     address = models.TextField(blank=True)
@@ -22,3 +23,12 @@ class Vendor(models.Model):
 
     def __str__(self):
         return self.name
+
+    def save(self, *args, **kwargs):
+        """Normalize the email address so senders can be matched with an indexed lookup"""
+        self.email = (self.email or '').strip().lower()
+        self.email_domain = self.email.rpartition('@')[2]
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'email' in update_fields:
+            kwargs['update_fields'] = set(update_fields) | {'email_domain'}
+        super().save(*args, **kwargs)
@@ -0,0 +1,22 @@
+"""Vendors app - signals"""
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from .models import Vendor
+from rfp_management.common.cache import ResponseCache
+
+
+@receiver(post_save, sender=Vendor)
+@receiver(post_delete, sender=Vendor)
+def invalidate_vendor_lists(sender, instance, **kwargs):
+    ResponseCache().invalidate(ResponseCache.VENDOR_LISTS)
+
+
+@receiver(pre_delete, sender=Vendor)
+def invalidate_vendor_references(sender, instance, **kwargs):
+    """The database clears a deleted vendor from RFPs and proposals without saving them"""
+    rfp_ids = set(instance.selected_for_rfps.values_list('id', flat=True))
+    proposal_rfp_ids = set(instance.proposals.values_list('rfp_id', flat=True))
+    ResponseCache().invalidate(
+        *[ResponseCache.RFP_DETAIL.format(rfp_id) for rfp_id in rfp_ids],
+        *[ResponseCache.RFP_PROPOSALS.format(rfp_id) for rfp_id in proposal_rfp_ids if rfp_id is not None]
+    )
@@ -0,0 +1,62 @@
+"""Vendors app - tests"""
+import warnings
+from django.core.cache import caches
+from django.test import TestCase
+from rest_framework.test import APIClient
+from .models import Vendor
+from rfp_management.common.cache import ResponseCache
+
+
+class VendorListCacheTests(TestCase):
+    def setUp(self):
+        caches['api'].clear()
+        self.client = APIClient()
+        self.vendors = [
+            Vendor.objects.create(name=f'Vendor {i}', email=f'vendor{i}@example.com') for i in range(12)
+        ]
+
+    def test_repeated_reads_are_served_from_the_cache(self):
+        first = self.client.get('/api/vendors/active/').json()
+        # Only the ETag fingerprint query is left
+        with self.assertNumQueries(1):
+            second = self.client.get('/api/vendors/active/').json()
+        self.assertEqual(first, second)
+        self.assertEqual(first['count'], 12)
+
+    def test_toggle_active_invalidates_vendor_lists(self):
+        self.client.get('/api/vendors/active/')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f'/api/vendors/{self.vendors[0].id}/toggle_active/')
+
+        self.assertEqual(self.client.get('/api/vendors/active/').json()['count'], 11)
+
+    def test_concurrent_invalidations_never_reuse_a_version(self):
+        cache = ResponseCache()
+        before = cache.version(ResponseCache.VENDOR_LISTS)
+        _, key = cache.lookup(ResponseCache.VENDOR_LISTS, '/api/vendors/')
+        cache.store(key, {'stale': True})
+
+        # Both see the same version and replace it; neither may bring it back
+        cache._bump([ResponseCache.VENDOR_LISTS])
+        after_first = cache.version(ResponseCache.VENDOR_LISTS)
+        cache._bump([ResponseCache.VENDOR_LISTS])
+
+        self.assertNotIn(cache.version(ResponseCache.VENDOR_LISTS), (before, after_first))
+        self.assertIsNone(cache.lookup(ResponseCache.VENDOR_LISTS, '/api/vendors/')[0])
+
+    def test_cached_pages_link_to_the_requesting_host(self):
+        self.client.get('/api/vendors/', HTTP_HOST='localhost')
+        response = self.client.get('/api/vendors/', HTTP_HOST='127.0.0.1')
+
+        self.assertTrue(response.json()['next'].startswith('http://127.0.0.1/'))
+
+    def test_active_vendors_are_paged_in_name_order(self):
+        Vendor.objects.create(name='Aardvark Supplies', email='a@example.com')
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            first = self.client.get('/api/vendors/active/').json()
+            second = self.client.get(first['next']).json()
+
+        names = [vendor['name'] for vendor in first['results'] + second['results']]
+        self.assertEqual(names, sorted(names))
+        self.assertEqual(names[0], 'Aardvark Supplies')
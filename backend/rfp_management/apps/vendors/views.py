@@ -1,27 +1,58 @@
 """Vendors app - views"""
+from django.db import transaction
+from django.utils import timezone
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from .models import Vendor
 from .serializers import VendorSerializer
+from rfp_management.apps.proposals.models import Proposal
+from rfp_management.apps.rfps.models import RFP
+from rfp_management.common.cache import ResponseCache
+from rfp_management.common.views import CachedResponseMixin, ConditionalGetMixin, SparseFieldsetMixin
 
 
-class VendorViewSet(viewsets.ModelViewSet):
+class VendorViewSet(ConditionalGetMixin, CachedResponseMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
     """ViewSet for Vendor management"""
-    queryset = Vendor.objects.all()
+    queryset = Vendor.objects.order_by('name', 'id')  # Stable pages, also for the cached ones
     serializer_class = VendorSerializer
+    list_exclude_fields = ('address', 'notes')
+
+    def cache_namespace(self):
+        return ResponseCache.VENDOR_LISTS if self.action == 'list' else None
 
     @action(detail=False, methods=['get'])
     def active(self, request):
         """Get all active vendors"""
-        vendors = Vendor.objects.filter(active=True)
-        serializer = self.get_serializer(vendors, many=True)
-        return Response(serializer.data)
+        vendors = self.get_queryset().filter(active=True)
+        not_modified = self.not_modified(vendors)
+        if not_modified:
+            return not_modified
+
+        def build():
+            page = self.paginate_queryset(vendors)
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
+        return self.cached_response(ResponseCache.VENDOR_LISTS, build)
+
+    def perform_destroy(self, instance):
+        """
+        Delete a vendor and mark the proposals and RFPs that referenced it as updated.
+
+        The vendor link is cleared by the database without saving those rows,
+        so their ETags would otherwise not change.
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            Proposal.objects.filter(vendor=instance).update(updated_at=now)
+            RFP.objects.filter(selected_vendors=instance).update(updated_at=now)
+            instance.delete()
 
     @action(detail=True, methods=['post'])
     def toggle_active(self, request, pk=None):
         """Toggle vendor active status"""
         vendor = self.get_object()
         vendor.active = not vendor.active
-        vendor.save()
+        vendor.save()  # post_save invalidates the cached vendor lists
         return Response({'status': 'vendor status toggled', 'active': vendor.active})
@@ -0,0 +1,105 @@
+"""Shared response cache for hot read endpoints"""
+import hashlib
+import threading
+import uuid
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+
+class ResponseCache:
+    """
+    Serialized API responses in the Django cache, grouped into namespaces.
+
+    Every namespace has a version token stored next to its entries and
+    included in their keys. Invalidating a namespace replaces the token with
+    a new random one, so all of its entries (every page and field selection)
+    become unreachable at once and expire after ``API_CACHE_TIMEOUT``.
+    Replacing rather than incrementing needs no atomic operation from the
+    backend: two concurrent invalidations both leave a token that was never
+    used before. Model signals invalidate the namespaces a write affects,
+    once the transaction commits.
+    """
+
+    VENDOR_LISTS = 'vendors'
+    RFP_DETAIL = 'rfp:{}'
+    RFP_PROPOSALS = 'rfp:{}:proposals'
+
+    _stats = {}
+    _stats_lock = threading.Lock()
+
+    def __init__(self):
+        self.enabled = getattr(settings, 'API_CACHE_ENABLED', True)
+        self.cache = caches[getattr(settings, 'API_CACHE_ALIAS', 'default')]
+
+    def version(self, namespace: str) -> str:
+        """Current version token of a namespace"""
+        key = f'api:version:{namespace}'
+        self.cache.add(key, uuid.uuid4().hex, timeout=None)
+        return self.cache.get(key)
+
+    def lookup(self, namespace: str, key: str) -> tuple:
+        """
+        Look up cached response data.
+
+        The returned cache key belongs to the version current before the
+        response is built, so a response built while its data is being
+        changed is stored where nobody reads it after the invalidation.
+
+        Args:
+            namespace: Namespace the response depends on
+            key: Identifies the response within the namespace, e.g. its URL
+
+        Returns:
+            tuple: (response data or None on a miss, cache key for store())
+        """
+        digest = hashlib.sha256(key.encode('utf-8')).hexdigest()
+        cache_key = f'api:{namespace}:{self.version(namespace)}:{digest}'
+        data = self.cache.get(cache_key)
+        self._record(namespace, 'hits' if data is not None else 'misses')
+        return data, cache_key
+
+    def store(self, cache_key: str, data) -> None:
+        self.cache.set(cache_key, data)
+
+    def invalidate(self, *namespaces: str) -> None:
+        """Drop every entry of the given namespaces once the current transaction commits"""
+        if self.enabled and namespaces:
+            transaction.on_commit(lambda: self._bump(namespaces))
+
+    def _bump(self, namespaces) -> None:
+        for namespace in set(namespaces):
+            self.cache.set(f'api:version:{namespace}', uuid.uuid4().hex, timeout=None)
+            self._record(namespace, 'invalidations')
+
+    def stats(self) -> dict:
+        """Hit/miss counters for this process, overall and per kind of namespace"""
+        with self._stats_lock:
+            by_namespace = {name: dict(counters) for name, counters in self._stats.items()}
+        for counters in by_namespace.values():
+            counters['hit_rate'] = self._hit_rate(counters)
+        totals = {
+            counter: sum(counters.get(counter, 0) for counters in by_namespace.values())
+            for counter in ('hits', 'misses', 'invalidations')
+        }
+        return {
+            'enabled': self.enabled,
+            'backend': self.cache.__class__.__name__,
+            'timeout': self.cache.default_timeout,
+            **totals,
+            'hit_rate': self._hit_rate(totals),
+            'namespaces': by_namespace,
+        }
+
+    @staticmethod
+    def _hit_rate(counters: dict) -> float:
+        lookups = counters.get('hits', 0) + counters.get('misses', 0)
+        return round(counters.get('hits', 0) / lookups, 4) if lookups else 0.0
+
+    @classmethod
+    def _record(cls, namespace: str, counter: str) -> None:
+        # 'rfp:12:proposals' is counted as 'rfp:*:proposals'
+        kind = ':'.join('*' if part.isdigit() else part for part in namespace.split(':'))
+        with cls._stats_lock:
+            counters = cls._stats.setdefault(kind, {'hits': 0, 'misses': 0, 'invalidations': 0})
+            counters[counter] += 1
@@ -0,0 +1,162 @@
+"""Shared pagination classes"""
+import base64
+import json
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (cursor) pagination over an indexed (timestamp, id) ordering.
+
+    Each page continues from the (timestamp, id) of the last row it showed,
+    ``WHERE (timestamp, id) < (last timestamp, last id)``, instead of an OFFSET,
+    and no COUNT is run, so a deep page costs the same as the first one.
+    Views choose the ordering with ``cursor_ordering``, e.g.
+    ``('-received_at', '-id')``. ``?page_size=`` sets the page size (up to
+    API_MAX_PAGE_SIZE) and ``?count=true`` adds the total count for callers
+    that need it.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    ordering = ('-created_at', '-id')
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.count = queryset.count() if self.wants_count(request) else None
+
+        page_queryset, position, backwards = self.page_queryset(queryset, request, view)
+        rows = list(page_queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if backwards:
+            rows.reverse()
+            self.has_next, self.has_previous = position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+        self.page = rows
+        return rows
+
+    def page_queryset(self, queryset, request, view=None) -> tuple:
+        """
+        Order and filter a queryset to the rows of the requested page.
+
+        Returns:
+            tuple: (unsliced queryset starting at the page's first row, cursor
+                    position or None, whether the page is read backwards)
+        """
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        field, tiebreak = getattr(view, 'cursor_ordering', self.ordering)
+        descending = field.startswith('-')
+        self.field, self.tiebreak = field.lstrip('-'), tiebreak.lstrip('-')
+
+        position, backwards = self.decode_cursor(request, queryset.model._meta.get_field(self.field))
+        # Walking backwards reads the preceding rows in reverse order
+        ascending = descending == backwards
+        prefix = '' if ascending else '-'
+        queryset = queryset.order_by(prefix + self.field, prefix + self.tiebreak)
+        if position is not None:
+            value, key = position
+            after = '__gt' if ascending else '__lt'
+            queryset = queryset.filter(
+                Q(**{self.field + after: value})
+                | Q(**{self.field: value, self.tiebreak + after: key})
+            )
+        return queryset, position, backwards
+
+    def page_state(self, queryset, request, view, modified_field: str) -> list:
+        """
+        Fingerprint of the requested page, for ETags.
+
+        Reads only the id and modification time of the page's rows, and
+        whether a next page exists, through the ordering index; the total
+        count is only added when the response includes it.
+
+        Returns:
+            list: [id, modified] per row, whether there are more rows, then
+                  the count if requested
+        """
+        page_queryset, _, _ = self.page_queryset(queryset, request, view)
+        rows = list(page_queryset.values_list('pk', modified_field)[:self.page_size + 1])
+        state = [[pk, modified.isoformat() if modified else None] for pk, modified in rows[:self.page_size]]
+        state.append(len(rows) > self.page_size)
+        if self.wants_count(request):
+            state.append(queryset.count())
+        return state
+
+    @staticmethod
+    def wants_count(request) -> bool:
+        return request.query_params.get('count', '').lower() in ('1', 'true', 'yes')
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return api_settings.PAGE_SIZE
+        return max(1, min(page_size, settings.API_MAX_PAGE_SIZE))
+
+    def decode_cursor(self, request, field):
+        """
+        Args:
+            request: The request carrying the ``cursor`` parameter
+            field: Model field of the ordering timestamp, used to validate the position
+
+        Returns:
+            tuple: ((timestamp, id) position or None, whether to page backwards)
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            value, key = cursor['p']
+            value = field.to_python(value)
+            if value is None:
+                raise ValueError('Cursor without a position')
+            return (value, int(key)), bool(cursor.get('r'))
+        except (TypeError, ValueError, KeyError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, row, backwards: bool) -> str:
+        value = getattr(row, self.field)
+        cursor = {'p': [value.isoformat() if hasattr(value, 'isoformat') else value, getattr(row, self.tiebreak)]}
+        if backwards:
+            cursor['r'] = 1
+        encoded = base64.urlsafe_b64encode(json.dumps(cursor, separators=(',', ':')).encode('ascii')).decode('ascii')
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], backwards=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+        return self.encode_cursor(self.page[0], backwards=True)
+
+    def get_paginated_response(self, data):
+        body = {'next': self.get_next_link(), 'previous': self.get_previous_link(), 'results': data}
+        if self.count is not None:
+            body['count'] = self.count
+        return Response(body)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+                'count': {'type': 'integer'},
+            },
+        }
@@ -0,0 +1,218 @@
+"""Shared view mixins"""
+import hashlib
+import json
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.decorators import api_view
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.serializers import ListSerializer
+from .cache import ResponseCache
+from .pagination import KeysetPagination
+
+
+class SparseFieldsetMixin:
+    """
+    ``?fields=a,b`` / ``?exclude=a,b`` on the read endpoints of a ModelViewSet.
+
+    The chosen fields limit both the response and the columns loaded from the
+    database (``.only()``). Collection responses (list and ``detail=False``
+    actions) leave out ``list_exclude_fields`` unless the request chooses its
+    own fields; ``?exclude=`` with no value returns every field.
+    """
+    list_exclude_fields = ()
+
+    def requested_fields(self):
+        """
+        Serializer fields to return for this request.
+
+        Returns:
+            list: Field names, or None for the full representation
+        """
+        if self.request is None or self.request.method != 'GET':
+            return None
+        if not hasattr(self, '_requested_fields'):
+            self._requested_fields = self._resolve_fields()
+        return self._requested_fields
+
+    def _resolve_fields(self):
+        available = list(self.get_serializer_class()().fields)
+        params = self.request.query_params
+
+        if 'fields' in params:
+            wanted = self._field_names(params['fields'], available)
+            return [name for name in available if name in wanted or name == 'id']
+        if 'exclude' in params:
+            excluded = self._field_names(params['exclude'], available)
+        elif not self.detail:
+            excluded = set(self.list_exclude_fields)
+        else:
+            return None
+        return [name for name in available if name not in excluded or name == 'id']
+
+    @staticmethod
+    def _field_names(value: str, available: list) -> set:
+        names = {name.strip() for name in value.split(',') if name.strip()}
+        unknown = names.difference(available)
+        if unknown:
+            raise ValidationError({'error': f"Unknown fields: {', '.join(sorted(unknown))}"})
+        return names
+
+    def get_queryset(self):
+        """Load only the columns behind the requested fields"""
+        queryset = super().get_queryset()
+        fields = self.requested_fields()
+        if fields is None:
+            return queryset
+
+        serializer_fields = self.get_serializer_class()().fields
+        concrete = {field.name for field in queryset.model._meta.concrete_fields}
+        columns = {serializer_fields[name].source.split('.')[0] for name in fields} & concrete
+        return queryset.only(queryset.model._meta.pk.name, *columns)
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        fields = self.requested_fields()
+        if fields is not None:
+            target = serializer.child if isinstance(serializer, ListSerializer) else serializer
+            for name in list(target.fields):
+                if name not in fields:
+                    target.fields.pop(name)
+        return serializer
+
+
+class ConditionalGetMixin:
+    """
+    ETag / Last-Modified validators on the read endpoints of a ModelViewSet.
+
+    The validators come from a small query on ``updated_at``, so a client
+    whose copy is current gets ``304 Not Modified`` before any object is
+    loaded or serialized: the row's value for a single object, the ids and
+    ``updated_at`` of just the requested page for keyset-paginated
+    collections, ``Max`` and ``Count`` for other collections. Collections
+    only send an ETag because deleting a row does not change the newest
+    ``updated_at``.
+    """
+    modified_field = 'updated_at'
+
+    def list(self, request, *args, **kwargs):
+        return self.not_modified(self.filter_queryset(self.get_queryset())) or super().list(request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.not_modified() or super().retrieve(request, *args, **kwargs)
+
+    def not_modified(self, queryset=None):
+        """
+        Compare the request's If-None-Match / If-Modified-Since with the current data.
+
+        Args:
+            queryset: The collection the response is built from, None for the object in the URL
+
+        Returns:
+            HttpResponse: 304 Not Modified when the client's copy is current, otherwise None
+        """
+        if self.request.method not in ('GET', 'HEAD'):
+            return None
+
+        last_modified = None
+        if queryset is None:
+            lookup = self.kwargs[self.lookup_url_kwarg or self.lookup_field]
+            try:
+                last_modified = self.filter_queryset(self.get_queryset()).prefetch_related(None).filter(
+                    **{self.lookup_field: lookup}
+                ).values_list(self.modified_field, flat=True).first()
+            except (TypeError, ValueError, DjangoValidationError):
+                return None
+            if last_modified is None:
+                return None  # retrieve() answers with the 404
+            state = [lookup, last_modified.isoformat()]
+        else:
+            state = self.collection_state(queryset.prefetch_related(None))
+
+        # The query string picks the page and the fields, so it is part of the representation
+        payload = json.dumps([self.queryset.model._meta.label, state, self.request.get_full_path()])
+        digest = hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32]
+        self._validators = {'ETag': f'W/"{digest}"'}
+        if last_modified is not None:
+            self._validators['Last-Modified'] = http_date(last_modified.timestamp())
+
+        return get_conditional_response(
+            self.request,
+            etag=self._validators['ETag'],
+            last_modified=int(last_modified.timestamp()) if last_modified is not None else None
+        )
+
+    def collection_state(self, queryset) -> list:
+        """What a collection response depends on: the requested page, or the whole collection if unpaginated"""
+        if isinstance(self.paginator, KeysetPagination):
+            return self.paginator.page_state(queryset, self.request, self, self.modified_field)
+        stats = queryset.aggregate(newest=Max(self.modified_field), count=Count('pk'))
+        return [stats['count'], stats['newest'].isoformat() if stats['newest'] else None]
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        validators = getattr(self, '_validators', None)
+        if validators and response.status_code in (200, 304):
+            for header, value in validators.items():
+                response[header] = value
+            # Browsers may keep the response but must revalidate it before reuse
+            response['Cache-Control'] = 'private, no-cache'
+        return response
+
+
+class CachedResponseMixin:
+    """
+    Serve GET responses from the ResponseCache.
+
+    ``cache_namespace()`` names the namespace that list and retrieve read for
+    the current request (None skips the cache). Custom actions pass their
+    namespace to ``cached_response()``. Entries are keyed by the absolute
+    URL, so every page and field selection is cached on its own and the
+    ``next``/``previous`` links always point at the host that was asked.
+    """
+
+    def cache_namespace(self):
+        return None
+
+    def cached_response(self, namespace, build):
+        """
+        Return cached response data, or build the response and cache it.
+
+        Args:
+            namespace: ResponseCache namespace the response depends on, None to skip the cache
+            build: Callable returning the uncached Response
+
+        Returns:
+            Response: The cached or freshly built response
+        """
+        cache = ResponseCache()
+        if namespace is None or not cache.enabled or self.request.method != 'GET':
+            return build()
+
+        data, cache_key = cache.lookup(namespace, self.request.build_absolute_uri())
+        if data is not None:
+            return Response(data)
+
+        response = build()
+        if response.status_code == 200:
+            cache.store(cache_key, response.data)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(
+            self.cache_namespace(), lambda: super(CachedResponseMixin, self).list(request, *args, **kwargs)
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            self.cache_namespace(), lambda: super(CachedResponseMixin, self).retrieve(request, *args, **kwargs)
+        )
+
+
+@api_view(['GET'])
+def cache_stats(request):
+    """Get API response cache hit/miss statistics"""
+    return Response(ResponseCache().stats(), status=status.HTTP_200_OK)
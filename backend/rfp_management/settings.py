@@ -3,6 +3,7 @@ Django settings for rfp_management project.
 """
 
 import os
+import tempfile
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -82,6 +83,28 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 10,
     'DEFAULT_FILTER_BACKENDS': ['rest_framework.filters.SearchFilter'],
 }
+API_MAX_PAGE_SIZE = int(os.getenv('API_MAX_PAGE_SIZE', '100'))  # Largest `?page_size=` on cursor-paginated lists
+
+# API response cache: vendor lists, RFP detail and per-RFP proposal lists, invalidated on every write.
+# 'file' is shared with the AI worker and email listener processes; 'locmem' only serves one process.
+API_CACHE_ENABLED = os.getenv('API_CACHE_ENABLED', 'True') == 'True'
+API_CACHE_BACKEND = os.getenv('API_CACHE_BACKEND', 'file')
+API_CACHE_LOCATION = os.getenv('API_CACHE_LOCATION') or os.path.join(tempfile.gettempdir(), 'rfp_management_api_cache')
+API_CACHE_TIMEOUT = int(os.getenv('API_CACHE_TIMEOUT', '300'))  # seconds
+API_CACHE_ALIAS = 'api'
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    API_CACHE_ALIAS: {
+        'BACKEND': {
+            'file': 'django.core.cache.backends.filebased.FileBasedCache',
+            'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+        }[API_CACHE_BACKEND],
+        'LOCATION': API_CACHE_LOCATION if API_CACHE_BACKEND == 'file' else 'rfp-management-api',
+        'TIMEOUT': API_CACHE_TIMEOUT,
+    },
+}
 
 # CORS Configuration
 CORS_ALLOWED_ORIGINS = [
@@ -99,15 +122,84 @@ EMAIL_USE_TLS = os.getenv('EMAIL_USE_TLS', 'True') == 'True'
 EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER', '')
 EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD', '')
 DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL', 'rfp-system@example.com')
+EMAIL_MAX_IN_FLIGHT = int(os.getenv('EMAIL_MAX_IN_FLIGHT', '5'))  # Concurrent SMTP sends per batch
+
+# Email Outbox (delivered by `python manage.py dispatch_outbox`, which must be running when enabled)
+EMAIL_USE_OUTBOX = os.getenv('EMAIL_USE_OUTBOX', 'False') == 'True'
+EMAIL_OUTBOX_BATCH_SIZE = int(os.getenv('EMAIL_OUTBOX_BATCH_SIZE', '50'))
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv('EMAIL_OUTBOX_MAX_ATTEMPTS', '5'))
+EMAIL_OUTBOX_BACKOFF_BASE = int(os.getenv('EMAIL_OUTBOX_BACKOFF_BASE', '30'))  # seconds, doubled per retry
+EMAIL_OUTBOX_BACKOFF_MAX = int(os.getenv('EMAIL_OUTBOX_BACKOFF_MAX', '3600'))
+EMAIL_OUTBOX_CLAIM_TIMEOUT = int(os.getenv('EMAIL_OUTBOX_CLAIM_TIMEOUT', '300'))  # seconds without progress before a claim is released
+EMAIL_OUTBOX_POLL_INTERVAL = float(os.getenv('EMAIL_OUTBOX_POLL_INTERVAL', '5'))
+EMAIL_RATE_LIMIT_PER_MINUTE = int(os.getenv('EMAIL_RATE_LIMIT_PER_MINUTE', '60'))  # per SMTP account, across dispatchers; 0 = unlimited
+EMAIL_RATE_LIMIT_BURST = int(os.getenv('EMAIL_RATE_LIMIT_BURST', '10'))
 
 # IMAP Configuration
 IMAP_SERVER = os.getenv('IMAP_SERVER', 'imap.gmail.com')
 IMAP_PORT = int(os.getenv('IMAP_PORT', '993'))
 IMAP_USERNAME = os.getenv('IMAP_USERNAME', '')
 IMAP_PASSWORD = os.getenv('IMAP_PASSWORD', '')
+IMAP_FETCH_BATCH_SIZE = int(os.getenv('IMAP_FETCH_BATCH_SIZE', '50'))  # UIDs per FETCH command
+IMAP_MAX_BODY_BYTES = int(os.getenv('IMAP_MAX_BODY_BYTES', '262144'))  # Text body bytes downloaded per message
+EMAIL_INGEST_BATCH_SIZE = int(os.getenv('EMAIL_INGEST_BATCH_SIZE', '100'))  # Emails committed per transaction
+# Public mail providers whose domain must not be used to match a sender to a vendor
+VENDOR_DOMAIN_MATCH_EXCLUDE = os.getenv(
+    'VENDOR_DOMAIN_MATCH_EXCLUDE',
+    'gmail.com,googlemail.com,yahoo.com,outlook.com,hotmail.com,live.com,icloud.com,aol.com,proton.me,protonmail.com'
+).split(',')
 
 # Ollama Configuration
 OLLAMA_MODEL = os.getenv('OLLAMA_MODEL', 'tinyllama')
 
+# LLM Response Cache
+LLM_CACHE_ENABLED = os.getenv('LLM_CACHE_ENABLED', 'True') == 'True'
+LLM_CACHE_TTL = int(os.getenv('LLM_CACHE_TTL', '86400'))  # seconds
+LLM_CACHE_MAX_ENTRIES = int(os.getenv('LLM_CACHE_MAX_ENTRIES', '1000'))
+LLM_CACHE_DISABLED_METHODS = [
+    m.strip() for m in os.getenv('LLM_CACHE_DISABLED_METHODS', '').split(',') if m.strip()
+]
+
+# Rule-based proposal extraction (skips the LLM for routine replies)
+AI_RULE_EXTRACTION_ENABLED = os.getenv('AI_RULE_EXTRACTION_ENABLED', 'True') == 'True'
+AI_RULE_EXTRACTION_THRESHOLD = float(os.getenv('AI_RULE_EXTRACTION_THRESHOLD', '0.8'))  # Minimum confidence for every field
+
+# Proposal scoring: weighted price/delivery/warranty/item coverage scores computed locally,
+# the LLM only writes the summary and recommendation
+AI_LOCAL_SCORING = os.getenv('AI_LOCAL_SCORING', 'True') == 'True'
+AI_SCORING_WEIGHTS = {
+    'price': float(os.getenv('AI_SCORING_WEIGHT_PRICE', '0.4')),
+    'delivery': float(os.getenv('AI_SCORING_WEIGHT_DELIVERY', '0.2')),
+    'warranty': float(os.getenv('AI_SCORING_WEIGHT_WARRANTY', '0.15')),
+    'coverage': float(os.getenv('AI_SCORING_WEIGHT_COVERAGE', '0.25')),  # Share of requested items mentioned
+}
+
+# Map-reduce evaluation for RFPs with many proposals (LLM scoring only)
+AI_EVALUATION_CHUNK_SIZE = int(os.getenv('AI_EVALUATION_CHUNK_SIZE', '8'))  # Proposals per scoring prompt (0 disables chunking)
+AI_EVALUATION_MAX_PARALLEL = int(os.getenv('AI_EVALUATION_MAX_PARALLEL', '2'))  # Scoring prompts in flight at once
+AI_EVALUATION_REDUCE_LIMIT = int(os.getenv('AI_EVALUATION_REDUCE_LIMIT', '20'))  # Top vendors described to the summary step
+
+# Background AI pipeline (run by `python manage.py run_ai_worker`)
+AI_AUTO_PIPELINE = os.getenv('AI_AUTO_PIPELINE', 'False') == 'True'  # Parse ingested proposals and re-score RFPs automatically; needs `run_ai_worker`
+AI_INTERACTIVE_CONCURRENCY = int(os.getenv('AI_INTERACTIVE_CONCURRENCY', '2'))  # Per kind, for `?async=true` API requests
+AI_JOB_CONCURRENCY = {
+    'PARSE_PROPOSAL': int(os.getenv('AI_PARSE_CONCURRENCY', '2')),  # Running jobs across all workers
+    'EVALUATE_RFP': int(os.getenv('AI_EVALUATE_CONCURRENCY', '1')),
+    'PARSE_RFP_TEXT': AI_INTERACTIVE_CONCURRENCY,
+    'CREATE_RFP': AI_INTERACTIVE_CONCURRENCY,
+    'PARSE_PROPOSAL_TEXT': AI_INTERACTIVE_CONCURRENCY,
+    'EVALUATE_PROPOSALS': AI_INTERACTIVE_CONCURRENCY,
+}
+AI_EVALUATE_DELAY = int(os.getenv('AI_EVALUATE_DELAY', '30'))  # seconds; proposals parsed meanwhile share one evaluation
+AI_JOB_MAX_ATTEMPTS = int(os.getenv('AI_JOB_MAX_ATTEMPTS', '3'))
+AI_JOB_BACKOFF_BASE = int(os.getenv('AI_JOB_BACKOFF_BASE', '30'))  # seconds, doubled per retry
+AI_JOB_BACKOFF_MAX = int(os.getenv('AI_JOB_BACKOFF_MAX', '1800'))
+AI_JOB_CLAIM_TIMEOUT = int(os.getenv('AI_JOB_CLAIM_TIMEOUT', '900'))  # seconds without a worker heartbeat before a running job is released
+AI_JOB_POLL_INTERVAL = float(os.getenv('AI_JOB_POLL_INTERVAL', '2'))
+AI_JOB_MAX_WAIT = int(os.getenv('AI_JOB_MAX_WAIT', '5'))  # Longest `?wait=` when long-polling a job; each waiting request holds a server thread
+
 # Email Processing
-EMAIL_CHECK_INTERVAL = int(os.getenv('EMAIL_CHECK_INTERVAL', '300'))
+EMAIL_CHECK_INTERVAL = int(os.getenv('EMAIL_CHECK_INTERVAL', '300'))  # Longest poll interval without IDLE
+IMAP_IDLE_TIMEOUT = int(os.getenv('IMAP_IDLE_TIMEOUT', '600'))  # Re-issue IDLE after this many seconds
+IMAP_POLL_MIN_INTERVAL = int(os.getenv('IMAP_POLL_MIN_INTERVAL', '15'))
+IMAP_RECONNECT_DELAY = int(os.getenv('IMAP_RECONNECT_DELAY', '30'))
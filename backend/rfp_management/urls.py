@@ -3,6 +3,7 @@ URL Configuration for rfp_management project.
 """
 from django.urls import path, include
 from rest_framework import routers
+from rfp_management.common.views import cache_stats
 
 urlpatterns = [
     path('api/vendors/', include('rfp_management.apps.vendors.urls')),
@@ -10,4 +11,5 @@ urlpatterns = [
     path('api/proposals/', include('rfp_management.apps.proposals.urls')),
     path('api/ai/', include('rfp_management.apps.ai.urls')),
     path('api/email/', include('rfp_management.apps.email_service.urls')),
+    path('api/cache-stats/', cache_stats),
 ]
@@ -36,7 +36,7 @@ export class DashboardComponent implements OnInit {
     });
 
     // Load RFPs
-    this.apiService.getRFPs().subscribe({
+    this.apiService.getRFPs({ count: true }).subscribe({
       next: (response: any) => {
         this.rfps = response.results || [];
         this.rfpCount = response.count || 0;
@@ -45,7 +45,7 @@ export class DashboardComponent implements OnInit {
     });
 
     // Load Proposals
-    this.apiService.getProposals('').subscribe({
+    this.apiService.getProposals('', { count: true }).subscribe({
       next: (response: any) => {
         this.proposals = response.results || [];
         this.proposalCount = response.count || 0;
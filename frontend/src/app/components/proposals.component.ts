@@ -142,6 +142,11 @@ export class ProposalsComponent implements OnInit {
   viewProposal(proposal: any) {
     this.selectedProposal = proposal;
     this.showViewModal = true;
+    // The list leaves out the email body and parsed data; load the full proposal
+    this.apiService.getProposal(String(proposal.id)).subscribe({
+      next: (response: any) => this.selectedProposal = response,
+      error: (err) => console.error('Error loading proposal:', err)
+    });
   }
 
   acceptProposal(proposal: any) {
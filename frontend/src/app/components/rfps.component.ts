@@ -39,7 +39,8 @@ export class RFpsComponent implements OnInit {
 
   loadRFPs() {
     this.isLoading = true;
-    this.apiService.getRFPs().subscribe({
+    // The cards show the description, so only leave out the original input
+    this.apiService.getRFPs({ exclude: 'natural_language_input,evaluation_summary' }).subscribe({
       next: (response: any) => {
         this.rfps = response.results || [];
         this.isLoading = false;
@@ -89,19 +89,28 @@ export class VendorsComponent implements OnInit {
   }
 
   editVendor(vendor: any) {
-    this.editingVendor = vendor;
-    this.isEditMode = true;
-    this.newVendor = {
-      name: vendor.name,
-      email: vendor.email,
-      contact_person: vendor.contact_person || '',
-      phone: vendor.phone || '',
-      city: vendor.city || '',
-      country: vendor.country || '',
-      website: vendor.website || '',
-      notes: vendor.notes || ''
-    };
-    this.showForm = true;
+    // The list leaves out notes and address; load the full vendor so saving keeps them
+    this.apiService.getVendor(String(vendor.id)).subscribe({
+      next: (response: any) => {
+        this.editingVendor = response;
+        this.isEditMode = true;
+        this.newVendor = {
+          name: response.name,
+          email: response.email,
+          contact_person: response.contact_person || '',
+          phone: response.phone || '',
+          city: response.city || '',
+          country: response.country || '',
+          website: response.website || '',
+          notes: response.notes || ''
+        };
+        this.showForm = true;
+      },
+      error: (err) => {
+        console.error('Error loading vendor:', err);
+        this.showErrorModal('Error loading vendor');
+      }
+    });
   }
 
   updateVendor() {
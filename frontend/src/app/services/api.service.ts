@@ -32,8 +32,9 @@ export class ApiService {
   }
 
   // RFP endpoints
-  getRFPs(): Observable<any> {
-    return this.http.get(`${this.apiUrl}/rfps/`);
+  // List endpoints leave out large text fields; pass { fields } or { exclude } to choose them
+  getRFPs(params: any = {}): Observable<any> {
+    return this.http.get(`${this.apiUrl}/rfps/`, { params });
   }
 
   getRFP(id: string): Observable<any> {
@@ -69,11 +70,12 @@ export class ApiService {
   }
 
   // Proposal endpoints
-  getProposals(rfpId: string = ''): Observable<any> {
+  // Lists are cursor-paginated: follow `next`, and pass { count: true } for the total
+  getProposals(rfpId: string = '', params: any = {}): Observable<any> {
     if (rfpId) {
-      return this.http.get(`${this.apiUrl}/proposals/?rfp_id=${rfpId}`);
+      return this.http.get(`${this.apiUrl}/proposals/?rfp_id=${rfpId}`, { params });
     }
-    return this.http.get(`${this.apiUrl}/proposals/`);
+    return this.http.get(`${this.apiUrl}/proposals/`, { params });
   }
 
   getProposal(id: string): Observable<any> {